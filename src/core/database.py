@@ -199,6 +199,43 @@ class DatabaseManager:
             self.logger.error(f"銘柄一覧取得エラー: {e}")
             return []
     
+    def get_stocks(self, codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        複数の証券コードの銘柄情報を一括取得
+
+        Args:
+            codes: 証券コードのリスト
+
+        Returns:
+            Dict[str, Dict]: 証券コード→銘柄情報（同一コードが複数月ある場合は最初のレコード）
+        """
+        if not codes:
+            return {}
+
+        try:
+            conn = self.connect()
+            cursor = conn.cursor()
+
+            unique_codes = list(dict.fromkeys(codes))
+            stocks = {}
+            # SQLiteのバインド変数上限を超えないよう分割して問い合わせる
+            for start in range(0, len(unique_codes), 500):
+                chunk = unique_codes[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT * FROM stocks WHERE code IN ({placeholders})",
+                    chunk
+                )
+                for row in cursor.fetchall():
+                    stocks.setdefault(row['code'], dict(row))
+
+            conn.close()
+            return stocks
+
+        except Exception as e:
+            self.logger.error(f"銘柄一括取得エラー: {e}")
+            return {}
+
     def get_all_stocks(self, rights_month: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         全銘柄を取得
@@ -454,6 +491,22 @@ class DatabaseManager:
             self.logger.error(f"ウォッチリスト削除エラー: {e}")
             return False
     
+    def clear_watchlist(self) -> bool:
+        """ウォッチリストを全削除"""
+        try:
+            conn = self.connect()
+            cursor = conn.cursor()
+            
+            cursor.execute("DELETE FROM watchlist")
+            
+            conn.commit()
+            conn.close()
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"ウォッチリスト全削除エラー: {e}")
+            return False
+    
     def get_watchlist(self) -> List[Dict[str, Any]]:
         """ウォッチリストを取得"""
         try:
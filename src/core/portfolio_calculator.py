@@ -31,55 +31,66 @@ class PortfolioCalculator:
             Dict: ポートフォリオ指標
         """
         try:
-            if len(stocks) != len(weights):
-                raise ValueError("銘柄数と投資比率の数が一致しません")
+            # 各銘柄の期待リターン・勝率・平均勝ち/負けリターンを列ごとの配列にして計算
+            return self.calculate_portfolio_metrics_vec(
+                np.array([s.get('expected_return', 0) for s in stocks], dtype=np.float64),
+                np.array([s.get('win_rate', 0) for s in stocks], dtype=np.float64),
+                np.array([s.get('avg_win_return', 0) for s in stocks], dtype=np.float64),
+                np.array([s.get('avg_lose_return', 0) for s in stocks], dtype=np.float64),
+                weights
+            )
 
-            if not np.isclose(sum(weights), 1.0):
-                raise ValueError(f"投資比率の合計が1.0ではありません: {sum(weights)}")
+        except Exception as e:
+            self.logger.error(f"ポートフォリオ指標計算エラー: {e}", exc_info=True)
+            return None
 
-            # 各銘柄の期待リターンと勝率
-            expected_returns = np.array([s.get('expected_return', 0) / 100 for s in stocks])
-            win_rates = np.array([s.get('win_rate', 0) for s in stocks])
-            weights = np.array(weights)
+    def calculate_portfolio_metrics_vec(self, expected_returns: np.ndarray,
+                                        win_rates: np.ndarray,
+                                        avg_win_returns: np.ndarray,
+                                        avg_lose_returns: np.ndarray,
+                                        weights) -> Dict:
+        """
+        ポートフォリオの指標を計算（銘柄ごとの値を配列で受け取る版）
+
+        Args:
+            expected_returns: 各銘柄の期待リターン（%）
+            win_rates: 各銘柄の勝率
+            avg_win_returns: 各銘柄の平均勝ちリターン（%）
+            avg_lose_returns: 各銘柄の平均負けリターン（%）
+            weights: 各銘柄の投資比率（合計1.0）
+
+        Returns:
+            Dict: ポートフォリオ指標
+        """
+        try:
+            weights = np.asarray(weights, dtype=np.float64)
+
+            if len(expected_returns) != len(weights):
+                raise ValueError("銘柄数と投資比率の数が一致しません")
+
+            if not np.isclose(weights.sum(), 1.0):
+                raise ValueError(f"投資比率の合計が1.0ではありません: {weights.sum()}")
 
             # ポートフォリオの期待リターン（加重平均）
-            portfolio_return = np.dot(weights, expected_returns) * 100  # パーセント表示
+            portfolio_return = np.dot(weights, expected_returns)  # パーセント表示
 
             # ポートフォリオの勝率（加重平均）
             portfolio_win_rate = np.dot(weights, win_rates)
 
             # リスク計算（簡易版: 標準偏差の加重平均）
             # より正確にはリターンの共分散行列が必要だが、データがないため簡易計算
-            avg_win_returns = np.array([s.get('avg_win_return', 0) for s in stocks])
-            avg_lose_returns = np.array([s.get('avg_lose_return', 0) for s in stocks])
-
-            # 各銘柄のリターンの分散を推定
-            variances = []
-            for i, stock in enumerate(stocks):
-                win_rate = win_rates[i]
-                avg_win = avg_win_returns[i]
-                avg_lose = avg_lose_returns[i]
-                expected = expected_returns[i] * 100
-
-                # 分散 = 勝率 * (平均勝ち - 期待値)^2 + (1-勝率) * (平均負け - 期待値)^2
-                variance = (win_rate * (avg_win - expected)**2 +
-                           (1 - win_rate) * (avg_lose - expected)**2)
-                variances.append(variance)
-
-            variances = np.array(variances)
+            # 分散 = 勝率 * (平均勝ち - 期待値)^2 + (1-勝率) * (平均負け - 期待値)^2
+            variances = (win_rates * (avg_win_returns - expected_returns)**2 +
+                         (1 - win_rates) * (avg_lose_returns - expected_returns)**2)
 
             # ポートフォリオのリスク（分散投資効果を考慮）
             # 相関係数を0.3と仮定（実際の相関は不明）
+            # 共分散 = 相関係数 * σi * σj なので、i≠jの和は (Σwσ)^2 - Σ(wσ)^2 で求まる
             correlation = 0.3
-            portfolio_variance = 0
-            for i in range(len(weights)):
-                for j in range(len(weights)):
-                    if i == j:
-                        portfolio_variance += weights[i]**2 * variances[i]
-                    else:
-                        # 共分散 = 相関係数 * σi * σj
-                        portfolio_variance += (weights[i] * weights[j] * correlation *
-                                             np.sqrt(variances[i]) * np.sqrt(variances[j]))
+            weighted_sigma = weights * np.sqrt(variances)
+            own_variance = np.dot(weighted_sigma, weighted_sigma)
+            portfolio_variance = (own_variance +
+                                  correlation * (weighted_sigma.sum()**2 - own_variance))
 
             portfolio_risk = np.sqrt(portfolio_variance)
 
@@ -94,12 +105,9 @@ class PortfolioCalculator:
             worst_case_return = portfolio_return - 1.645 * portfolio_risk  # 95%信頼区間
 
             # ソルティノレシオ（下方リスクのみ考慮）
-            # 下方偏差を計算（目標リターン0とする）
-            downside_variance = 0
-            for i in range(len(weights)):
-                avg_lose = avg_lose_returns[i]
-                if avg_lose < 0:  # 負のリターンのみ
-                    downside_variance += weights[i]**2 * (avg_lose ** 2)
+            # 下方偏差を計算（目標リターン0とする、負のリターンのみ）
+            downside_returns = np.where(avg_lose_returns < 0, avg_lose_returns, 0.0)
+            downside_variance = np.dot(weights**2, downside_returns**2)
 
             downside_risk = np.sqrt(downside_variance) if downside_variance > 0 else portfolio_risk
             sortino_ratio = portfolio_return / downside_risk if downside_risk > 0 else 0
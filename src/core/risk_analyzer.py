@@ -351,6 +351,16 @@ class RiskAnalyzer:
                 'current_streak': 0
             }
 
+    @staticmethod
+    def _extract_returns(trades: pd.DataFrame) -> np.ndarray:
+        """トレードのDataFrameからリターン列を配列で取得（列名の違いに対応）"""
+        if trades.empty:
+            return np.empty(0)
+        for column in ('return', 'リターン(%)'):
+            if column in trades.columns:
+                return trades[column].to_numpy(dtype=np.float64)
+        return np.empty(0)
+
     def calculate_comprehensive_risk_metrics(self,
                                             win_trades: pd.DataFrame,
                                             lose_trades: pd.DataFrame) -> Dict:
@@ -365,49 +375,13 @@ class RiskAnalyzer:
             Dict: 全リスク指標
         """
         try:
-            # 全リターンを取得（列名の違いに対応）
-            win_returns = pd.Series()
-            lose_returns = pd.Series()
-
-            # win_tradesからリターンを取得
-            if not win_trades.empty:
-                if 'return' in win_trades.columns:
-                    win_returns = win_trades['return']
-                elif 'リターン(%)' in win_trades.columns:
-                    win_returns = win_trades['リターン(%)']
-
-            # lose_tradesからリターンを取得
-            if not lose_trades.empty:
-                if 'return' in lose_trades.columns:
-                    lose_returns = lose_trades['return']
-                elif 'リターン(%)' in lose_trades.columns:
-                    lose_returns = lose_trades['リターン(%)']
-
-            # 空のSeriesを除外してからconcat（FutureWarning回避）
-            series_to_concat = [s for s in [win_returns, lose_returns] if not s.empty]
-            if series_to_concat:
-                all_returns = pd.concat(series_to_concat, ignore_index=True)
-            else:
-                all_returns = pd.Series(dtype=float)
-
-            if all_returns.empty:
-                return {
-                    'max_drawdown': self.calculate_max_drawdown(pd.Series()),
-                    'var': self.calculate_var(pd.Series()),
-                    'distribution': self.calculate_return_distribution(pd.Series()),
-                    'sortino_ratio': 0.0,
-                    'calmar_ratio': 0.0,
-                    'trade_sequence': self.analyze_trade_sequence(win_trades, lose_trades)
-                }
-
-            return {
-                'max_drawdown': self.calculate_max_drawdown(all_returns),
-                'var': self.calculate_var(all_returns),
-                'distribution': self.calculate_return_distribution(all_returns),
-                'sortino_ratio': self.calculate_sortino_ratio(all_returns),
-                'calmar_ratio': self.calculate_calmar_ratio(all_returns),
-                'trade_sequence': self.analyze_trade_sequence(win_trades, lose_trades)
-            }
+            # リターン列は最初に配列化し、数値計算はNumPyで行う
+            risk_metrics = self.calculate_comprehensive_risk_metrics_np(
+                self._extract_returns(win_trades),
+                self._extract_returns(lose_trades)
+            )
+            risk_metrics['trade_sequence'] = self.analyze_trade_sequence(win_trades, lose_trades)
+            return risk_metrics
 
         except Exception as e:
             self.logger.error(f"包括的リスク指標計算エラー: {e}", exc_info=True)
@@ -419,3 +393,110 @@ class RiskAnalyzer:
                 'calmar_ratio': 0.0,
                 'trade_sequence': {}
             }
+
+    def calculate_comprehensive_risk_metrics_np(self,
+                                               win_returns: np.ndarray,
+                                               lose_returns: np.ndarray) -> Dict:
+        """
+        包括的なリスク指標を計算（リターン配列版、トレードシーケンス分析は含まない）
+
+        Args:
+            win_returns: 勝ちトレードのリターン配列（%表示）
+            lose_returns: 負けトレードのリターン配列（%表示）
+
+        Returns:
+            Dict: リスク指標
+        """
+        returns = np.concatenate([
+            np.asarray(win_returns, dtype=np.float64),
+            np.asarray(lose_returns, dtype=np.float64)
+        ])
+        returns = returns[~np.isnan(returns)]
+
+        if returns.size == 0:
+            return {
+                'max_drawdown': self.calculate_max_drawdown(pd.Series(dtype=float)),
+                'var': self.calculate_var(pd.Series(dtype=float)),
+                'distribution': self.calculate_return_distribution(pd.Series(dtype=float)),
+                'sortino_ratio': 0.0,
+                'calmar_ratio': 0.0
+            }
+
+        # VaR・分布統計のパーセンタイル計算用に一度だけソート
+        sorted_returns = np.sort(returns)
+
+        # ドローダウンはトレード順の累積で計算するためソート前の配列を使う
+        max_drawdown = self.calculate_max_drawdown(pd.Series(returns))
+
+        return {
+            'max_drawdown': max_drawdown,
+            'var': self._var_from_sorted(sorted_returns),
+            'distribution': self._distribution_from_sorted(sorted_returns),
+            'sortino_ratio': self._sortino_ratio_np(returns),
+            'calmar_ratio': self._calmar_ratio_np(returns, max_drawdown)
+        }
+
+    def _var_from_sorted(self, sorted_returns: np.ndarray,
+                         confidence_level: float = 0.95) -> Dict:
+        """昇順ソート済みリターン配列からVaR/CVaRを計算（calculate_varと同じ定義）"""
+        var_95 = np.percentile(sorted_returns, (1 - 0.95) * 100)
+        var_99 = np.percentile(sorted_returns, (1 - 0.99) * 100)
+
+        # VaR以下のリターンはソート済み配列の先頭部分
+        count_95 = np.searchsorted(sorted_returns, var_95, side='right')
+        count_99 = np.searchsorted(sorted_returns, var_99, side='right')
+        cvar_95 = sorted_returns[:count_95].mean() if count_95 else var_95
+        cvar_99 = sorted_returns[:count_99].mean() if count_99 else var_99
+
+        return {
+            'var_95': float(var_95),
+            'var_99': float(var_99),
+            'cvar_95': float(cvar_95),
+            'cvar_99': float(cvar_99),
+            'confidence_level': confidence_level
+        }
+
+    def _distribution_from_sorted(self, sorted_returns: np.ndarray) -> Dict:
+        """昇順ソート済みリターン配列から分布統計を計算（calculate_return_distributionと同じ定義）"""
+        percentile_25, median, percentile_75 = np.percentile(sorted_returns, [25, 50, 75])
+        # pandasのstdと同じく不偏標準偏差（1件のみの場合はNaN）
+        std = np.std(sorted_returns, ddof=1) if sorted_returns.size > 1 else float('nan')
+
+        return {
+            'mean': float(sorted_returns.mean()),
+            'median': float(median),
+            'std': float(std),
+            'skewness': float(stats.skew(sorted_returns)),
+            'kurtosis': float(stats.kurtosis(sorted_returns)),
+            'min': float(sorted_returns[0]),
+            'max': float(sorted_returns[-1]),
+            'percentile_25': float(percentile_25),
+            'percentile_75': float(percentile_75)
+        }
+
+    def _sortino_ratio_np(self, returns: np.ndarray,
+                          target_return: float = 0.0,
+                          periods_per_year: int = 252) -> float:
+        """リターン配列からソルティノレシオを計算（calculate_sortino_ratioと同じ定義）"""
+        downside_returns = returns[returns < target_return]
+
+        if downside_returns.size == 0:
+            return float('inf')  # 下方リスクがない場合
+
+        downside_deviation = np.sqrt(np.mean((downside_returns - target_return) ** 2))
+
+        if downside_deviation == 0:
+            return 0.0
+
+        sortino_ratio = (returns.mean() - target_return) / downside_deviation
+        return float(sortino_ratio * np.sqrt(periods_per_year))
+
+    def _calmar_ratio_np(self, returns: np.ndarray, max_drawdown_info: Dict,
+                         periods_per_year: int = 252) -> float:
+        """リターン配列と計算済みの最大ドローダウンからカルマーレシオを計算"""
+        max_drawdown = abs(max_drawdown_info['max_drawdown'])
+
+        if max_drawdown == 0:
+            return 0.0
+
+        return float(returns.mean() * periods_per_year / max_drawdown)
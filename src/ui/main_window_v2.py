@@ -20,7 +20,7 @@ from typing import List, Dict, Any, Optional
 from ..core.database import DatabaseManager
 from ..core.calculator import OptimalTimingCalculator
 from ..core.data_fetcher import StockDataFetcher
-from .widgets import StockListWidget, DetailPanel, FilterPanel
+from .widgets import StockListWidget, DetailPanel, FilterPanel, FilterState
 
 
 class AnalysisWorker(QThread):
@@ -297,7 +297,7 @@ class MainWindow(QMainWindow):
                 f"データの読み込みに失敗しました。\n{str(e)}"
             )
 
-    def on_filter_changed(self, filters: Dict[str, Any]):
+    def on_filter_changed(self, filters: FilterState):
         """フィルター条件が変更された時の処理"""
         try:
             self.logger.debug(f"フィルター適用: {filters}")
@@ -306,20 +306,20 @@ class MainWindow(QMainWindow):
             filtered = self.all_stocks.copy()
 
             # 権利確定月でフィルター
-            if filters['rights_month'] is not None:
-                filtered = [s for s in filtered if s.get('rights_month') == filters['rights_month']]
+            if filters.rights_month is not None:
+                filtered = [s for s in filtered if s.get('rights_month') == filters.rights_month]
 
             # 勝率でフィルター（Noneを除外）
-            if filters['min_win_rate'] > 0:
-                filtered = [s for s in filtered if s.get('win_rate') is not None and s.get('win_rate') >= filters['min_win_rate']]
+            if filters.min_win_rate > 0:
+                filtered = [s for s in filtered if s.get('win_rate') is not None and s.get('win_rate') >= filters.min_win_rate]
 
             # 期待リターンでフィルター（Noneを除外）
-            if filters['min_expected_return'] > 0:
-                filtered = [s for s in filtered if s.get('expected_return') is not None and s.get('expected_return') >= filters['min_expected_return']]
+            if filters.min_expected_return > 0:
+                filtered = [s for s in filtered if s.get('expected_return') is not None and s.get('expected_return') >= filters.min_expected_return]
 
             # ソート
-            sort_by = filters['sort_by']
-            sort_order = filters['sort_order']
+            sort_by = filters.sort_by
+            sort_order = filters.sort_order
 
             if sort_by == 'code':
                 filtered.sort(key=lambda x: x.get('code', ''), reverse=(sort_order == 'desc'))
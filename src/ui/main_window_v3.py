@@ -24,7 +24,7 @@ import json
 from ..core.database import DatabaseManager
 from ..core.calculator import OptimalTimingCalculator
 from ..core.data_fetcher import StockDataFetcher
-from .widgets import StockListWidget, DetailPanel, FilterPanel, ComparisonPanel, PortfolioPanel
+from .widgets import StockListWidget, DetailPanel, FilterPanel, FilterState, ComparisonPanel, PortfolioPanel
 from .widgets.watchlist_widget import WatchlistWidget
 from .dialogs import SettingsDialog
 from .import_dialog import ImportDialog
@@ -643,22 +643,22 @@ class MainWindow(QMainWindow):
             self.logger.error(f"データ読み込みエラー: {e}", exc_info=True)
             self.status_bar.showMessage(f"エラー: {str(e)}")
 
-    def on_filter_changed(self, filters: Dict[str, Any]):
+    def on_filter_changed(self, filters: FilterState):
         """フィルター条件が変更された時の処理"""
         try:
             filtered = self.all_stocks.copy()
 
-            if filters['rights_month'] is not None:
-                filtered = [s for s in filtered if s.get('rights_month') == filters['rights_month']]
+            if filters.rights_month is not None:
+                filtered = [s for s in filtered if s.get('rights_month') == filters.rights_month]
 
-            if filters['min_win_rate'] > 0:
-                filtered = [s for s in filtered if s.get('win_rate') is not None and s.get('win_rate') >= filters['min_win_rate']]
+            if filters.min_win_rate > 0:
+                filtered = [s for s in filtered if s.get('win_rate') is not None and s.get('win_rate') >= filters.min_win_rate]
 
-            if filters['min_expected_return'] > 0:
-                filtered = [s for s in filtered if s.get('expected_return') is not None and s.get('expected_return') >= filters['min_expected_return']]
+            if filters.min_expected_return > 0:
+                filtered = [s for s in filtered if s.get('expected_return') is not None and s.get('expected_return') >= filters.min_expected_return]
 
-            sort_by = filters['sort_by']
-            sort_order = filters['sort_order']
+            sort_by = filters.sort_by
+            sort_order = filters.sort_order
 
             if sort_by == 'code':
                 filtered.sort(key=lambda x: x.get('code', ''), reverse=(sort_order == 'desc'))
@@ -846,29 +846,14 @@ class MainWindow(QMainWindow):
         if row < 0:
             return
 
-        code_item = self.stock_list_widget.table.item(row, 0)
-        month_item = self.stock_list_widget.table.item(row, 2)
-        if not code_item or not month_item:
-            return
-
-        code = code_item.text()
-        # 権利月から数値を抽出
-        month_text = month_item.text()
-        try:
-            rights_month = int(month_text.replace('月', ''))
-        except ValueError:
-            return
-
         # 該当する銘柄データを取得
-        stock_data = None
-        for stock in self.filtered_stocks:
-            if stock.get('code') == code and stock.get('rights_month') == rights_month:
-                stock_data = stock
-                break
-
+        stock_data = self.stock_list_widget.model.stock_at(row)
         if not stock_data:
             return
 
+        code = stock_data.get('code')
+        rights_month = stock_data.get('rights_month')
+
         menu = QMenu(self)
 
         # ウォッチリストに追加/削除
@@ -9,7 +9,7 @@ Date: 2024-11-07
 from .stock_list_widget import StockListWidget
 from .chart_widget import ChartWidget
 from .detail_panel import DetailPanel, StockInfoCard, DetailStatsTable
-from .filter_panel import FilterPanel
+from .filter_panel import FilterPanel, FilterState
 from .trade_history_widget import TradeHistoryWidget
 from .comparison_panel import ComparisonPanel
 from .portfolio_panel import PortfolioPanel
@@ -22,6 +22,7 @@ __all__ = [
     'StockInfoCard',
     'DetailStatsTable',
     'FilterPanel',
+    'FilterState',
     'TradeHistoryWidget',
     'ComparisonPanel',
     'PortfolioPanel',
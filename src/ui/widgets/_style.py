@@ -0,0 +1,27 @@
+"""
+Widget Style
+ウィジェット共通の配色・フォント
+
+Author: Yuutai Event Investor Team
+Date: 2025-01-11
+"""
+
+from functools import lru_cache
+from PySide6.QtGui import QFont, QColor
+
+
+# テーブルセルの共有色（行ごとに生成しない）
+COLOR_GREEN = QColor(16, 185, 129)
+COLOR_YELLOW = QColor(250, 204, 21)
+COLOR_RED = QColor(239, 68, 68)
+
+
+@lru_cache(maxsize=None)
+def get_font(point_size: int, bold: bool = False) -> QFont:
+    """
+    共有フォントを取得
+
+    QApplication生成前のimport時には作らず、初回使用時に構築して使い回す
+    （setFontはコピーするため共有して問題ない）
+    """
+    return QFont("Meiryo", point_size, QFont.Bold if bold else QFont.Normal)
@@ -21,12 +21,30 @@ from matplotlib.figure import Figure
 import platform
 
 
+class NumericTableWidgetItem(QTableWidgetItem):
+    """数値ソート用のカスタムQTableWidgetItem"""
+
+    def __init__(self, text: str, numeric_value: Optional[float] = None):
+        super().__init__(text)
+        self.numeric_value = numeric_value
+
+    def __lt__(self, other):
+        """ソート時の比較演算子"""
+        if isinstance(other, NumericTableWidgetItem):
+            # 両方が数値を持つ場合は数値で比較
+            self_val = self.numeric_value if self.numeric_value is not None else float('-inf')
+            other_val = other.numeric_value if other.numeric_value is not None else float('-inf')
+            return self_val < other_val
+        return super().__lt__(other)
+
+
 class ComparisonChartWidget(QWidget):
     """比較チャートウィジェット"""
 
     def __init__(self):
         super().__init__()
         self.logger = logging.getLogger(__name__)
+        self._last_n = 0  # 前回描画した銘柄数
         self.init_ui()
 
         # フォント設定
@@ -47,6 +65,14 @@ class ComparisonChartWidget(QWidget):
         self.canvas = FigureCanvasQTAgg(self.figure)
         layout.addWidget(self.canvas)
 
+    @staticmethod
+    def _style_axes(ax):
+        """軸の共通スタイル（目盛り・枠線・グリッド）を適用"""
+        ax.tick_params(colors='#E0E0E0')
+        for spine in ax.spines.values():
+            spine.set_color('#404040')
+        ax.grid(True, alpha=0.2, color='#404040')
+
     def plot_comparison(self, stocks_data: List[Dict]):
         """
         比較チャートをプロット
@@ -54,10 +80,16 @@ class ComparisonChartWidget(QWidget):
         Args:
             stocks_data: 銘柄データのリスト
         """
+        # 既に空のチャートを再度クリアしない
+        if not stocks_data and self._last_n == 0:
+            return
+
         try:
             self.figure.clear()
+            self._last_n = len(stocks_data)
 
             if not stocks_data:
+                self.canvas.draw_idle()
                 return
 
             # 2つのサブプロット: 期待リターン比較と勝率比較
@@ -75,19 +107,17 @@ class ComparisonChartWidget(QWidget):
                 expected_returns.append(stock.get('expected_return', 0))
                 win_rates.append(stock.get('win_rate', 0) * 100)
 
+            # バーの色は両グラフで共通
+            bar_colors = [colors[i % len(colors)] for i in range(len(stock_names))]
+
             # 期待リターン比較
             bars1 = ax1.bar(range(len(stock_names)), expected_returns,
-                           color=[colors[i % len(colors)] for i in range(len(stock_names))])
+                           color=bar_colors)
             ax1.set_ylabel('期待リターン (%)', color='#E0E0E0', fontsize=10)
             ax1.set_title('期待リターン比較', color='#E0E0E0', fontsize=12, fontweight='bold')
             ax1.set_xticks(range(len(stock_names)))
             ax1.set_xticklabels(stock_names, rotation=45, ha='right', color='#E0E0E0')
-            ax1.tick_params(colors='#E0E0E0')
-            ax1.spines['bottom'].set_color('#404040')
-            ax1.spines['top'].set_color('#404040')
-            ax1.spines['left'].set_color('#404040')
-            ax1.spines['right'].set_color('#404040')
-            ax1.grid(True, alpha=0.2, color='#404040')
+            self._style_axes(ax1)
             ax1.axhline(y=0, color='#666666', linestyle='--', linewidth=1)
 
             # 値をバーの上に表示
@@ -100,17 +130,12 @@ class ComparisonChartWidget(QWidget):
 
             # 勝率比較
             bars2 = ax2.bar(range(len(stock_names)), win_rates,
-                           color=[colors[i % len(colors)] for i in range(len(stock_names))])
+                           color=bar_colors)
             ax2.set_ylabel('勝率 (%)', color='#E0E0E0', fontsize=10)
             ax2.set_title('勝率比較', color='#E0E0E0', fontsize=12, fontweight='bold')
             ax2.set_xticks(range(len(stock_names)))
             ax2.set_xticklabels(stock_names, rotation=45, ha='right', color='#E0E0E0')
-            ax2.tick_params(colors='#E0E0E0')
-            ax2.spines['bottom'].set_color('#404040')
-            ax2.spines['top'].set_color('#404040')
-            ax2.spines['left'].set_color('#404040')
-            ax2.spines['right'].set_color('#404040')
-            ax2.grid(True, alpha=0.2, color='#404040')
+            self._style_axes(ax2)
             ax2.set_ylim(0, 100)
 
             # 50%のライン
@@ -132,7 +157,11 @@ class ComparisonChartWidget(QWidget):
 
     def clear(self):
         """チャートをクリア"""
+        if self._last_n == 0:
+            return
+
         self.figure.clear()
+        self._last_n = 0
         self.canvas.draw()
 
 
@@ -148,6 +177,7 @@ class ComparisonPanel(QWidget):
         self.logger = logging.getLogger(__name__)
         self.compared_stocks = []  # 比較中の銘柄リスト
         self.max_stocks = 5  # 最大比較銘柄数
+        self._last_count = -1  # 前回表示した銘柄数
         self.init_ui()
 
     def init_ui(self):
@@ -237,9 +267,13 @@ class ComparisonPanel(QWidget):
         chart_label.setStyleSheet("color: #E0E0E0;")
         layout.addWidget(chart_label)
 
-        self.chart_widget = ComparisonChartWidget()
-        self.chart_widget.setMinimumHeight(300)
-        layout.addWidget(self.chart_widget)
+        # チャートは最初の銘柄が追加されるまで生成しない（Matplotlib初期化の遅延）
+        self._chart_container = QWidget()
+        self._chart_container.setMinimumHeight(300)
+        self._chart_layout = QVBoxLayout(self._chart_container)
+        self._chart_layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self._chart_container)
+        self.chart_widget = None
 
     def create_comparison_table(self) -> QTableWidget:
         """比較テーブルを作成"""
@@ -291,6 +325,9 @@ class ComparisonPanel(QWidget):
 
         table.setMaximumHeight(250)
 
+        # ソート有効化（数値列はNumericTableWidgetItemで数値比較）
+        table.setSortingEnabled(True)
+
         return table
 
     def add_stock(self, stock_data: Dict) -> bool:
@@ -348,10 +385,11 @@ class ComparisonPanel(QWidget):
             rights_month: 権利確定月
         """
         try:
-            self.compared_stocks = [
-                s for s in self.compared_stocks
-                if not (s.get('code') == code and s.get('rights_month') == rights_month)
-            ]
+            # 一致は高々1件なので、見つけた時点で削除して打ち切る
+            for i, s in enumerate(self.compared_stocks):
+                if s.get('code') == code and s.get('rights_month') == rights_month:
+                    del self.compared_stocks[i]
+                    break
             self.update_display()
             self.stock_removed.emit(code)
             self.logger.info(f"比較リストから削除: {code}")
@@ -400,17 +438,31 @@ class ComparisonPanel(QWidget):
 
     def update_display(self):
         """表示を更新"""
-        # 銘柄数更新
-        self.count_label.setText(f"{len(self.compared_stocks)} / {self.max_stocks} 銘柄")
+        # 銘柄数更新（変化がなければ再描画を発生させない）
+        count = len(self.compared_stocks)
+        if count != self._last_count:
+            self.count_label.setText(f"{count} / {self.max_stocks} 銘柄")
+            self._last_count = count
 
         # テーブル更新
         self.update_table()
 
         # チャート更新
+        if not self.compared_stocks:
+            if self.chart_widget is not None:
+                self.chart_widget.clear()
+            return
+
+        if self.chart_widget is None:
+            self.chart_widget = ComparisonChartWidget()
+            self._chart_layout.addWidget(self.chart_widget)
+
         self.chart_widget.plot_comparison(self.compared_stocks)
 
     def update_table(self):
         """テーブルを更新"""
+        # ソートを一時的に無効化
+        self.comparison_table.setSortingEnabled(False)
         self.comparison_table.setRowCount(0)
 
         for stock in self.compared_stocks:
@@ -428,15 +480,15 @@ class ComparisonPanel(QWidget):
             code_item.setTextAlignment(Qt.AlignCenter)
             self.comparison_table.setItem(row, 1, code_item)
 
-            # 最適日数
+            # 最適日数（数値ソート対応）
             optimal_days = stock.get('optimal_days', 0)
-            days_item = QTableWidgetItem(f"{optimal_days}日前")
+            days_item = NumericTableWidgetItem(f"{optimal_days}日前", float(optimal_days))
             days_item.setTextAlignment(Qt.AlignCenter)
             self.comparison_table.setItem(row, 2, days_item)
 
-            # 勝率
+            # 勝率（数値ソート対応）
             win_rate = stock.get('win_rate', 0)
-            win_rate_item = QTableWidgetItem(f"{win_rate*100:.1f}%")
+            win_rate_item = NumericTableWidgetItem(f"{win_rate*100:.1f}%", float(win_rate))
             win_rate_item.setTextAlignment(Qt.AlignCenter)
             if win_rate >= 0.7:
                 win_rate_item.setForeground(QColor(16, 185, 129))
@@ -446,9 +498,9 @@ class ComparisonPanel(QWidget):
                 win_rate_item.setForeground(QColor(239, 68, 68))
             self.comparison_table.setItem(row, 3, win_rate_item)
 
-            # 期待リターン
+            # 期待リターン（数値ソート対応）
             expected_return = stock.get('expected_return', 0)
-            return_item = QTableWidgetItem(f"{expected_return:+.2f}%")
+            return_item = NumericTableWidgetItem(f"{expected_return:+.2f}%", float(expected_return))
             return_item.setTextAlignment(Qt.AlignCenter)
             if expected_return > 0:
                 return_item.setForeground(QColor(16, 185, 129))
@@ -456,9 +508,9 @@ class ComparisonPanel(QWidget):
                 return_item.setForeground(QColor(239, 68, 68))
             self.comparison_table.setItem(row, 4, return_item)
 
-            # 総トレード
+            # 総トレード（数値ソート対応）
             total_count = stock.get('total_count', 0)
-            count_item = QTableWidgetItem(str(total_count))
+            count_item = NumericTableWidgetItem(str(total_count), float(total_count))
             count_item.setTextAlignment(Qt.AlignCenter)
             self.comparison_table.setItem(row, 5, count_item)
 
@@ -481,6 +533,9 @@ class ComparisonPanel(QWidget):
             )
             self.comparison_table.setCellWidget(row, 6, remove_btn)
 
+        # ソートを再度有効化
+        self.comparison_table.setSortingEnabled(True)
+
     def get_compared_stocks(self) -> List[Dict]:
         """比較中の銘柄リストを取得"""
         return self.compared_stocks.copy()
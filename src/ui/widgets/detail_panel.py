@@ -8,15 +8,81 @@ Date: 2024-11-07
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QScrollArea, QFrame, QGridLayout, QSizePolicy
+    QScrollArea, QGridLayout
 )
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QFont, QColor
+from PySide6.QtCore import Qt, Signal, Slot, QTimer, QRectF
+from PySide6.QtGui import QColor, QFontMetrics, QPainter, QPixmap
 import logging
+from collections import OrderedDict
 from typing import Dict, Optional
 from .chart_widget import ChartWidget
 from .trade_history_widget import TradeHistoryWidget
 from .risk_metrics_widget import RiskMetricsWidget
+from ._style import get_font
+
+
+# コードバッジ画像のキャッシュ上限
+_BADGE_CACHE_SIZE = 128
+
+# 勝率の閾値と配色（valueState）の対応（上から順に判定）
+_WIN_RATE_STATES = (
+    (0.7, "positive"),
+    (0.5, "warning"),
+    (float('-inf'), "negative"),
+)
+
+
+def _win_rate_state(win_rate: float) -> str:
+    """勝率に対応するvalueStateを取得"""
+    # NaN はどの閾値とも比較が偽になるため、従来どおり "negative" とする
+    return next(
+        (state for threshold, state in _WIN_RATE_STATES if win_rate >= threshold),
+        "negative"
+    )
+
+
+def _set_value_state(label: QLabel, state: str):
+    """
+    値ラベルの配色を切り替え
+
+    setStyleSheetでの再パースの代わりにvalueStateプロパティを書き換え、
+    状態が変わったときだけ再ポリッシュする
+
+    Args:
+        label: 値ラベル
+        state: valueState（""はデフォルト色）
+    """
+    if label.property("valueState") == state:
+        return
+    label.setProperty("valueState", state)
+    style = label.style()
+    style.unpolish(label)
+    style.polish(label)
+
+
+class _StatEntry:
+    """統計項目のウィジェット参照（項目名・値ラベル）"""
+
+    __slots__ = ('title', 'value', 'last_text')
+
+    def __init__(self, title: QLabel, value: QLabel, text: str):
+        self.title = title
+        self.value = value
+        self.last_text = text
+
+
+def _set_stat_text(stat: _StatEntry, text: str):
+    """
+    統計値のテキストを更新（前回と同じ文字列ならsetTextしない）
+
+    Args:
+        stat: 統計項目
+        text: 表示文字列
+    """
+    if stat.last_text == text:
+        return
+    stat.value.setText(text)
+    stat.last_text = text
 
 
 class StockInfoCard(QWidget):
@@ -24,18 +90,14 @@ class StockInfoCard(QWidget):
 
     def __init__(self):
         super().__init__()
+        self._badge_cache = OrderedDict()  # バッジ文字列 -> QPixmap（LRU）
         self.init_ui()
 
     def init_ui(self):
         """UIを初期化"""
         self.setFixedHeight(220)
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #2D2D2D;
-                border-radius: 8px;
-                border: 1px solid #404040;
-            }
-        """)
+        self.setObjectName("detailCard")
+        self.setAttribute(Qt.WA_StyledBackground, True)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 15, 20, 15)
@@ -43,80 +105,129 @@ class StockInfoCard(QWidget):
 
         # タイトル行（コンテナでマージンを追加）
         title_container = QWidget()
-        title_container.setStyleSheet("border: none;")
         title_layout = QHBoxLayout(title_container)
         title_layout.setContentsMargins(12, 0, 12, 0)
         title_layout.setSpacing(10)
 
         self.name_label = QLabel("銘柄を選択してください")
-        self.name_label.setFont(QFont("Meiryo", 14, QFont.Bold))
-        self.name_label.setStyleSheet("color: #E0E0E0; border: none;")
+        self.name_label.setFont(get_font(14, bold=True))
+        self.name_label.setObjectName("cardTitle")
         title_layout.addWidget(self.name_label)
 
         title_layout.addStretch()
 
         self.code_label = QLabel("")
-        self.code_label.setFont(QFont("Meiryo", 11))
-        self.code_label.setStyleSheet("""
-            color: #B0B0B0;
-            border: none;
-            background-color: #3A3A3A;
-            border-radius: 12px;
-            padding: 4px 12px;
-        """)
+        self.code_label.setFont(get_font(11))
+        self.code_label.setObjectName("codeBadge")
         title_layout.addWidget(self.code_label)
 
         layout.addWidget(title_container)
 
-        # 統計情報グリッド
+        # 統計情報グリッド（項目名と値を行ごとのコンテナなしで直接配置）
+        # 列: 0=項目名, 1=値, 2=区切り, 3=項目名, 4=値
         self.stats_grid = QGridLayout()
-        self.stats_grid.setSpacing(15)
+        self.stats_grid.setContentsMargins(12, 6, 12, 6)
+        self.stats_grid.setHorizontalSpacing(10)
+        self.stats_grid.setVerticalSpacing(27)
+        self.stats_grid.setColumnStretch(0, 1)
+        self.stats_grid.setColumnStretch(3, 1)
+        self.stats_grid.setColumnMinimumWidth(2, 20)
 
         # ラベルを作成
-        self.optimal_days_label = self._create_stat_label("最適買入日", "-", "#1E90FF")
-        self.win_rate_label = self._create_stat_label("勝率", "-", "#10B981")
-        self.expected_return_label = self._create_stat_label("期待リターン", "-", "#FACC15")
-        self.avg_win_label = self._create_stat_label("平均勝ち", "-", "#10B981")
-        self.avg_lose_label = self._create_stat_label("平均負け", "-", "#EF4444")
-        self.total_trades_label = self._create_stat_label("総トレード", "-", "#B0B0B0")
+        self.optimal_days_label = self._create_stat_label("最適買入日", "-", "accent")
+        self.win_rate_label = self._create_stat_label("勝率", "-", "positive")
+        self.expected_return_label = self._create_stat_label("期待リターン", "-", "warning")
+        self.avg_win_label = self._create_stat_label("平均勝ち", "-", "positive")
+        self.avg_lose_label = self._create_stat_label("平均負け", "-", "negative")
+        self.total_trades_label = self._create_stat_label("総トレード", "-", "neutral")
+        self._stat_entries = (
+            self.optimal_days_label, self.win_rate_label, self.expected_return_label,
+            self.total_trades_label, self.avg_win_label, self.avg_lose_label
+        )
 
         # グリッドに配置（3x2）
-        self.stats_grid.addWidget(self.optimal_days_label['container'], 0, 0)
-        self.stats_grid.addWidget(self.win_rate_label['container'], 0, 1)
-        self.stats_grid.addWidget(self.expected_return_label['container'], 1, 0)
-        self.stats_grid.addWidget(self.total_trades_label['container'], 1, 1)
-        self.stats_grid.addWidget(self.avg_win_label['container'], 2, 0)
-        self.stats_grid.addWidget(self.avg_lose_label['container'], 2, 1)
+        self._add_to_grid(self.optimal_days_label, 0, 0)
+        self._add_to_grid(self.win_rate_label, 0, 1)
+        self._add_to_grid(self.expected_return_label, 1, 0)
+        self._add_to_grid(self.total_trades_label, 1, 1)
+        self._add_to_grid(self.avg_win_label, 2, 0)
+        self._add_to_grid(self.avg_lose_label, 2, 1)
 
         layout.addLayout(self.stats_grid)
 
-    def _create_stat_label(self, title: str, value: str, color: str) -> Dict:
-        """統計ラベルを作成"""
-        container = QWidget()
-        container.setStyleSheet("border: none;")
-        container_layout = QHBoxLayout(container)
-        container_layout.setContentsMargins(12, 6, 12, 6)
-        container_layout.setSpacing(10)
+    def _badge_pixmap(self, text: str) -> QPixmap:
+        """
+        コードバッジ（角丸背景+文字）の画像を取得
+
+        銘柄を切り替えるたびにQSSの角丸・余白を再計算しないよう、
+        描画済みの画像を文字列ごとにキャッシュする
 
+        Args:
+            text: バッジに表示する文字列
+
+        Returns:
+            QPixmap: バッジ画像
+        """
+        pixmap = self._badge_cache.get(text)
+        if pixmap is not None:
+            self._badge_cache.move_to_end(text)
+            return pixmap
+
+        font = self.code_label.font()
+        metrics = QFontMetrics(font)
+        width = metrics.horizontalAdvance(text) + 24
+        height = metrics.height() + 8
+        rect = QRectF(0, 0, width, height)
+
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(width * ratio), int(height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#3A3A3A"))
+        radius = min(12, height / 2)
+        painter.drawRoundedRect(rect, radius, radius)
+        painter.setFont(font)
+        painter.setPen(QColor("#B0B0B0"))
+        painter.drawText(rect, Qt.AlignCenter, text)
+        painter.end()
+
+        self._badge_cache[text] = pixmap
+        if len(self._badge_cache) > _BADGE_CACHE_SIZE:
+            self._badge_cache.popitem(last=False)
+        return pixmap
+
+    def _create_stat_label(self, title: str, value: str, state: str) -> _StatEntry:
+        """
+        統計ラベルを作成
+
+        Args:
+            title: 項目名
+            value: 初期表示値
+            state: 値ラベルの配色（DetailPanelのスタイルシートのvalueState）
+        """
         # タイトル
         title_label = QLabel(title)
-        title_label.setFont(QFont("Meiryo", 10))
-        title_label.setStyleSheet("color: #B0B0B0; border: none;")
-        container_layout.addWidget(title_label)
-
-        container_layout.addStretch()
+        title_label.setFont(get_font(10))
+        title_label.setObjectName("statTitle")
 
         # 値
         value_label = QLabel(value)
-        value_label.setFont(QFont("Meiryo", 10, QFont.Bold))
-        value_label.setStyleSheet(f"color: {color}; border: none;")
-        container_layout.addWidget(value_label)
+        value_label.setFont(get_font(10, bold=True))
+        value_label.setObjectName("statValue")
+        value_label.setProperty("valueState", state)
+        value_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
+        return _StatEntry(title_label, value_label, value)
 
-        return {
-            'container': container,
-            'title': title_label,
-            'value': value_label
-        }
+    def _add_to_grid(self, stat: _StatEntry, row: int, column: int):
+        """統計項目をグリッドの指定位置（row行・column番目の組）に配置"""
+        col = column * 3
+        self.stats_grid.addWidget(stat.title, row, col)
+        self.stats_grid.addWidget(stat.value, row, col + 1)
 
     def update_stock_info(self, stock_data: Dict, result_data: Optional[Dict] = None):
         """
@@ -130,65 +241,55 @@ class StockInfoCard(QWidget):
         name = stock_data.get('name', '不明')
         code = stock_data.get('code', '')
         self.name_label.setText(name)
-        self.code_label.setText(f"({code})" if code else "")
+        if code:
+            self.code_label.setPixmap(self._badge_pixmap(f"({code})"))
+        else:
+            self.code_label.clear()
 
         # 結果データがある場合は統計情報を更新
         if result_data:
             # 最適買入日
             optimal_days = result_data.get('optimal_days', 0)
-            self.optimal_days_label['value'].setText(f"{optimal_days}日前")
+            _set_stat_text(self.optimal_days_label, f"{optimal_days}日前")
 
             # 勝率
             win_rate = result_data.get('win_rate', 0)
-            self.win_rate_label['value'].setText(f"{win_rate*100:.1f}%")
+            _set_stat_text(self.win_rate_label, f"{win_rate*100:.1f}%")
             # 勝率によって色を変更
-            if win_rate >= 0.7:
-                self.win_rate_label['value'].setStyleSheet("color: #10B981; border: none; font-weight: bold;")
-            elif win_rate >= 0.5:
-                self.win_rate_label['value'].setStyleSheet("color: #FACC15; border: none; font-weight: bold;")
-            else:
-                self.win_rate_label['value'].setStyleSheet("color: #EF4444; border: none; font-weight: bold;")
+            _set_value_state(self.win_rate_label.value, _win_rate_state(win_rate))
 
             # 期待リターン
             expected_return = result_data.get('expected_return', 0)
-            self.expected_return_label['value'].setText(f"{expected_return:+.2f}%")
+            _set_stat_text(self.expected_return_label, f"{expected_return:+.2f}%")
             # プラスマイナスで色を変更
-            color = "#10B981" if expected_return > 0 else "#EF4444" if expected_return < 0 else "#B0B0B0"
-            self.expected_return_label['value'].setStyleSheet(f"color: {color}; border: none; font-weight: bold;")
+            state = "positive" if expected_return > 0 else "negative" if expected_return < 0 else "neutral"
+            _set_value_state(self.expected_return_label.value, state)
 
             # 総トレード数
             total_trades = result_data.get('total_count', 0)
-            self.total_trades_label['value'].setText(f"{total_trades}回")
-            self.total_trades_label['value'].setStyleSheet("color: #B0B0B0; border: none; font-weight: bold;")
+            _set_stat_text(self.total_trades_label, f"{total_trades}回")
+            _set_value_state(self.total_trades_label.value, "neutral")
 
             # 平均勝ちリターン
             avg_win = result_data.get('avg_win_return', 0)
-            self.avg_win_label['value'].setText(f"{avg_win:+.2f}%")
-            self.avg_win_label['value'].setStyleSheet("color: #10B981; border: none; font-weight: bold;")
+            _set_stat_text(self.avg_win_label, f"{avg_win:+.2f}%")
+            _set_value_state(self.avg_win_label.value, "positive")
 
             # 平均負けリターン
             avg_lose = result_data.get('avg_lose_return', 0)
-            self.avg_lose_label['value'].setText(f"{avg_lose:+.2f}%")
-            self.avg_lose_label['value'].setStyleSheet("color: #EF4444; border: none; font-weight: bold;")
+            _set_stat_text(self.avg_lose_label, f"{avg_lose:+.2f}%")
+            _set_value_state(self.avg_lose_label.value, "negative")
         else:
             # デフォルト値
-            self.optimal_days_label['value'].setText("-")
-            self.win_rate_label['value'].setText("-")
-            self.expected_return_label['value'].setText("-")
-            self.total_trades_label['value'].setText("-")
-            self.avg_win_label['value'].setText("-")
-            self.avg_lose_label['value'].setText("-")
+            for stat in self._stat_entries:
+                _set_stat_text(stat, "-")
 
     def clear(self):
         """カードをクリア"""
         self.name_label.setText("銘柄を選択してください")
-        self.code_label.setText("")
-        self.optimal_days_label['value'].setText("-")
-        self.win_rate_label['value'].setText("-")
-        self.expected_return_label['value'].setText("-")
-        self.total_trades_label['value'].setText("-")
-        self.avg_win_label['value'].setText("-")
-        self.avg_lose_label['value'].setText("-")
+        self.code_label.clear()
+        for stat in self._stat_entries:
+            _set_stat_text(stat, "-")
 
 
 class DetailStatsTable(QWidget):
@@ -200,13 +301,8 @@ class DetailStatsTable(QWidget):
 
     def init_ui(self):
         """UIを初期化"""
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #2D2D2D;
-                border-radius: 8px;
-                border: 1px solid #404040;
-            }
-        """)
+        self.setObjectName("detailCard")
+        self.setAttribute(Qt.WA_StyledBackground, True)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 15, 20, 15)
@@ -214,22 +310,24 @@ class DetailStatsTable(QWidget):
 
         # タイトル（データ行と同じスタイル）
         title_container = QWidget()
-        title_container.setStyleSheet("border: none;")
         title_layout = QHBoxLayout(title_container)
         title_layout.setContentsMargins(12, 6, 12, 6)
         title_layout.setSpacing(0)
 
         title = QLabel("詳細統計")
-        title.setFont(QFont("Meiryo", 11, QFont.Bold))
-        title.setStyleSheet("color: #E0E0E0; border: none;")
+        title.setFont(get_font(11, bold=True))
+        title.setObjectName("cardTitle")
         title_layout.addWidget(title)
         title_layout.addStretch()
 
         layout.addWidget(title_container)
 
-        # 統計情報グリッド
-        self.stats_layout = QVBoxLayout()
-        self.stats_layout.setSpacing(8)
+        # 統計情報グリッド（列: 0=項目名, 1=値）
+        self.stats_layout = QGridLayout()
+        self.stats_layout.setContentsMargins(12, 6, 12, 6)
+        self.stats_layout.setHorizontalSpacing(10)
+        self.stats_layout.setVerticalSpacing(20)
+        self.stats_layout.setColumnStretch(0, 1)
 
         # 各統計項目
         self.total_trades_label = self._create_stat_row("総トレード数", "-")
@@ -239,38 +337,31 @@ class DetailStatsTable(QWidget):
         self.max_loss_label = self._create_stat_row("最大損失", "-")
         self.avg_win_label = self._create_stat_row("平均勝ちリターン", "-")
         self.avg_loss_label = self._create_stat_row("平均負けリターン", "-")
+        self._stat_entries = (
+            self.total_trades_label, self.win_count_label, self.lose_count_label,
+            self.max_return_label, self.max_loss_label, self.avg_win_label, self.avg_loss_label
+        )
 
         layout.addLayout(self.stats_layout)
 
-    def _create_stat_row(self, label: str, value: str) -> Dict:
+    def _create_stat_row(self, label: str, value: str) -> _StatEntry:
         """統計行を作成"""
-        row = QWidget()
-        row.setStyleSheet("border: none;")
-        row_layout = QHBoxLayout(row)
-        row_layout.setContentsMargins(12, 6, 12, 6)
-        row_layout.setSpacing(10)
+        row = self.stats_layout.count() // 2
 
         # ラベル
         label_widget = QLabel(label)
-        label_widget.setFont(QFont("Meiryo", 10))
-        label_widget.setStyleSheet("color: #B0B0B0; border: none;")
-        row_layout.addWidget(label_widget)
-
-        row_layout.addStretch()
+        label_widget.setFont(get_font(10))
+        label_widget.setObjectName("statTitle")
+        self.stats_layout.addWidget(label_widget, row, 0)
 
         # 値
         value_widget = QLabel(value)
-        value_widget.setFont(QFont("Meiryo", 10, QFont.Bold))
-        value_widget.setStyleSheet("color: #E0E0E0; border: none;")
-        row_layout.addWidget(value_widget)
-
-        self.stats_layout.addWidget(row)
+        value_widget.setFont(get_font(10, bold=True))
+        value_widget.setObjectName("statValue")
+        value_widget.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.stats_layout.addWidget(value_widget, row, 1)
 
-        return {
-            'container': row,
-            'label': label_widget,
-            'value': value_widget
-        }
+        return _StatEntry(label_widget, value_widget, value)
 
     def update_stats(self, result_data: Dict):
         """
@@ -281,44 +372,43 @@ class DetailStatsTable(QWidget):
         """
         # 総トレード数
         total_trades = result_data.get('total_count', 0)
-        self.total_trades_label['value'].setText(f"{total_trades}回")
+        _set_stat_text(self.total_trades_label, f"{total_trades}回")
 
         # 勝ちトレード数
         win_count = result_data.get('win_count', 0)
-        self.win_count_label['value'].setText(f"{win_count}回")
-        self.win_count_label['value'].setStyleSheet("color: #10B981; border: none; font-weight: bold;")
+        _set_stat_text(self.win_count_label, f"{win_count}回")
+        _set_value_state(self.win_count_label.value, "positive")
 
         # 負けトレード数
         lose_count = result_data.get('lose_count', 0)
-        self.lose_count_label['value'].setText(f"{lose_count}回")
-        self.lose_count_label['value'].setStyleSheet("color: #EF4444; border: none; font-weight: bold;")
+        _set_stat_text(self.lose_count_label, f"{lose_count}回")
+        _set_value_state(self.lose_count_label.value, "negative")
 
         # 最大リターン
         max_return = result_data.get('max_win_return', 0)
-        self.max_return_label['value'].setText(f"{max_return:+.2f}%")
-        self.max_return_label['value'].setStyleSheet("color: #10B981; border: none; font-weight: bold;")
+        _set_stat_text(self.max_return_label, f"{max_return:+.2f}%")
+        _set_value_state(self.max_return_label.value, "positive")
 
         # 最大損失
         max_loss = result_data.get('max_lose_return', 0)
-        self.max_loss_label['value'].setText(f"{max_loss:+.2f}%")
-        self.max_loss_label['value'].setStyleSheet("color: #EF4444; border: none; font-weight: bold;")
+        _set_stat_text(self.max_loss_label, f"{max_loss:+.2f}%")
+        _set_value_state(self.max_loss_label.value, "negative")
 
         # 平均勝ちリターン
         avg_win = result_data.get('avg_win_return', 0)
-        self.avg_win_label['value'].setText(f"{avg_win:+.2f}%")
-        self.avg_win_label['value'].setStyleSheet("color: #10B981; border: none; font-weight: bold;")
+        _set_stat_text(self.avg_win_label, f"{avg_win:+.2f}%")
+        _set_value_state(self.avg_win_label.value, "positive")
 
         # 平均負けリターン
         avg_loss = result_data.get('avg_lose_return', 0)
-        self.avg_loss_label['value'].setText(f"{avg_loss:+.2f}%")
-        self.avg_loss_label['value'].setStyleSheet("color: #EF4444; border: none; font-weight: bold;")
+        _set_stat_text(self.avg_loss_label, f"{avg_loss:+.2f}%")
+        _set_value_state(self.avg_loss_label.value, "negative")
 
     def clear(self):
         """テーブルをクリア"""
-        for stat_label in [self.total_trades_label, self.win_count_label, self.lose_count_label,
-                           self.max_return_label, self.max_loss_label, self.avg_win_label, self.avg_loss_label]:
-            stat_label['value'].setText("-")
-            stat_label['value'].setStyleSheet("color: #E0E0E0; border: none; font-weight: bold;")
+        for stat in self._stat_entries:
+            _set_stat_text(stat, "-")
+            _set_value_state(stat.value, "")
 
 
 class DetailPanel(QWidget):
@@ -333,6 +423,14 @@ class DetailPanel(QWidget):
         self.logger = logging.getLogger(__name__)
         self.current_stock = None
         self.current_result = None
+        self._current_result_keys = None  # 表示時点の結果データのキー構成
+
+        # 連続した銘柄選択をまとめて1回だけ反映するためのタイマー
+        self._pending_update = None
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(50)
+        self._update_timer.timeout.connect(self._apply_pending_update)
 
         self.init_ui()
 
@@ -341,29 +439,12 @@ class DetailPanel(QWidget):
         # スクロールエリアを作成
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
-        scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: #1E1E1E;
-            }
-            QScrollBar:vertical {
-                background-color: #2D2D2D;
-                width: 12px;
-                border-radius: 6px;
-            }
-            QScrollBar::handle:vertical {
-                background-color: #404040;
-                border-radius: 6px;
-                min-height: 20px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background-color: #4A4A4A;
-            }
-        """)
+        scroll_area.setObjectName("detailScroll")
 
         # スクロール可能なコンテンツウィジェット
         content_widget = QWidget()
         content_layout = QVBoxLayout(content_widget)
+        self.content_layout = content_layout
         content_layout.setContentsMargins(10, 10, 10, 10)
         content_layout.setSpacing(15)
 
@@ -371,8 +452,8 @@ class DetailPanel(QWidget):
         # タイトル
         # ========================================
         title = QLabel("📈 詳細分析")
-        title.setFont(QFont("Meiryo", 14, QFont.Bold))
-        title.setStyleSheet("color: #1E90FF;")
+        title.setFont(get_font(14, bold=True))
+        title.setObjectName("panelTitle")
         content_layout.addWidget(title)
 
         # ========================================
@@ -382,11 +463,11 @@ class DetailPanel(QWidget):
         content_layout.addWidget(self.info_card)
 
         # ========================================
-        # チャート
+        # チャート（最初の結果データ表示時に生成）
         # ========================================
-        self.chart_widget = ChartWidget()
-        self.chart_widget.setMinimumHeight(400)
-        content_layout.addWidget(self.chart_widget)
+        self.chart_widget = None
+        self._chart_placeholder = QWidget()
+        content_layout.addWidget(self._chart_placeholder)
 
         # ========================================
         # 詳細統計テーブル
@@ -395,18 +476,18 @@ class DetailPanel(QWidget):
         content_layout.addWidget(self.stats_table)
 
         # ========================================
-        # トレード履歴ウィジェット
+        # トレード履歴ウィジェット（最初のトレードデータ表示時に生成）
         # ========================================
-        self.trade_history_widget = TradeHistoryWidget()
-        self.trade_history_widget.setMinimumHeight(400)
-        content_layout.addWidget(self.trade_history_widget)
+        self.trade_history_widget = None
+        self._trade_history_placeholder = QWidget()
+        content_layout.addWidget(self._trade_history_placeholder)
 
         # ========================================
-        # リスク指標ウィジェット
+        # リスク指標ウィジェット（最初のトレードデータ表示時に生成）
         # ========================================
-        self.risk_metrics_widget = RiskMetricsWidget()
-        self.risk_metrics_widget.setMinimumHeight(400)
-        content_layout.addWidget(self.risk_metrics_widget)
+        self.risk_metrics_widget = None
+        self._risk_metrics_placeholder = QWidget()
+        content_layout.addWidget(self._risk_metrics_placeholder)
 
         content_layout.addStretch()
 
@@ -417,6 +498,113 @@ class DetailPanel(QWidget):
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.addWidget(scroll_area)
 
+        # スタイルシート適用
+        self.apply_styles()
+
+    def apply_styles(self):
+        """
+        スタイルシートを適用
+
+        子ウィジェットごとにsetStyleSheetせず、objectNameとvalueStateプロパティで
+        パネル全体のスタイルシートから一括で解決する
+        """
+        self.setStyleSheet("""
+            QScrollArea#detailScroll {
+                border: none;
+                background-color: #1E1E1E;
+            }
+            #detailScroll QScrollBar:vertical {
+                background-color: #2D2D2D;
+                width: 12px;
+                border-radius: 6px;
+            }
+            #detailScroll QScrollBar::handle:vertical {
+                background-color: #404040;
+                border-radius: 6px;
+                min-height: 20px;
+            }
+            #detailScroll QScrollBar::handle:vertical:hover {
+                background-color: #4A4A4A;
+            }
+            #panelTitle {
+                color: #1E90FF;
+            }
+            #detailCard {
+                background-color: #2D2D2D;
+                border-radius: 8px;
+                border: 1px solid #404040;
+            }
+            #cardTitle {
+                color: #E0E0E0;
+            }
+            #statTitle {
+                color: #B0B0B0;
+            }
+            #statValue {
+                color: #E0E0E0;
+                font-weight: bold;
+            }
+            #statValue[valueState="accent"] {
+                color: #1E90FF;
+            }
+            #statValue[valueState="positive"] {
+                color: #10B981;
+            }
+            #statValue[valueState="warning"] {
+                color: #FACC15;
+            }
+            #statValue[valueState="negative"] {
+                color: #EF4444;
+            }
+            #statValue[valueState="neutral"] {
+                color: #B0B0B0;
+            }
+        """)
+
+    def _mount_widget(self, placeholder: QWidget, widget: QWidget) -> QWidget:
+        """プレースホルダーを実ウィジェットに差し替える"""
+        widget.setMinimumHeight(400)
+        self.content_layout.replaceWidget(placeholder, widget)
+        placeholder.deleteLater()
+        return widget
+
+    def _ensure_chart_widget(self) -> ChartWidget:
+        """チャートウィジェットを必要になった時点で生成"""
+        if self.chart_widget is None:
+            self.chart_widget = self._mount_widget(self._chart_placeholder, ChartWidget())
+            self._chart_placeholder = None
+        return self.chart_widget
+
+    def _ensure_trade_widgets(self):
+        """トレード履歴・リスク指標ウィジェットを必要になった時点で生成"""
+        if self.trade_history_widget is None:
+            self.trade_history_widget = self._mount_widget(
+                self._trade_history_placeholder, TradeHistoryWidget()
+            )
+            self._trade_history_placeholder = None
+        if self.risk_metrics_widget is None:
+            self.risk_metrics_widget = self._mount_widget(
+                self._risk_metrics_placeholder, RiskMetricsWidget()
+            )
+            self._risk_metrics_placeholder = None
+
+    def _clear_lazy_widgets(self):
+        """生成済みのチャート・トレード履歴・リスク指標をクリア"""
+        for widget in (self.chart_widget, self.trade_history_widget, self.risk_metrics_widget):
+            if widget is not None:
+                widget.clear()
+
+    def _is_current_display(self, stock_data: Dict, result_data: Optional[Dict]) -> bool:
+        """表示中の銘柄（コード・権利月）・結果データと同じか"""
+        if self.current_stock is None or result_data is not self.current_result:
+            return False
+        if (self.current_stock.get('code') != stock_data.get('code') or
+                self.current_stock.get('rights_month') != stock_data.get('rights_month')):
+            return False
+        # 結果データには後からトレード詳細が追加されるため、キー構成も比較する
+        return result_data is None or result_data.keys() == self._current_result_keys
+
+    @Slot(dict, object, bool)
     def update_stock_detail(self, stock_data: Dict, result_data: Optional[Dict] = None, emit_completed: bool = False):
         """
         銘柄詳細を更新
@@ -425,22 +613,73 @@ class DetailPanel(QWidget):
             stock_data: 銘柄データ
             result_data: バックテスト結果データ
             emit_completed: バックテスト完了シグナルを発火するか（新しいバックテスト完了時のみTrue）
+
+        Note:
+            キー操作などで連続して呼ばれた場合は50ms待って最後の内容だけを反映する。
+            新しいバックテスト完了時（emit_completed=True）は待たずに反映する。
         """
+        self._pending_update = (stock_data, result_data, emit_completed)
+        if emit_completed:
+            self._update_timer.stop()
+            self._apply_pending_update()
+        else:
+            self._update_timer.start()
+
+    @Slot()
+    def _apply_pending_update(self):
+        """保留中の銘柄詳細更新を反映"""
+        if self._pending_update is None:
+            return
+        stock_data, result_data, emit_completed = self._pending_update
+        self._pending_update = None
+
+        # 表示中と同じ銘柄・同じ結果なら再描画しない（タブ切り替えや再選択時）
+        if not emit_completed and self._is_current_display(stock_data, result_data):
+            return
+
         self.current_stock = stock_data
         self.current_result = result_data
+        self._current_result_keys = set(result_data) if result_data else None
+
+        self.logger.info("銘柄詳細を更新: %s - %s", stock_data.get('code'), stock_data.get('name'))
+
+        # 子ウィジェットの更新中は再描画を止め、最後にまとめて1回描画する
+        self.setUpdatesEnabled(False)
+        try:
+            self._refresh_children(stock_data, result_data)
+        finally:
+            self.content_layout.activate()
+            self.setUpdatesEnabled(True)
+            self.update()
+
+        # バックテスト完了シグナルを発信（グリッド更新のため）
+        # emit_completedがTrueの場合のみ（新しいバックテスト完了時）
+        # 受信側からの再入を避けるため、次のイベントループで発火する
+        if result_data and emit_completed:
+            code = stock_data.get('code')
+            rights_month = stock_data.get('rights_month')
+            if code and rights_month:
+                QTimer.singleShot(0, lambda: self.backtest_completed.emit(code, rights_month))
+
+    def _refresh_children(self, stock_data: Dict, result_data: Optional[Dict]):
+        """
+        子ウィジェットに銘柄データを反映
 
-        self.logger.info(f"銘柄詳細を更新: {stock_data.get('code')} - {stock_data.get('name')}")
-
+        Args:
+            stock_data: 銘柄データ
+            result_data: バックテスト結果データ
+        """
         # 銘柄情報カードを更新
         self.info_card.update_stock_info(stock_data, result_data)
 
         # 結果データがある場合はチャートと統計を更新
         if result_data:
-            self.chart_widget.plot_data(result_data)
+            self._ensure_chart_widget().plot_data(result_data)
             self.stats_table.update_stats(result_data)
 
             # トレード履歴ウィジェットを更新
             if 'win_trades' in result_data and 'lose_trades' in result_data:
+                self._ensure_trade_widgets()
                 self.trade_history_widget.load_trade_data(result_data)
 
                 # リスク指標ウィジェットを更新
@@ -450,28 +689,21 @@ class DetailPanel(QWidget):
                 )
             else:
                 self.logger.warning("トレード履歴データが結果に含まれていません")
-                self.trade_history_widget.clear()
-                self.risk_metrics_widget.clear()
-
-            # バックテスト完了シグナルを発信（グリッド更新のため）
-            # emit_completedがTrueの場合のみ（新しいバックテスト完了時）
-            if emit_completed:
-                code = stock_data.get('code')
-                rights_month = stock_data.get('rights_month')
-                if code and rights_month:
-                    self.backtest_completed.emit(code, rights_month)
+                if self.trade_history_widget is not None:
+                    self.trade_history_widget.clear()
+                if self.risk_metrics_widget is not None:
+                    self.risk_metrics_widget.clear()
         else:
-            self.chart_widget.clear()
             self.stats_table.clear()
-            self.trade_history_widget.clear()
-            self.risk_metrics_widget.clear()
+            self._clear_lazy_widgets()
 
+    @Slot()
     def clear(self):
         """パネルをクリア"""
+        self._update_timer.stop()
+        self._pending_update = None
         self.current_stock = None
         self.current_result = None
         self.info_card.clear()
-        self.chart_widget.clear()
         self.stats_table.clear()
-        self.trade_history_widget.clear()
-        self.risk_metrics_widget.clear()
+        self._clear_lazy_widgets()
@@ -10,25 +10,221 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QComboBox, QSlider, QSpinBox, QPushButton, QFrame
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, Slot, QTimer, QSignalBlocker
 from PySide6.QtGui import QFont
 import logging
-from typing import Dict, Any
+from contextlib import contextmanager
+from typing import Dict, Any, NamedTuple, Optional, Union
+
+
+class FilterState(NamedTuple):
+    """フィルター条件"""
+    rights_month: Optional[int]   # 権利確定月（Noneは全て）
+    min_win_rate: float           # 最低勝率（0.0〜1.0）
+    min_expected_return: float    # 最低期待リターン（%）
+    max_amount: int               # 上限投資金額（円）
+    sort_by: str                  # 並び替え項目
+    sort_order: str               # 並び替え順序（'asc' / 'desc'）
+
+
+# パネル全体のスタイル（パネルに1回だけ設定し、子ウィジェットはセレクタで解決する）
+_PANEL_STYLE = """
+    QLabel#panelTitle {
+        color: #E0E0E0;
+    }
+    QLabel#sectionTitle {
+        color: #B0B0B0;
+    }
+    QLabel#winRateValue, QLabel#returnValue {
+        color: #1E90FF;
+    }
+    QFrame#separator {
+        background-color: #404040;
+    }
+    QComboBox {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        border-radius: 4px;
+        padding: 5px 10px;
+        min-height: 25px;
+    }
+    QComboBox:hover {
+        border: 1px solid #4682B4;
+    }
+    QComboBox:focus {
+        border: 1px solid #1E90FF;
+    }
+    QComboBox::drop-down {
+        border: none;
+        padding-right: 10px;
+    }
+    QComboBox::down-arrow {
+        image: none;
+        border-left: 4px solid transparent;
+        border-right: 4px solid transparent;
+        border-top: 6px solid #B0B0B0;
+        margin-right: 5px;
+    }
+    QComboBox QAbstractItemView {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        selection-background-color: #1E90FF;
+        selection-color: white;
+        border: 1px solid #404040;
+    }
+    QSlider::groove:horizontal {
+        background: #2D2D2D;
+        height: 6px;
+        border-radius: 3px;
+        border: 1px solid #404040;
+    }
+    QSlider::handle:horizontal {
+        background: #1E90FF;
+        width: 16px;
+        height: 16px;
+        margin: -6px 0;
+        border-radius: 8px;
+    }
+    QSlider::handle:horizontal:hover {
+        background: #4682B4;
+    }
+    QSlider::sub-page:horizontal {
+        background: #1E90FF;
+        border-radius: 3px;
+    }
+    QSpinBox {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        border-radius: 4px;
+        padding: 5px 10px;
+        min-height: 25px;
+    }
+    QSpinBox:hover {
+        border: 1px solid #4682B4;
+    }
+    QSpinBox:focus {
+        border: 1px solid #1E90FF;
+    }
+    QSpinBox::up-button, QSpinBox::down-button {
+        background-color: #3A3A3A;
+        border: none;
+        width: 16px;
+    }
+    QSpinBox::up-button:hover, QSpinBox::down-button:hover {
+        background-color: #404040;
+    }
+    QSpinBox::up-arrow {
+        image: none;
+        border-left: 4px solid transparent;
+        border-right: 4px solid transparent;
+        border-bottom: 6px solid #B0B0B0;
+    }
+    QSpinBox::down-arrow {
+        image: none;
+        border-left: 4px solid transparent;
+        border-right: 4px solid transparent;
+        border-top: 6px solid #B0B0B0;
+    }
+    QPushButton#resetButton {
+        background-color: #3A3A3A;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        border-radius: 4px;
+        padding: 5px 15px;
+        font-size: 11px;
+    }
+    QPushButton#resetButton:hover {
+        background-color: #404040;
+        border: 1px solid #4682B4;
+    }
+    QPushButton#resetButton:pressed {
+        background-color: #2D2D2D;
+    }
+"""
 
 
 class FilterPanel(QWidget):
     """フィルターパネル"""
 
     # シグナル定義
-    filter_changed = Signal(dict)  # フィルター条件が変更されたときのシグナル
+    filter_changed = Signal(object)  # フィルター条件（FilterState）が変更されたときのシグナル
+    filter_patch_changed = Signal(str, object)  # スライダー操作で変更された項目名と値（遅延なしで通知）
+
+    # 権利確定月コンボボックスのインデックス -> 権利確定月
+    _MONTH_MAP = {
+        0: None,  # 全て
+        1: 3,     # 3月優待
+        2: 6,     # 6月優待
+        3: 9,     # 9月優待
+        4: 12,    # 12月優待
+        5: 1, 6: 2, 7: 4, 8: 5, 9: 7, 10: 8, 11: 10, 12: 11
+    }
+    _MONTH_REVERSE_MAP = {month: index for index, month in _MONTH_MAP.items()}
+
+    # 並び替えコンボボックスのインデックス順の（項目, 順序）
+    _SORT_OPTIONS = (
+        ('expected_return', 'desc'),
+        ('expected_return', 'asc'),
+        ('win_rate', 'desc'),
+        ('win_rate', 'asc'),
+        ('code', 'asc'),
+        ('rights_date', 'asc')
+    )
+    _SORT_REVERSE_MAP = {option: index for index, option in enumerate(_SORT_OPTIONS)}
+
+    # スライダーの範囲（期待リターンは10倍した整数値）
+    _WIN_RATE_RANGE = (0, 100)
+    _RETURN_RANGE = (-100, 200)
+
+    # スライダー値ごとの表示文字列（ドラッグ中に毎回フォーマットしない）
+    _WIN_RATE_LABELS = tuple(f"{v}%" for v in range(_WIN_RATE_RANGE[0], _WIN_RATE_RANGE[1] + 1))
+    _RETURN_LABELS = tuple(f"{v / 10.0:+.1f}%" for v in range(_RETURN_RANGE[0], _RETURN_RANGE[1] + 1))
+
+    # 共有フォント（QApplication生成後の初回インスタンス化時に作成）
+    _TITLE_FONT = None
+    _VALUE_FONT = None
+    _SECTION_FONT = None
 
     def __init__(self):
         super().__init__()
         self.logger = logging.getLogger(__name__)
-        self.init_ui()
+        self._init_fonts()
+        self._last_filters = None  # 最後に通知したフィルター条件
+
+        # スライダー操作中は変更をまとめ、操作が止まってから1回だけ通知する
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self._on_filter_changed)
+
+        # UIは初回表示時に構築する（表示されないセッションでの生成コストを省く）
+        self._built = False
+
+    @classmethod
+    def _init_fonts(cls):
+        """共有フォントを初期化"""
+        if cls._SECTION_FONT is None:
+            cls._TITLE_FONT = QFont("Meiryo", 13, QFont.Bold)
+            cls._VALUE_FONT = QFont("Meiryo", 11, QFont.Bold)
+            cls._SECTION_FONT = QFont("Meiryo", 10, QFont.Bold)
+
+    def showEvent(self, event):
+        """初回表示時にUIを構築"""
+        self._ensure_built()
+        super().showEvent(event)
+
+    def _ensure_built(self):
+        """UIが未構築なら構築"""
+        if not self._built:
+            self._built = True
+            self.init_ui()
 
     def init_ui(self):
         """UIを初期化"""
+        self.setStyleSheet(_PANEL_STYLE)
+
         layout = QVBoxLayout(self)
         layout.setContentsMargins(15, 15, 15, 15)
         layout.setSpacing(20)
@@ -37,15 +233,15 @@ class FilterPanel(QWidget):
         # タイトル
         # ========================================
         title = QLabel("🔍 フィルター")
-        title.setFont(QFont("Meiryo", 13, QFont.Bold))
-        title.setStyleSheet("color: #E0E0E0;")
+        title.setFont(self._TITLE_FONT)
+        title.setObjectName("panelTitle")
         layout.addWidget(title)
 
         # 区切り線
         line = QFrame()
         line.setFrameShape(QFrame.HLine)
         line.setFrameShadow(QFrame.Sunken)
-        line.setStyleSheet("background-color: #404040;")
+        line.setObjectName("separator")
         layout.addWidget(line)
 
         # ========================================
@@ -59,7 +255,6 @@ class FilterPanel(QWidget):
             "全て", "3月優待", "6月優待", "9月優待", "12月優待",
             "1月", "2月", "4月", "5月", "7月", "8月", "10月", "11月"
         ])
-        self.month_filter.setStyleSheet(self._get_combobox_style())
         self.month_filter.currentIndexChanged.connect(self._on_filter_changed)
         layout.addWidget(self.month_filter)
 
@@ -73,19 +268,17 @@ class FilterPanel(QWidget):
         win_rate_layout.setSpacing(10)
 
         self.win_rate_slider = QSlider(Qt.Horizontal)
-        self.win_rate_slider.setMinimum(0)
-        self.win_rate_slider.setMaximum(100)
+        self.win_rate_slider.setMinimum(self._WIN_RATE_RANGE[0])
+        self.win_rate_slider.setMaximum(self._WIN_RATE_RANGE[1])
         self.win_rate_slider.setValue(0)
         self.win_rate_slider.setTickPosition(QSlider.TicksBelow)
         self.win_rate_slider.setTickInterval(10)
-        self.win_rate_slider.setStyleSheet(self._get_slider_style())
-        self.win_rate_slider.valueChanged.connect(self._update_win_rate_label)
-        self.win_rate_slider.valueChanged.connect(self._on_filter_changed)
+        self.win_rate_slider.valueChanged.connect(self._on_win_rate_changed)
         win_rate_layout.addWidget(self.win_rate_slider)
 
         self.win_rate_value_label = QLabel("0%")
-        self.win_rate_value_label.setFont(QFont("Meiryo", 11, QFont.Bold))
-        self.win_rate_value_label.setStyleSheet("color: #1E90FF;")
+        self.win_rate_value_label.setFont(self._VALUE_FONT)
+        self.win_rate_value_label.setObjectName("winRateValue")
         self.win_rate_value_label.setFixedWidth(50)
         self.win_rate_value_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
         win_rate_layout.addWidget(self.win_rate_value_label)
@@ -102,19 +295,17 @@ class FilterPanel(QWidget):
         return_layout.setSpacing(10)
 
         self.return_slider = QSlider(Qt.Horizontal)
-        self.return_slider.setMinimum(-100)
-        self.return_slider.setMaximum(200)
+        self.return_slider.setMinimum(self._RETURN_RANGE[0])
+        self.return_slider.setMaximum(self._RETURN_RANGE[1])
         self.return_slider.setValue(0)
         self.return_slider.setTickPosition(QSlider.TicksBelow)
         self.return_slider.setTickInterval(50)
-        self.return_slider.setStyleSheet(self._get_slider_style())
-        self.return_slider.valueChanged.connect(self._update_return_label)
-        self.return_slider.valueChanged.connect(self._on_filter_changed)
+        self.return_slider.valueChanged.connect(self._on_return_changed)
         return_layout.addWidget(self.return_slider)
 
         self.return_value_label = QLabel("0.0%")
-        self.return_value_label.setFont(QFont("Meiryo", 11, QFont.Bold))
-        self.return_value_label.setStyleSheet("color: #1E90FF;")
+        self.return_value_label.setFont(self._VALUE_FONT)
+        self.return_value_label.setObjectName("returnValue")
         self.return_value_label.setFixedWidth(60)
         self.return_value_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
         return_layout.addWidget(self.return_value_label)
@@ -136,7 +327,6 @@ class FilterPanel(QWidget):
         self.amount_spinbox.setValue(1000)
         self.amount_spinbox.setSingleStep(10)
         self.amount_spinbox.setSuffix(" 万円")
-        self.amount_spinbox.setStyleSheet(self._get_spinbox_style())
         self.amount_spinbox.valueChanged.connect(self._on_filter_changed)
         amount_layout.addWidget(self.amount_spinbox)
 
@@ -157,7 +347,6 @@ class FilterPanel(QWidget):
             "コード順",
             "権利確定日（近い順）"
         ])
-        self.sort_combo.setStyleSheet(self._get_combobox_style())
         self.sort_combo.currentIndexChanged.connect(self._on_filter_changed)
         layout.addWidget(self.sort_combo)
 
@@ -166,23 +355,7 @@ class FilterPanel(QWidget):
         # ========================================
         reset_btn = QPushButton("🔄 フィルターをリセット")
         reset_btn.setFixedHeight(35)
-        reset_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #3A3A3A;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                border-radius: 4px;
-                padding: 5px 15px;
-                font-size: 11px;
-            }
-            QPushButton:hover {
-                background-color: #404040;
-                border: 1px solid #4682B4;
-            }
-            QPushButton:pressed {
-                background-color: #2D2D2D;
-            }
-        """)
+        reset_btn.setObjectName("resetButton")
         reset_btn.clicked.connect(self.reset_filters)
         layout.addWidget(reset_btn)
 
@@ -191,144 +364,57 @@ class FilterPanel(QWidget):
     def _create_section_title(self, text: str) -> QLabel:
         """セクションタイトルを作成"""
         label = QLabel(text)
-        label.setFont(QFont("Meiryo", 10, QFont.Bold))
-        label.setStyleSheet("color: #B0B0B0;")
+        label.setFont(self._SECTION_FONT)
+        label.setObjectName("sectionTitle")
         return label
 
-    def _get_combobox_style(self) -> str:
-        """コンボボックスのスタイルを取得"""
-        return """
-            QComboBox {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                border-radius: 4px;
-                padding: 5px 10px;
-                min-height: 25px;
-            }
-            QComboBox:hover {
-                border: 1px solid #4682B4;
-            }
-            QComboBox:focus {
-                border: 1px solid #1E90FF;
-            }
-            QComboBox::drop-down {
-                border: none;
-                padding-right: 10px;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-top: 6px solid #B0B0B0;
-                margin-right: 5px;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                selection-background-color: #1E90FF;
-                selection-color: white;
-                border: 1px solid #404040;
-            }
-        """
-
-    def _get_slider_style(self) -> str:
-        """スライダーのスタイルを取得"""
-        return """
-            QSlider::groove:horizontal {
-                background: #2D2D2D;
-                height: 6px;
-                border-radius: 3px;
-                border: 1px solid #404040;
-            }
-            QSlider::handle:horizontal {
-                background: #1E90FF;
-                width: 16px;
-                height: 16px;
-                margin: -6px 0;
-                border-radius: 8px;
-            }
-            QSlider::handle:horizontal:hover {
-                background: #4682B4;
-            }
-            QSlider::sub-page:horizontal {
-                background: #1E90FF;
-                border-radius: 3px;
-            }
-        """
-
-    def _get_spinbox_style(self) -> str:
-        """スピンボックスのスタイルを取得"""
-        return """
-            QSpinBox {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                border-radius: 4px;
-                padding: 5px 10px;
-                min-height: 25px;
-            }
-            QSpinBox:hover {
-                border: 1px solid #4682B4;
-            }
-            QSpinBox:focus {
-                border: 1px solid #1E90FF;
-            }
-            QSpinBox::up-button, QSpinBox::down-button {
-                background-color: #3A3A3A;
-                border: none;
-                width: 16px;
-            }
-            QSpinBox::up-button:hover, QSpinBox::down-button:hover {
-                background-color: #404040;
-            }
-            QSpinBox::up-arrow {
-                image: none;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-bottom: 6px solid #B0B0B0;
-            }
-            QSpinBox::down-arrow {
-                image: none;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-top: 6px solid #B0B0B0;
-            }
-        """
-
     def _update_win_rate_label(self, value: int):
         """勝率ラベルを更新"""
-        self.win_rate_value_label.setText(f"{value}%")
+        self.win_rate_value_label.setText(self._WIN_RATE_LABELS[value - self._WIN_RATE_RANGE[0]])
 
     def _update_return_label(self, value: int):
         """期待リターンラベルを更新"""
-        value_float = value / 10.0
-        self.return_value_label.setText(f"{value_float:+.1f}%")
-
+        self.return_value_label.setText(self._RETURN_LABELS[value - self._RETURN_RANGE[0]])
+
+    @Slot(int)
+    def _on_win_rate_changed(self, value: int):
+        """勝率スライダー変更時の処理（ラベルは即時更新、通知は遅延実行）"""
+        self._update_win_rate_label(value)
+        self.filter_patch_changed.emit('min_win_rate', value / 100.0)
+        self._filter_timer.start()
+
+    @Slot(int)
+    def _on_return_changed(self, value: int):
+        """期待リターンスライダー変更時の処理（ラベルは即時更新、通知は遅延実行）"""
+        self._update_return_label(value)
+        self.filter_patch_changed.emit('min_expected_return', value / 10.0)
+        self._filter_timer.start()
+
+    @Slot()
     def _on_filter_changed(self):
         """フィルター条件が変更されたときの処理"""
+        self._filter_timer.stop()
         filters = self.get_filters()
+
+        # 前回通知時と同じ条件なら再通知しない
+        if filters == self._last_filters:
+            return
+        self._last_filters = filters
+
         self.logger.debug(f"フィルター条件が変更されました: {filters}")
         self.filter_changed.emit(filters)
 
-    def get_filters(self) -> Dict[str, Any]:
+    def get_filters(self) -> FilterState:
         """
         現在のフィルター条件を取得
 
         Returns:
-            フィルター条件の辞書
+            FilterState: フィルター条件（辞書が必要な場合は_asdict()）
         """
+        self._ensure_built()
+
         # 権利確定月
-        month_index = self.month_filter.currentIndex()
-        month_map = {
-            0: None,  # 全て
-            1: 3,     # 3月優待
-            2: 6,     # 6月優待
-            3: 9,     # 9月優待
-            4: 12,    # 12月優待
-            5: 1, 6: 2, 7: 4, 8: 5, 9: 7, 10: 8, 11: 10, 12: 11
-        }
-        rights_month = month_map.get(month_index)
+        rights_month = self._MONTH_MAP.get(self.month_filter.currentIndex())
 
         # 勝率（パーセントを小数に変換）
         min_win_rate = self.win_rate_slider.value() / 100.0
@@ -340,80 +426,97 @@ class FilterPanel(QWidget):
         max_amount = self.amount_spinbox.value() * 10000
 
         # 並び替え
-        sort_map = {
-            0: ('expected_return', 'desc'),
-            1: ('expected_return', 'asc'),
-            2: ('win_rate', 'desc'),
-            3: ('win_rate', 'asc'),
-            4: ('code', 'asc'),
-            5: ('rights_date', 'asc')
-        }
-        sort_by, sort_order = sort_map.get(self.sort_combo.currentIndex(), ('expected_return', 'desc'))
-
-        return {
-            'rights_month': rights_month,
-            'min_win_rate': min_win_rate,
-            'min_expected_return': min_expected_return,
-            'max_amount': max_amount,
-            'sort_by': sort_by,
-            'sort_order': sort_order
-        }
-
+        sort_index = self.sort_combo.currentIndex()
+        if 0 <= sort_index < len(self._SORT_OPTIONS):
+            sort_by, sort_order = self._SORT_OPTIONS[sort_index]
+        else:
+            sort_by, sort_order = self._SORT_OPTIONS[0]
+
+        return FilterState(
+            rights_month=rights_month,
+            min_win_rate=min_win_rate,
+            min_expected_return=min_expected_return,
+            max_amount=max_amount,
+            sort_by=sort_by,
+            sort_order=sort_order
+        )
+
+    @Slot()
     def reset_filters(self):
         """フィルターをリセット"""
+        self._ensure_built()
         self.logger.info("フィルターをリセット")
 
-        # 各フィルターをデフォルト値に戻す
-        self.month_filter.setCurrentIndex(0)
-        self.win_rate_slider.setValue(0)
-        self.return_slider.setValue(0)
-        self.amount_spinbox.setValue(1000)
-        self.sort_combo.setCurrentIndex(0)
+        # 各フィルターをデフォルト値に戻す（途中状態での通知を抑止）
+        with self._block_input_signals():
+            self.month_filter.setCurrentIndex(0)
+            self.win_rate_slider.setValue(0)
+            self.return_slider.setValue(0)
+            self.amount_spinbox.setValue(1000)
+            self.sort_combo.setCurrentIndex(0)
+        self._sync_value_labels()
 
         # フィルター変更シグナルを発行
         self._on_filter_changed()
 
-    def set_filters(self, filters: Dict[str, Any]):
+    def set_filters(self, filters: Union[FilterState, Dict[str, Any]]):
         """
         フィルター条件を設定
 
         Args:
-            filters: 設定するフィルター条件
+            filters: 設定するフィルター条件（FilterStateまたは一部のキーのみの辞書）
         """
-        # 権利確定月
-        rights_month = filters.get('rights_month')
-        if rights_month is not None:
-            month_reverse_map = {
-                None: 0, 3: 1, 6: 2, 9: 3, 12: 4,
-                1: 5, 2: 6, 4: 7, 5: 8, 7: 9, 8: 10, 10: 11, 11: 12
-            }
-            month_index = month_reverse_map.get(rights_month, 0)
-            self.month_filter.setCurrentIndex(month_index)
-
-        # 勝率
-        if 'min_win_rate' in filters:
-            win_rate_percent = int(filters['min_win_rate'] * 100)
-            self.win_rate_slider.setValue(win_rate_percent)
-
-        # 期待リターン
-        if 'min_expected_return' in filters:
-            return_value = int(filters['min_expected_return'] * 10)
-            self.return_slider.setValue(return_value)
-
-        # 投資金額
-        if 'max_amount' in filters:
-            amount_man = filters['max_amount'] // 10000
-            self.amount_spinbox.setValue(amount_man)
+        self._ensure_built()
+        if isinstance(filters, FilterState):
+            filters = filters._asdict()
+
+        # 途中状態での通知を抑止し、最後に1回だけ通知する
+        with self._block_input_signals():
+            # 権利確定月
+            rights_month = filters.get('rights_month')
+            if rights_month is not None:
+                month_index = self._MONTH_REVERSE_MAP.get(rights_month, 0)
+                self.month_filter.setCurrentIndex(month_index)
+
+            # 勝率
+            if 'min_win_rate' in filters:
+                win_rate_percent = int(filters['min_win_rate'] * 100)
+                self.win_rate_slider.setValue(win_rate_percent)
+
+            # 期待リターン
+            if 'min_expected_return' in filters:
+                return_value = int(filters['min_expected_return'] * 10)
+                self.return_slider.setValue(return_value)
+
+            # 投資金額
+            if 'max_amount' in filters:
+                amount_man = filters['max_amount'] // 10000
+                self.amount_spinbox.setValue(amount_man)
+
+            # 並び替え
+            if 'sort_by' in filters and 'sort_order' in filters:
+                sort_index = self._SORT_REVERSE_MAP.get((filters['sort_by'], filters['sort_order']), 0)
+                self.sort_combo.setCurrentIndex(sort_index)
+        self._sync_value_labels()
 
-        # 並び替え
-        if 'sort_by' in filters and 'sort_order' in filters:
-            sort_reverse_map = {
-                ('expected_return', 'desc'): 0,
-                ('expected_return', 'asc'): 1,
-                ('win_rate', 'desc'): 2,
-                ('win_rate', 'asc'): 3,
-                ('code', 'asc'): 4,
-                ('rights_date', 'asc'): 5
-            }
-            sort_index = sort_reverse_map.get((filters['sort_by'], filters['sort_order']), 0)
-            self.sort_combo.setCurrentIndex(sort_index)
+        self._on_filter_changed()
+
+    @contextmanager
+    def _block_input_signals(self):
+        """全入力ウィジェットのシグナルを一時的にブロック"""
+        blockers = [
+            QSignalBlocker(widget) for widget in (
+                self.month_filter, self.win_rate_slider, self.return_slider,
+                self.amount_spinbox, self.sort_combo
+            )
+        ]
+        try:
+            yield
+        finally:
+            for blocker in blockers:
+                blocker.unblock()
+
+    def _sync_value_labels(self):
+        """シグナルをブロックして変更したスライダーの値ラベルを同期"""
+        self._update_win_rate_label(self.win_rate_slider.value())
+        self._update_return_label(self.return_slider.value())
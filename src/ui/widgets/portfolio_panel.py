@@ -7,29 +7,340 @@ Date: 2025-01-11
 """
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-    QTableWidgetItem, QHeaderView, QLabel, QPushButton,
-    QSpinBox, QComboBox, QMessageBox, QFrame, QSlider, QDoubleSpinBox
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+    QHeaderView, QLabel, QPushButton,
+    QSpinBox, QComboBox, QMessageBox, QFrame, QSlider, QDoubleSpinBox,
+    QStyledItemDelegate
 )
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QFont, QColor
+from PySide6.QtCore import Qt, Signal, Slot, QObject, QTimer, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor
 import logging
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from ...core.portfolio_calculator import PortfolioCalculator
+from ._style import get_font, COLOR_GREEN, COLOR_RED
+
+
+# 指標計算に使う銘柄データの列（計算用に配列で保持する）
+_METRIC_COLUMNS = ('expected_return', 'win_rate', 'avg_win_return', 'avg_lose_return')
+
+
+def _stock_columns(stocks: List[Dict]) -> Tuple[np.ndarray, ...]:
+    """銘柄データのリストを指標計算用の列配列に変換"""
+    return tuple(
+        np.array([stock.get(column, 0) for stock in stocks], dtype=np.float64)
+        for column in _METRIC_COLUMNS
+    )
+
+
+# 最適化結果の行の背景色
+_COLOR_BLUE_BG = QColor(30, 144, 255, 30)
+
+
+# パネル全体のスタイル（パネルに1回だけ設定し、子ウィジェットはセレクタで解決する）
+_PANEL_STYLE = """
+    QLabel#panelTitle, QLabel#sectionTitle {
+        color: #E0E0E0;
+    }
+    QLabel#settingLabel {
+        color: #B0B0B0;
+    }
+    QFrame#separator {
+        background-color: #404040;
+    }
+    QPushButton#clearButton {
+        background-color: #EF4444;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        font-size: 11px;
+    }
+    QPushButton#clearButton:hover {
+        background-color: #DC2626;
+    }
+    QPushButton#optimizeButton {
+        background-color: #10B981;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        font-size: 12px;
+        font-weight: bold;
+    }
+    QPushButton#optimizeButton:hover {
+        background-color: #059669;
+    }
+    QPushButton#optimizeButton:disabled {
+        background-color: #404040;
+        color: #808080;
+    }
+    QFrame#confirmBar {
+        background-color: #3A2A2A;
+        border: 1px solid #EF4444;
+        border-radius: 4px;
+    }
+    QLabel#confirmMessage {
+        color: #E0E0E0;
+    }
+    QPushButton#confirmYesButton, QPushButton#confirmNoButton {
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 4px 12px;
+        font-size: 11px;
+    }
+    QPushButton#confirmYesButton {
+        background-color: #EF4444;
+    }
+    QPushButton#confirmYesButton:hover {
+        background-color: #DC2626;
+    }
+    QPushButton#confirmNoButton {
+        background-color: #3A3A3A;
+    }
+    QPushButton#confirmNoButton:hover {
+        background-color: #404040;
+    }
+    QSpinBox {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        border-radius: 4px;
+        padding: 5px;
+        min-width: 120px;
+    }
+    QComboBox {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        border-radius: 4px;
+        padding: 5px;
+        min-width: 100px;
+    }
+    QComboBox::drop-down {
+        border: none;
+    }
+    QComboBox QAbstractItemView {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        selection-background-color: #1E90FF;
+    }
+    QTableView#allocationTable {
+        background-color: #1E1E1E;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        gridline-color: #404040;
+    }
+    QTableView#allocationTable::item {
+        padding: 8px;
+    }
+    QTableView#allocationTable::item:selected {
+        background-color: #1E90FF;
+    }
+    QTableView#allocationTable QHeaderView::section {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        padding: 8px;
+        border: none;
+        border-bottom: 2px solid #1E90FF;
+        font-weight: bold;
+    }
+    QWidget#metricsBox {
+        background-color: #2D2D2D;
+        border-radius: 8px;
+        border: 1px solid #404040;
+    }
+    QWidget#metricsBox QWidget {
+        background-color: #2D2D2D;
+        border: none;
+    }
+    QLabel#metricTitle {
+        color: #B0B0B0;
+    }
+    QLabel#metricValue[valueState="positive"] {
+        color: #10B981;
+    }
+    QLabel#metricValue[valueState="accent"] {
+        color: #1E90FF;
+    }
+    QLabel#metricValue[valueState="warning"] {
+        color: #FACC15;
+    }
+    QLabel#metricValue[valueState="violet"] {
+        color: #8B5CF6;
+    }
+    QLabel#metricValue[valueState="lavender"] {
+        color: #A78BFA;
+    }
+    QLabel#metricValue[valueState="negative"] {
+        color: #EF4444;
+    }
+"""
+
+
+class AllocationTableModel(QAbstractTableModel):
+    """銘柄配分テーブルのモデル
+
+    各行は (銘柄名, コード, 配分比率, 投資金額, 期待リターン, 期待リターンがプラスか) のタプル。
+    表示文字列は行の作成時に整形済み。
+    """
+
+    HEADERS = ("銘柄名", "コード", "配分比率(%)", "投資金額(万円)", "期待リターン(%)")
+    _ALIGNMENTS = (
+        None,
+        Qt.AlignCenter,
+        Qt.AlignCenter,
+        Qt.AlignRight | Qt.AlignVCenter,
+        Qt.AlignCenter,
+    )
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._optimized = False  # 最適化結果の表示中か（配分比率・投資金額を強調）
+
+    def set_rows(self, rows: List[tuple], optimized: bool = False):
+        """
+        行データを差し替え
+
+        行数と表示モードが同じ場合は、内容が変わった行だけを更新通知する
+        """
+        if optimized != self._optimized or len(rows) != len(self._rows):
+            self.beginResetModel()
+            self._rows = rows
+            self._optimized = optimized
+            self.endResetModel()
+            return
+
+        old_rows = self._rows
+        self._rows = rows
+        last_column = len(self.HEADERS) - 1
+        for row, (old, new) in enumerate(zip(old_rows, rows)):
+            if old != new:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            return row[column]
+        if role == Qt.TextAlignmentRole:
+            return self._ALIGNMENTS[column]
+        if role == Qt.ForegroundRole and column == 4:
+            return COLOR_GREEN if row[5] else COLOR_RED
+        return None
+
+    def is_optimized(self) -> bool:
+        """最適化結果を表示中か"""
+        return self._optimized
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+
+class OptimizeWorkerSignals(QObject):
+    """OptimizeWorker用のシグナル"""
+    finished = Signal(object)  # 配分提案結果（失敗時None）
+    error = Signal(str)
+
+
+class OptimizeWorker:
+    """バックグラウンドでポートフォリオ最適化を実行するワーカー"""
+
+    def __init__(self, calculator: PortfolioCalculator, stocks: List[Dict],
+                 total_investment: float, risk_tolerance: str):
+        self.calculator = calculator
+        self.stocks = stocks
+        self.total_investment = total_investment
+        self.risk_tolerance = risk_tolerance
+        self.logger = logging.getLogger(__name__)
+        self.signals = OptimizeWorkerSignals()
+        self._thread = None
+
+    @property
+    def finished(self):
+        return self.signals.finished
+
+    @property
+    def error(self):
+        return self.signals.error
+
+    def start(self):
+        """ワーカースレッドを開始"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def isRunning(self):
+        """スレッドが実行中かどうか"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """最適化実行"""
+        try:
+            result = self.calculator.suggest_allocation(
+                self.stocks, self.total_investment, self.risk_tolerance
+            )
+            self.signals.finished.emit(result)
+        except Exception as e:
+            self.logger.error(f"ポートフォリオ最適化エラー: {e}", exc_info=True)
+            self.signals.error.emit(f"最適化エラー: {str(e)}")
+
+
+class AllocationDelegate(QStyledItemDelegate):
+    """配分テーブルの描画デリゲート（最適化結果の配分比率・投資金額の背景を強調）"""
+
+    _HIGHLIGHT_COLUMNS = (2, 3)
+
+    def paint(self, painter, option, index):
+        if index.column() in self._HIGHLIGHT_COLUMNS and index.model().is_optimized():
+            # 推奨配分は背景色を変更
+            painter.fillRect(option.rect, _COLOR_BLUE_BG)
+        super().paint(painter, option, index)
 
 
 class PortfolioPanel(QWidget):
     """ポートフォリオシミュレーションパネル"""
 
+    _METRICS_CACHE_SIZE = 64  # 計算結果キャッシュの最大件数
+
     def __init__(self):
         super().__init__()
         self.logger = logging.getLogger(__name__)
         self.portfolio_stocks = []  # ポートフォリオに含まれる銘柄
+        self._stock_index = set()  # 登録済みの(コード, 権利月)
+        self._stock_arrays = _stock_columns([])  # 指標計算用の列配列（portfolio_stocksと同順）
         self.calculator = PortfolioCalculator()
+        self.current_optimize_worker = None
+        # (銘柄構成, 計算条件) -> 計算結果（同じ条件での再計算を省く）
+        self._metrics_cache = OrderedDict()
+        self._showing_optimization = False  # テーブルに最適化結果を表示中か
+        self._last_alloc_sig = None  # 表示中の最適化結果の(コード, 比率, 金額)
+
+        # 投資設定の連続変更（矢印キー長押しなど）はまとめて1回だけ再計算する
+        self._recalc_timer = QTimer(self)
+        self._recalc_timer.setSingleShot(True)
+        self._recalc_timer.setInterval(200)
+        self._recalc_timer.timeout.connect(self._on_settings_changed)
+        self._recalc_pending = False  # 最適化中に投資設定が変更されたか
+
         self.init_ui()
 
     def init_ui(self):
         """UIを初期化"""
+        self.setStyleSheet(_PANEL_STYLE)
+
         layout = QVBoxLayout(self)
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(15)
@@ -40,8 +351,8 @@ class PortfolioPanel(QWidget):
         header_layout = QHBoxLayout()
 
         title = QLabel("💼 ポートフォリオシミュレーション")
-        title.setFont(QFont("Meiryo", 14, QFont.Bold))
-        title.setStyleSheet("color: #E0E0E0;")
+        title.setFont(get_font(14, bold=True))
+        title.setObjectName("panelTitle")
         header_layout.addWidget(title)
 
         header_layout.addStretch()
@@ -49,43 +360,36 @@ class PortfolioPanel(QWidget):
         # クリアボタン
         clear_btn = QPushButton("🗑 クリア")
         clear_btn.setFixedSize(80, 30)
-        clear_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #EF4444;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                font-size: 11px;
-            }
-            QPushButton:hover {
-                background-color: #DC2626;
-            }
-        """)
+        clear_btn.setObjectName("clearButton")
         clear_btn.clicked.connect(self.clear_all)
         header_layout.addWidget(clear_btn)
 
         layout.addLayout(header_layout)
 
+        # クリア確認バー（モーダルダイアログでイベントループを止めないようパネル内に表示）
+        self._confirm_bar = self._create_confirm_bar()
+        layout.addWidget(self._confirm_bar)
+
         # 区切り線
         line = QFrame()
         line.setFrameShape(QFrame.HLine)
         line.setFrameShadow(QFrame.Sunken)
-        line.setStyleSheet("background-color: #404040;")
+        line.setObjectName("separator")
         layout.addWidget(line)
 
         # ========================================
         # 設定パネル
         # ========================================
         settings_label = QLabel("投資設定")
-        settings_label.setFont(QFont("Meiryo", 11, QFont.Bold))
-        settings_label.setStyleSheet("color: #E0E0E0;")
+        settings_label.setFont(get_font(11, bold=True))
+        settings_label.setObjectName("sectionTitle")
         layout.addWidget(settings_label)
 
         settings_layout = QHBoxLayout()
 
         # 総投資金額
         amount_label = QLabel("総投資金額:")
-        amount_label.setStyleSheet("color: #B0B0B0;")
+        amount_label.setObjectName("settingLabel")
         settings_layout.addWidget(amount_label)
 
         self.investment_amount = QSpinBox()
@@ -94,68 +398,30 @@ class PortfolioPanel(QWidget):
         self.investment_amount.setValue(1000)
         self.investment_amount.setSingleStep(10)
         self.investment_amount.setSuffix(" 万円")
-        self.investment_amount.setStyleSheet("""
-            QSpinBox {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                border-radius: 4px;
-                padding: 5px;
-                min-width: 120px;
-            }
-        """)
+        self.investment_amount.valueChanged.connect(lambda _: self._recalc_timer.start())
         settings_layout.addWidget(self.investment_amount)
 
         settings_layout.addSpacing(20)
 
         # リスク許容度
         risk_label = QLabel("リスク許容度:")
-        risk_label.setStyleSheet("color: #B0B0B0;")
+        risk_label.setObjectName("settingLabel")
         settings_layout.addWidget(risk_label)
 
         self.risk_tolerance = QComboBox()
         self.risk_tolerance.addItems(["低リスク", "中リスク", "高リスク"])
         self.risk_tolerance.setCurrentIndex(1)
-        self.risk_tolerance.setStyleSheet("""
-            QComboBox {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                border-radius: 4px;
-                padding: 5px;
-                min-width: 100px;
-            }
-            QComboBox::drop-down {
-                border: none;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                selection-background-color: #1E90FF;
-            }
-        """)
+        self.risk_tolerance.currentIndexChanged.connect(lambda _: self._recalc_timer.start())
         settings_layout.addWidget(self.risk_tolerance)
 
         settings_layout.addStretch()
 
         # 最適化ボタン
-        optimize_btn = QPushButton("🎯 最適配分を計算")
-        optimize_btn.setFixedSize(150, 35)
-        optimize_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #10B981;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                font-size: 12px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #059669;
-            }
-        """)
-        optimize_btn.clicked.connect(self.optimize_portfolio)
-        settings_layout.addWidget(optimize_btn)
+        self.optimize_btn = QPushButton("🎯 最適配分を計算")
+        self.optimize_btn.setFixedSize(150, 35)
+        self.optimize_btn.setObjectName("optimizeButton")
+        self.optimize_btn.clicked.connect(self.optimize_portfolio)
+        settings_layout.addWidget(self.optimize_btn)
 
         layout.addLayout(settings_layout)
 
@@ -163,8 +429,8 @@ class PortfolioPanel(QWidget):
         # 銘柄配分テーブル
         # ========================================
         allocation_label = QLabel("銘柄配分")
-        allocation_label.setFont(QFont("Meiryo", 11, QFont.Bold))
-        allocation_label.setStyleSheet("color: #E0E0E0;")
+        allocation_label.setFont(get_font(11, bold=True))
+        allocation_label.setObjectName("sectionTitle")
         layout.addWidget(allocation_label)
 
         self.allocation_table = self.create_allocation_table()
@@ -174,44 +440,64 @@ class PortfolioPanel(QWidget):
         # ポートフォリオ指標
         # ========================================
         metrics_label = QLabel("ポートフォリオ指標")
-        metrics_label.setFont(QFont("Meiryo", 11, QFont.Bold))
-        metrics_label.setStyleSheet("color: #E0E0E0;")
+        metrics_label.setFont(get_font(11, bold=True))
+        metrics_label.setObjectName("sectionTitle")
         layout.addWidget(metrics_label)
 
-        self.metrics_widget = self.create_metrics_widget()
-        layout.addWidget(self.metrics_widget)
-
-    def create_allocation_table(self) -> QTableWidget:
+        # 指標ウィジェットは初回表示時（または初回の指標更新時）に生成する
+        self.metrics_widget = None
+        self._metrics_placeholder = QWidget()
+        layout.addWidget(self._metrics_placeholder)
+
+    def _create_confirm_bar(self) -> QFrame:
+        """クリア確認バーを作成（初期状態は非表示）"""
+        bar = QFrame()
+        bar.setObjectName("confirmBar")
+        bar.setVisible(False)
+
+        bar_layout = QHBoxLayout(bar)
+        bar_layout.setContentsMargins(10, 5, 10, 5)
+
+        message = QLabel("ポートフォリオをクリアしますか？")
+        message.setObjectName("confirmMessage")
+        bar_layout.addWidget(message)
+
+        bar_layout.addStretch()
+
+        yes_btn = QPushButton("クリア")
+        yes_btn.setObjectName("confirmYesButton")
+        yes_btn.clicked.connect(self._on_clear_confirmed)
+        bar_layout.addWidget(yes_btn)
+
+        no_btn = QPushButton("キャンセル")
+        no_btn.setObjectName("confirmNoButton")
+        no_btn.clicked.connect(bar.hide)
+        bar_layout.addWidget(no_btn)
+
+        return bar
+
+    def showEvent(self, event):
+        """初回表示時に指標ウィジェットを生成"""
+        self._ensure_metrics_widget()
+        super().showEvent(event)
+
+    def _ensure_metrics_widget(self) -> QWidget:
+        """指標ウィジェットが未生成なら生成してプレースホルダーと差し替える"""
+        if self.metrics_widget is None:
+            self.metrics_widget = self.create_metrics_widget()
+            self.layout().replaceWidget(self._metrics_placeholder, self.metrics_widget)
+            self._metrics_placeholder.deleteLater()
+            self._metrics_placeholder = None
+        return self.metrics_widget
+
+    def create_allocation_table(self) -> QTableView:
         """配分テーブルを作成"""
-        table = QTableWidget()
-        table.setColumnCount(5)
-        table.setHorizontalHeaderLabels([
-            "銘柄名", "コード", "配分比率(%)", "投資金額(万円)", "期待リターン(%)"
-        ])
-
-        # テーブルスタイル
-        table.setStyleSheet("""
-            QTableWidget {
-                background-color: #1E1E1E;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                gridline-color: #404040;
-            }
-            QTableWidget::item {
-                padding: 8px;
-            }
-            QTableWidget::item:selected {
-                background-color: #1E90FF;
-            }
-            QHeaderView::section {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                padding: 8px;
-                border: none;
-                border-bottom: 2px solid #1E90FF;
-                font-weight: bold;
-            }
-        """)
+        table = QTableView()
+        self._alloc_model = AllocationTableModel(table)
+        table.setModel(self._alloc_model)
+        table.setItemDelegate(AllocationDelegate(table))
+
+        table.setObjectName("allocationTable")
 
         # ヘッダー設定
         header = table.horizontalHeader()
@@ -228,13 +514,7 @@ class PortfolioPanel(QWidget):
     def create_metrics_widget(self) -> QWidget:
         """指標ウィジェットを作成"""
         widget = QWidget()
-        widget.setStyleSheet("""
-            QWidget {
-                background-color: #2D2D2D;
-                border-radius: 8px;
-                border: 1px solid #404040;
-            }
-        """)
+        widget.setObjectName("metricsBox")
 
         layout = QHBoxLayout(widget)
         layout.setContentsMargins(20, 15, 20, 15)
@@ -242,66 +522,66 @@ class PortfolioPanel(QWidget):
 
         # 期待リターン
         self.portfolio_return_label = self._create_metric_widget(
-            "ポートフォリオ期待リターン", "-", "#10B981"
+            "ポートフォリオ期待リターン", "-", "positive"
         )
         layout.addWidget(self.portfolio_return_label)
 
         # 勝率
         self.portfolio_winrate_label = self._create_metric_widget(
-            "ポートフォリオ勝率", "-", "#1E90FF"
+            "ポートフォリオ勝率", "-", "accent"
         )
         layout.addWidget(self.portfolio_winrate_label)
 
         # リスク
         self.portfolio_risk_label = self._create_metric_widget(
-            "ポートフォリオリスク", "-", "#FACC15"
+            "ポートフォリオリスク", "-", "warning"
         )
         layout.addWidget(self.portfolio_risk_label)
 
         # シャープレシオ
         self.sharpe_ratio_label = self._create_metric_widget(
-            "シャープレシオ", "-", "#8B5CF6"
+            "シャープレシオ", "-", "violet"
         )
         layout.addWidget(self.sharpe_ratio_label)
 
         # ソルティノレシオ
         self.sortino_ratio_label = self._create_metric_widget(
-            "ソルティノレシオ", "-", "#A78BFA"
+            "ソルティノレシオ", "-", "lavender"
         )
         layout.addWidget(self.sortino_ratio_label)
 
         # リスク削減効果
         self.risk_reduction_label = self._create_metric_widget(
-            "リスク削減効果", "-", "#10B981"
+            "リスク削減効果", "-", "positive"
         )
         layout.addWidget(self.risk_reduction_label)
 
         # 最悪ケースリターン
         self.worst_case_label = self._create_metric_widget(
-            "最悪ケース(95%)", "-", "#EF4444"
+            "最悪ケース(95%)", "-", "negative"
         )
         layout.addWidget(self.worst_case_label)
 
         return widget
 
-    def _create_metric_widget(self, title: str, value: str, color: str) -> QWidget:
-        """指標ウィジェットを作成"""
+    def _create_metric_widget(self, title: str, value: str, value_state: str) -> QWidget:
+        """指標ウィジェットを作成（value_stateは値の色分け: positive/accent/warning等）"""
         widget = QWidget()
-        widget.setStyleSheet("border: none;")
 
         layout = QVBoxLayout(widget)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(5)
 
         title_label = QLabel(title)
-        title_label.setFont(QFont("Meiryo", 9))
-        title_label.setStyleSheet("color: #B0B0B0;")
+        title_label.setFont(get_font(9))
+        title_label.setObjectName("metricTitle")
         title_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(title_label)
 
         value_label = QLabel(value)
-        value_label.setFont(QFont("Meiryo", 14, QFont.Bold))
-        value_label.setStyleSheet(f"color: {color};")
+        value_label.setFont(get_font(14, bold=True))
+        value_label.setObjectName("metricValue")
+        value_label.setProperty("valueState", value_state)
         value_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(value_label)
 
@@ -321,14 +601,16 @@ class PortfolioPanel(QWidget):
             bool: 追加成功時True
         """
         # 同じ銘柄(コード+権利月)が既に存在するかチェック
-        code = stock_data.get('code')
-        rights_month = stock_data.get('rights_month')
-
-        for stock in self.portfolio_stocks:
-            if stock.get('code') == code and stock.get('rights_month') == rights_month:
-                return False  # 既に存在
+        key = (stock_data.get('code'), stock_data.get('rights_month'))
+        if key in self._stock_index:
+            return False  # 既に存在
 
+        self._stock_index.add(key)
         self.portfolio_stocks.append(stock_data)
+        self._stock_arrays = tuple(
+            np.append(array, stock_data.get(column, 0))
+            for array, column in zip(self._stock_arrays, _METRIC_COLUMNS)
+        )
         self.update_table()
         self.calculate_equal_weight_portfolio()
         return True
@@ -341,72 +623,93 @@ class PortfolioPanel(QWidget):
             stocks: 銘柄データのリスト
         """
         self.portfolio_stocks = stocks
+        self._stock_index = {(s.get('code'), s.get('rights_month')) for s in stocks}
+        self._stock_arrays = _stock_columns(stocks)
+        # 同じ銘柄でもデータが更新されている可能性があるためキャッシュを破棄
+        self._metrics_cache.clear()
         self.update_table()
         self.calculate_equal_weight_portfolio()
 
     def update_table(self):
         """テーブルを更新（均等配分）"""
-        self.allocation_table.setRowCount(0)
+        self._showing_optimization = False
+        self._last_alloc_sig = None
 
         if not self.portfolio_stocks:
+            self._alloc_model.set_rows([])
             return
 
+        # 均等配分では配分比率・投資金額が全銘柄で同じなので、表示文字列も1回だけ作る
         n_stocks = len(self.portfolio_stocks)
         equal_weight = 100.0 / n_stocks
-        total_investment = self.investment_amount.value()
-
-        for stock in self.portfolio_stocks:
-            row = self.allocation_table.rowCount()
-            self.allocation_table.insertRow(row)
-
-            # 銘柄名
-            name_item = QTableWidgetItem(stock.get('name', ''))
-            self.allocation_table.setItem(row, 0, name_item)
-
-            # コード
+        amount_per_stock = self.investment_amount.value() * equal_weight / 100.0  # 万円
+        weight_str = f"{equal_weight:.1f}%"
+        amount_str = f"{amount_per_stock:.1f}"
+
+        # 期待リターンと色分けは指標計算用の列配列からまとめて取り出す
+        expected_returns = self._stock_arrays[0]  # _METRIC_COLUMNS[0] == 'expected_return'
+        is_positive = (expected_returns > 0).tolist()
+
+        rows = []
+        for stock, expected_return, positive in zip(
+                self.portfolio_stocks, expected_returns.tolist(), is_positive):
+            name = stock.get('name', '')
             code = stock.get('code', '')
             rights_month = stock.get('rights_month', 0)
-            code_item = QTableWidgetItem(f"{code} ({rights_month}月)")
-            code_item.setTextAlignment(Qt.AlignCenter)
-            self.allocation_table.setItem(row, 1, code_item)
-
-            # 配分比率
-            weight_item = QTableWidgetItem(f"{equal_weight:.1f}%")
-            weight_item.setTextAlignment(Qt.AlignCenter)
-            self.allocation_table.setItem(row, 2, weight_item)
-
-            # 投資金額
-            amount = total_investment * equal_weight / 100
-            amount_item = QTableWidgetItem(f"{amount:.1f}")
-            amount_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.allocation_table.setItem(row, 3, amount_item)
-
-            # 期待リターン
-            expected_return = stock.get('expected_return', 0)
-            return_item = QTableWidgetItem(f"{expected_return:+.2f}%")
-            return_item.setTextAlignment(Qt.AlignCenter)
-            if expected_return > 0:
-                return_item.setForeground(QColor(16, 185, 129))
-            else:
-                return_item.setForeground(QColor(239, 68, 68))
-            self.allocation_table.setItem(row, 4, return_item)
+
+            rows.append((
+                name,
+                f"{code} ({rights_month}月)",
+                weight_str,
+                amount_str,
+                f"{expected_return:+.2f}%",
+                positive
+            ))
+
+        self._alloc_model.set_rows(rows)
 
     def calculate_equal_weight_portfolio(self):
         """均等配分ポートフォリオを計算"""
         if not self.portfolio_stocks:
             return
 
-        n_stocks = len(self.portfolio_stocks)
-        equal_weights = [1.0 / n_stocks] * n_stocks
+        key = self._cache_key('equal')
+        metrics = self._get_cached(key)
+        if metrics is None:
+            n_stocks = len(self.portfolio_stocks)
+            equal_weights = np.full(n_stocks, 1.0 / n_stocks)
 
-        metrics = self.calculator.calculate_portfolio_metrics(
-            self.portfolio_stocks,
-            equal_weights
-        )
+            metrics = self.calculator.calculate_portfolio_metrics_vec(
+                *self._stock_arrays,
+                equal_weights
+            )
+            if metrics:
+                self._store_cached(key, metrics)
 
         if metrics:
             self.update_metrics_display(metrics)
 
+    def _cache_key(self, *conditions) -> tuple:
+        """計算結果キャッシュのキーを作成（銘柄構成の並び順 + 計算条件）"""
+        stocks_key = tuple(
+            (stock.get('code'), stock.get('rights_month')) for stock in self.portfolio_stocks
+        )
+        return (stocks_key,) + conditions
+
+    def _get_cached(self, key: tuple) -> Optional[Dict]:
+        """キャッシュ済みの計算結果を取得"""
+        result = self._metrics_cache.get(key)
+        if result is not None:
+            self._metrics_cache.move_to_end(key)
+        return result
+
+    def _store_cached(self, key: tuple, result: Dict):
+        """計算結果をキャッシュに保存（上限を超えたら古いものから削除）"""
+        self._metrics_cache[key] = result
+        self._metrics_cache.move_to_end(key)
+        if len(self._metrics_cache) > self._METRICS_CACHE_SIZE:
+            self._metrics_cache.popitem(last=False)
+
     def optimize_portfolio(self):
         """ポートフォリオを最適化"""
         if not self.portfolio_stocks:
@@ -423,16 +726,41 @@ class PortfolioPanel(QWidget):
             )
             return
 
+        if self.current_optimize_worker and self.current_optimize_worker.isRunning():
+            return
+
         # リスク許容度を取得
         risk_map = {0: 'low', 1: 'medium', 2: 'high'}
         risk_tolerance = risk_map[self.risk_tolerance.currentIndex()]
+        total_investment = self.investment_amount.value() * 10000  # 万円を円に変換
+
+        # 同じ銘柄構成・条件で最適化済みなら再計算しない
+        key = self._cache_key('optimize', risk_tolerance, total_investment)
+        stocks = list(self.portfolio_stocks)
+        cached = self._get_cached(key)
+        if cached is not None:
+            self.on_optimize_finished(cached, stocks)
+            return
 
-        # 最適化実行
-        result = self.calculator.suggest_allocation(
-            self.portfolio_stocks,
-            self.investment_amount.value() * 10000,  # 万円を円に変換
+        # 最適化はGUIスレッドを止めないようバックグラウンドで実行
+        # 実行中に銘柄が追加・変更されても影響しないよう、銘柄リストはコピーを渡す
+        self.optimize_btn.setEnabled(False)
+        self.current_optimize_worker = OptimizeWorker(
+            self.calculator,
+            stocks,
+            total_investment,
             risk_tolerance
         )
+        self.current_optimize_worker.finished.connect(
+            lambda result: self.on_optimize_finished(result, stocks, key)
+        )
+        self.current_optimize_worker.error.connect(self.on_optimize_error)
+        self.current_optimize_worker.start()
+
+    def on_optimize_finished(self, result: Optional[Dict], stocks: List[Dict],
+                             cache_key: Optional[tuple] = None):
+        """最適化完了時の処理"""
+        self._on_optimize_worker_done()
 
         if not result:
             QMessageBox.critical(
@@ -441,124 +769,146 @@ class PortfolioPanel(QWidget):
             )
             return
 
+        # 最適化中にポートフォリオが変更された場合は古い結果を表示しない
+        if stocks != self.portfolio_stocks:
+            self.logger.info("最適化中にポートフォリオが変更されたため結果を破棄")
+            return
+
+        if cache_key is not None:
+            self._store_cached(cache_key, result)
+        self._showing_optimization = True
+
         # テーブルを更新
         self.update_table_with_optimization(result['allocations'])
 
         # 指標を更新
         self.update_metrics_display(result['portfolio_metrics'])
 
-        self.logger.info(f"ポートフォリオ最適化完了 - リスク許容度: {risk_tolerance}")
+        self.logger.info(f"ポートフォリオ最適化完了 - リスク許容度: {result['risk_tolerance']}")
+
+    def on_optimize_error(self, error_msg: str):
+        """最適化エラー時の処理"""
+        self._on_optimize_worker_done()
+        QMessageBox.critical(self, "エラー", error_msg)
+
+    def _on_optimize_worker_done(self):
+        """最適化の終了時にボタンを戻し、実行中に変更された設定があれば再計算を予約"""
+        self.optimize_btn.setEnabled(True)
+        if self._recalc_pending:
+            self._recalc_pending = False
+            self._recalc_timer.start()
+
+    @Slot()
+    def _on_settings_changed(self):
+        """投資設定変更時の処理（表示中の配分を新しい設定で再計算）"""
+        if not self.portfolio_stocks:
+            return
+
+        if self._showing_optimization:
+            # 最適化の実行中は終了後に最新の設定で再計算する
+            if self.current_optimize_worker and self.current_optimize_worker.isRunning():
+                self._recalc_pending = True
+                return
+            self.optimize_portfolio()
+        else:
+            self.update_table()
+            self.calculate_equal_weight_portfolio()
 
     def update_table_with_optimization(self, allocations: List[Dict]):
         """最適化結果でテーブルを更新"""
-        self.allocation_table.setRowCount(0)
+        # 表示中の最適化結果と同じ配分なら更新しない（最適化ボタンの連続クリック時など）
+        sig = tuple(
+            (allocation['code'], round(allocation['weight'], 4), round(allocation['amount'], 2))
+            for allocation in allocations
+        )
+        if sig == self._last_alloc_sig:
+            return
+        self._last_alloc_sig = sig
+
+        # コード -> 銘柄データ（同じコードが複数ある場合は従来どおり先頭を優先）
+        stocks_by_code = {}
+        for stock in self.portfolio_stocks:
+            stocks_by_code.setdefault(stock.get('code'), stock)
 
+        rows = []
         for allocation in allocations:
-            row = self.allocation_table.rowCount()
-            self.allocation_table.insertRow(row)
+            code = allocation['code']
 
             # 対応する銘柄データを取得
-            stock = next((s for s in self.portfolio_stocks
-                         if s.get('code') == allocation['code']), None)
+            stock = stocks_by_code.get(code)
 
             if not stock:
                 continue
 
-            # 銘柄名
-            name_item = QTableWidgetItem(allocation['name'])
-            self.allocation_table.setItem(row, 0, name_item)
-
-            # コード
             rights_month = stock.get('rights_month', 0)
-            code_item = QTableWidgetItem(f"{allocation['code']} ({rights_month}月)")
-            code_item.setTextAlignment(Qt.AlignCenter)
-            self.allocation_table.setItem(row, 1, code_item)
+            expected_return = stock.get('expected_return', 0)
 
-            # 配分比率
             weight = allocation['weight'] * 100
-            weight_item = QTableWidgetItem(f"{weight:.1f}%")
-            weight_item.setTextAlignment(Qt.AlignCenter)
-            # 推奨配分は背景色を変更
-            weight_item.setBackground(QColor(30, 144, 255, 30))
-            self.allocation_table.setItem(row, 2, weight_item)
-
-            # 投資金額
             amount = allocation['amount'] / 10000  # 円を万円に変換
-            amount_item = QTableWidgetItem(f"{amount:.1f}")
-            amount_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            amount_item.setBackground(QColor(30, 144, 255, 30))
-            self.allocation_table.setItem(row, 3, amount_item)
+            rows.append((
+                allocation['name'],
+                f"{code} ({rights_month}月)",
+                f"{weight:.1f}%",
+                f"{amount:.1f}",
+                f"{expected_return:+.2f}%",
+                expected_return > 0
+            ))
 
-            # 期待リターン
-            expected_return = stock.get('expected_return', 0)
-            return_item = QTableWidgetItem(f"{expected_return:+.2f}%")
-            return_item.setTextAlignment(Qt.AlignCenter)
-            if expected_return > 0:
-                return_item.setForeground(QColor(16, 185, 129))
-            else:
-                return_item.setForeground(QColor(239, 68, 68))
-            self.allocation_table.setItem(row, 4, return_item)
+        self._alloc_model.set_rows(rows, optimized=True)
 
     def update_metrics_display(self, metrics: Dict):
         """指標表示を更新"""
-        # ポートフォリオ期待リターン
-        self.portfolio_return_label.value_label.setText(
-            f"{metrics['expected_return']:+.2f}%"
-        )
-
-        # ポートフォリオ勝率
-        self.portfolio_winrate_label.value_label.setText(
-            f"{metrics['win_rate']*100:.1f}%"
-        )
-
-        # リスク
-        self.portfolio_risk_label.value_label.setText(
-            f"{metrics['risk']:.2f}"
-        )
-
-        # シャープレシオ
-        self.sharpe_ratio_label.value_label.setText(
-            f"{metrics['sharpe_ratio']:.2f}"
-        )
-
-        # ソルティノレシオ
-        self.sortino_ratio_label.value_label.setText(
-            f"{metrics.get('sortino_ratio', 0):.2f}"
-        )
-
-        # リスク削減効果
-        self.risk_reduction_label.value_label.setText(
-            f"{metrics['risk_reduction']:+.1f}%"
-        )
-
-        # 最悪ケースリターン
-        self.worst_case_label.value_label.setText(
-            f"{metrics.get('worst_case_return', 0):+.2f}%"
+        texts = (
+            (self.portfolio_return_label, f"{metrics['expected_return']:+.2f}%"),    # ポートフォリオ期待リターン
+            (self.portfolio_winrate_label, f"{metrics['win_rate']*100:.1f}%"),       # ポートフォリオ勝率
+            (self.portfolio_risk_label, f"{metrics['risk']:.2f}"),                   # リスク
+            (self.sharpe_ratio_label, f"{metrics['sharpe_ratio']:.2f}"),             # シャープレシオ
+            (self.sortino_ratio_label, f"{metrics.get('sortino_ratio', 0):.2f}"),    # ソルティノレシオ
+            (self.risk_reduction_label, f"{metrics['risk_reduction']:+.1f}%"),       # リスク削減効果
+            (self.worst_case_label, f"{metrics.get('worst_case_return', 0):+.2f}%"), # 最悪ケースリターン
         )
+        self._set_metric_texts(texts)
+
+    def _set_metric_texts(self, texts):
+        """指標ラベルの表示をまとめて更新（再描画は最後に1回）"""
+        metrics_widget = self._ensure_metrics_widget()
+        metrics_widget.setUpdatesEnabled(False)
+        try:
+            for metric_widget, text in texts:
+                metric_widget.value_label.setText(text)
+        finally:
+            metrics_widget.setUpdatesEnabled(True)
 
     def clear_all(self):
         """全てクリア"""
         if not self.portfolio_stocks:
             return
 
-        reply = QMessageBox.question(
-            self, "確認",
-            "ポートフォリオをクリアしますか？",
-            QMessageBox.Yes | QMessageBox.No,
-            QMessageBox.No
-        )
-
-        if reply == QMessageBox.Yes:
-            self.portfolio_stocks.clear()
-            self.allocation_table.setRowCount(0)
-
-            # 指標をリセット
-            self.portfolio_return_label.value_label.setText("-")
-            self.portfolio_winrate_label.value_label.setText("-")
-            self.portfolio_risk_label.value_label.setText("-")
-            self.sharpe_ratio_label.value_label.setText("-")
-            self.sortino_ratio_label.value_label.setText("-")
-            self.risk_reduction_label.value_label.setText("-")
-            self.worst_case_label.value_label.setText("-")
-
-            self.logger.info("ポートフォリオをクリアしました")
+        # 確認はパネル内のバーで行う（クリア処理は確定時に実行）
+        self._confirm_bar.setVisible(True)
+
+    @Slot()
+    def _on_clear_confirmed(self):
+        """クリア確定時の処理"""
+        self._confirm_bar.setVisible(False)
+
+        self._recalc_timer.stop()
+        self._recalc_pending = False
+        self._showing_optimization = False
+        self._last_alloc_sig = None
+        self.portfolio_stocks.clear()
+        self._stock_index.clear()
+        self._stock_arrays = _stock_columns([])
+        self._metrics_cache.clear()
+        self._alloc_model.set_rows([])
+
+        # 指標をリセット（未生成なら初期表示のままなので不要）
+        if self.metrics_widget is not None:
+            self._set_metric_texts((metric_widget, "-") for metric_widget in (
+                self.portfolio_return_label, self.portfolio_winrate_label,
+                self.portfolio_risk_label, self.sharpe_ratio_label,
+                self.sortino_ratio_label, self.risk_reduction_label,
+                self.worst_case_label
+            ))
+
+        self.logger.info("ポートフォリオをクリアしました")
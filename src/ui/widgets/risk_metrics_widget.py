@@ -7,28 +7,185 @@ Date: 2025-01-11
 """
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-    QTableWidgetItem, QHeaderView, QLabel, QFrame, QTabWidget
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+    QHeaderView, QLabel, QFrame, QTabWidget
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont, QColor
+from PySide6.QtCore import Qt, Signal, Slot, QObject, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor
 import logging
-from typing import Dict, Optional
+import threading
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 from ...core.risk_analyzer import RiskAnalyzer
+from ._style import get_font, COLOR_GREEN, COLOR_RED
+
+
+# ウィジェット全体のスタイル（1回だけ設定し、子ウィジェットはセレクタで解決する）
+_WIDGET_STYLE = """
+    QLabel#riskHeader {
+        color: #1E90FF;
+        padding: 5px;
+    }
+    QFrame#separator {
+        background-color: #404040;
+    }
+    QTabWidget::pane {
+        border: 1px solid #404040;
+        background-color: #1E1E1E;
+    }
+    QTabBar::tab {
+        background-color: #2D2D2D;
+        color: #B0B0B0;
+        padding: 6px 12px;
+        border: none;
+        border-bottom: 2px solid transparent;
+    }
+    QTabBar::tab:selected {
+        background-color: #1E1E1E;
+        color: #1E90FF;
+        border-bottom: 2px solid #1E90FF;
+    }
+    QTabBar::tab:hover {
+        color: #E0E0E0;
+    }
+    QTableView {
+        background-color: #1E1E1E;
+        color: #E0E0E0;
+        border: none;
+        gridline-color: #404040;
+    }
+    QTableView::item {
+        padding: 6px;
+        border-bottom: 1px solid #2D2D2D;
+    }
+    QTableView::item:selected {
+        background-color: #1E90FF;
+        color: white;
+    }
+    QHeaderView::section {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        padding: 6px;
+        border: none;
+        border-bottom: 2px solid #1E90FF;
+        font-weight: bold;
+    }
+"""
+
+
+class MetricsTableModel(QAbstractTableModel):
+    """メトリクステーブルのモデル
+
+    各行は (指標名, 表示値, 値の文字色（Noneは既定色）) のタプル。
+    """
+
+    HEADERS = ("指標", "値")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def set_rows(self, rows: List[Tuple[str, str, Optional[QColor]]]):
+        """行データを一括で差し替え"""
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        label, value, color = self._rows[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            return label if column == 0 else value
+        if role == Qt.FontRole:
+            return get_font(9) if column == 0 else get_font(9, bold=True)
+        if column == 1:
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignRight | Qt.AlignVCenter
+            if role == Qt.ForegroundRole:
+                return color
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+
+class RiskMetricsWorkerSignals(QObject):
+    """RiskMetricsWorker用のシグナル"""
+    finished = Signal(dict)
+    error = Signal(str)
+
+
+class RiskMetricsWorker:
+    """バックグラウンドでリスク指標を計算するワーカー"""
+
+    def __init__(self, risk_analyzer: RiskAnalyzer,
+                 win_trades: pd.DataFrame, lose_trades: pd.DataFrame):
+        self.risk_analyzer = risk_analyzer
+        self.win_trades = win_trades
+        self.lose_trades = lose_trades
+        self.logger = logging.getLogger(__name__)
+        self.signals = RiskMetricsWorkerSignals()
+        self._thread = None
+
+    @property
+    def finished(self):
+        return self.signals.finished
+
+    @property
+    def error(self):
+        return self.signals.error
+
+    def start(self):
+        """ワーカースレッドを開始"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def isRunning(self):
+        """スレッドが実行中かどうか"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """リスク指標計算"""
+        try:
+            risk_metrics = self.risk_analyzer.calculate_comprehensive_risk_metrics(
+                self.win_trades, self.lose_trades
+            )
+            self.signals.finished.emit(risk_metrics)
+        except Exception as e:
+            self.logger.error(f"リスク指標計算エラー: {e}", exc_info=True)
+            self.signals.error.emit(f"リスク指標計算エラー: {str(e)}")
 
 
 class RiskMetricsWidget(QWidget):
     """リスク指標表示ウィジェット"""
 
+    # タブ順のテーブル属性名
+    _TAB_TABLES = ('drawdown_table', 'var_table', 'distribution_table', 'other_metrics_table')
+
     def __init__(self):
         super().__init__()
         self.logger = logging.getLogger(__name__)
         self.risk_analyzer = RiskAnalyzer()
+        self.current_worker = None
+        self._last_metrics = None  # 最後に計算したリスク指標
+        self._dirty_tabs = set()  # 最新のリスク指標をまだ反映していないタブ
         self.init_ui()
 
     def init_ui(self):
         """UIを初期化"""
+        self.setStyleSheet(_WIDGET_STYLE)
+
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(10)
@@ -37,92 +194,54 @@ class RiskMetricsWidget(QWidget):
         # ヘッダー
         # ========================================
         header = QLabel("📊 リスク分析指標")
-        header.setFont(QFont("Meiryo", 11, QFont.Bold))
-        header.setStyleSheet("color: #1E90FF; padding: 5px;")
+        header.setFont(get_font(11, bold=True))
+        header.setObjectName("riskHeader")
         layout.addWidget(header)
 
         # 区切り線
         line = QFrame()
         line.setFrameShape(QFrame.HLine)
         line.setFrameShadow(QFrame.Sunken)
-        line.setStyleSheet("background-color: #404040;")
+        line.setObjectName("separator")
         layout.addWidget(line)
 
         # ========================================
         # タブウィジェット
         # ========================================
         self.tab_widget = QTabWidget()
-        self.tab_widget.setStyleSheet("""
-            QTabWidget::pane {
-                border: 1px solid #404040;
-                background-color: #1E1E1E;
-            }
-            QTabBar::tab {
-                background-color: #2D2D2D;
-                color: #B0B0B0;
-                padding: 6px 12px;
-                border: none;
-                border-bottom: 2px solid transparent;
-            }
-            QTabBar::tab:selected {
-                background-color: #1E1E1E;
-                color: #1E90FF;
-                border-bottom: 2px solid #1E90FF;
-            }
-            QTabBar::tab:hover {
-                color: #E0E0E0;
-            }
-        """)
-
-        # ドローダウン分析タブ
-        self.drawdown_table = self.create_metrics_table()
-        self.tab_widget.addTab(self.drawdown_table, "ドローダウン")
-
-        # VaR分析タブ
-        self.var_table = self.create_metrics_table()
-        self.tab_widget.addTab(self.var_table, "VaR")
-
-        # 分布統計タブ
-        self.distribution_table = self.create_metrics_table()
-        self.tab_widget.addTab(self.distribution_table, "分布統計")
-
-        # その他の指標タブ
-        self.other_metrics_table = self.create_metrics_table()
-        self.tab_widget.addTab(self.other_metrics_table, "その他")
+
+        # 各タブのテーブルは初めて選択（または更新）された時点で生成する
+        self._tab_pages = []
+        for attr, title in zip(self._TAB_TABLES, ("ドローダウン", "VaR", "分布統計", "その他")):
+            setattr(self, attr, None)
+            page = QWidget()
+            page_layout = QVBoxLayout(page)
+            page_layout.setContentsMargins(0, 0, 0, 0)
+            self._tab_pages.append(page)
+            self.tab_widget.addTab(page, title)
+
+        # 初期表示のタブ（ドローダウン）だけは最初から生成
+        self._ensure_tab_table(0)
+
+        # 表示中のタブだけを更新し、他のタブは選択された時点で更新する
+        self.tab_widget.currentChanged.connect(self._refresh_current_tab)
 
         layout.addWidget(self.tab_widget)
 
-    def create_metrics_table(self) -> QTableWidget:
+    def _ensure_tab_table(self, index: int) -> QTableView:
+        """タブのテーブルが未生成なら生成"""
+        attr = self._TAB_TABLES[index]
+        table = getattr(self, attr)
+        if table is None:
+            table = self.create_metrics_table()
+            self._tab_pages[index].layout().addWidget(table)
+            setattr(self, attr, table)
+        return table
+
+    def create_metrics_table(self) -> QTableView:
         """メトリクステーブルを作成"""
-        table = QTableWidget()
-        table.setColumnCount(2)
-        table.setHorizontalHeaderLabels(["指標", "値"])
-
-        # テーブルスタイル
-        table.setStyleSheet("""
-            QTableWidget {
-                background-color: #1E1E1E;
-                color: #E0E0E0;
-                border: none;
-                gridline-color: #404040;
-            }
-            QTableWidget::item {
-                padding: 6px;
-                border-bottom: 1px solid #2D2D2D;
-            }
-            QTableWidget::item:selected {
-                background-color: #1E90FF;
-                color: white;
-            }
-            QHeaderView::section {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                padding: 6px;
-                border: none;
-                border-bottom: 2px solid #1E90FF;
-                font-weight: bold;
-            }
-        """)
+        table = QTableView()
+        table.setModel(MetricsTableModel(table))
 
         # ヘッダー設定
         header = table.horizontalHeader()
@@ -142,25 +261,64 @@ class RiskMetricsWidget(QWidget):
             win_trades: 勝ちトレードのDataFrame
             lose_trades: 負けトレードのDataFrame
         """
-        try:
-            # 包括的なリスク指標を計算
-            risk_metrics = self.risk_analyzer.calculate_comprehensive_risk_metrics(
-                win_trades, lose_trades
-            )
+        # 包括的なリスク指標はGUIスレッドを止めないようバックグラウンドで計算
+        # 計算中に次の銘柄が読み込まれた場合は古い結果を表示しない
+        worker = RiskMetricsWorker(self.risk_analyzer, win_trades, lose_trades)
+        worker.finished.connect(
+            lambda risk_metrics: self.on_risk_metrics_calculated(risk_metrics, worker)
+        )
+        worker.error.connect(
+            lambda err: self.logger.warning(f"リスク指標ロードエラー: {err}")
+        )
+        self.current_worker = worker
+        worker.start()
+
+    def on_risk_metrics_calculated(self, risk_metrics: Dict, worker: RiskMetricsWorker):
+        """リスク指標計算完了時の処理"""
+        if worker is not self.current_worker:
+            return
+        self.current_worker = None
+
+        self._last_metrics = risk_metrics
+        self._dirty_tabs = set(range(self.tab_widget.count()))
+        self._refresh_current_tab(self.tab_widget.currentIndex())
+
+    @Slot(int)
+    def _refresh_current_tab(self, index: int):
+        """表示中のタブに最新のリスク指標を反映（未反映の場合のみ）"""
+        if index < 0:
+            return
+        self._ensure_tab_table(index)
+        if self._last_metrics is None or index not in self._dirty_tabs:
+            return
+        self._dirty_tabs.discard(index)
+        risk_metrics = self._last_metrics
 
-            # 各タブにデータを表示
-            self.update_drawdown_tab(risk_metrics.get('max_drawdown', {}))
-            self.update_var_tab(risk_metrics.get('var', {}))
-            self.update_distribution_tab(risk_metrics.get('distribution', {}))
-            self.update_other_metrics_tab(risk_metrics)
+        try:
+            if index == 0:
+                self.update_drawdown_tab(risk_metrics.get('max_drawdown', {}))
+            elif index == 1:
+                self.update_var_tab(risk_metrics.get('var', {}))
+            elif index == 2:
+                self.update_distribution_tab(risk_metrics.get('distribution', {}))
+            elif index == 3:
+                self.update_other_metrics_tab(risk_metrics)
 
         except Exception as e:
             self.logger.error(f"リスク指標ロードエラー: {e}", exc_info=True)
 
+    def _populate_table(self, table: QTableView, rows: List[Tuple[str, str, Optional[QColor]]]):
+        """
+        メトリクステーブルに行をまとめて設定
+
+        Args:
+            table: 対象テーブル
+            rows: (指標名, 表示値, 値の文字色（Noneは既定色）) のリスト
+        """
+        table.model().set_rows(rows)
+
     def update_drawdown_tab(self, drawdown_data: Dict):
         """ドローダウンタブを更新"""
-        self.drawdown_table.setRowCount(0)
-
         metrics = [
             ("最大ドローダウン", f"{drawdown_data.get('max_drawdown', 0):.2f}%",
              drawdown_data.get('max_drawdown', 0) < -10),
@@ -169,52 +327,29 @@ class RiskMetricsWidget(QWidget):
              drawdown_data.get('current_drawdown', 0) < -5),
         ]
 
-        for label, value, is_warning in metrics:
-            row = self.drawdown_table.rowCount()
-            self.drawdown_table.insertRow(row)
-
-            label_item = QTableWidgetItem(label)
-            label_item.setFont(QFont("Meiryo", 9))
-            self.drawdown_table.setItem(row, 0, label_item)
-
-            value_item = QTableWidgetItem(value)
-            value_item.setFont(QFont("Meiryo", 9, QFont.Bold))
-            value_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            if is_warning:
-                value_item.setForeground(QColor(239, 68, 68))  # 赤色
-            self.drawdown_table.setItem(row, 1, value_item)
+        self._populate_table(self._ensure_tab_table(0), [
+            # 警告値は赤色で表示
+            (label, value, COLOR_RED if is_warning else None)
+            for label, value, is_warning in metrics
+        ])
 
     def update_var_tab(self, var_data: Dict):
         """VaRタブを更新"""
-        self.var_table.setRowCount(0)
-
         metrics = [
-            ("VaR (95%)", f"{var_data.get('var_95', 0):.2f}%"),
-            ("VaR (99%)", f"{var_data.get('var_99', 0):.2f}%"),
-            ("CVaR (95%)", f"{var_data.get('cvar_95', 0):.2f}%"),
-            ("CVaR (99%)", f"{var_data.get('cvar_99', 0):.2f}%"),
+            ("VaR (95%)", var_data.get('var_95', 0)),
+            ("VaR (99%)", var_data.get('var_99', 0)),
+            ("CVaR (95%)", var_data.get('cvar_95', 0)),
+            ("CVaR (99%)", var_data.get('cvar_99', 0)),
         ]
 
-        for label, value in metrics:
-            row = self.var_table.rowCount()
-            self.var_table.insertRow(row)
-
-            label_item = QTableWidgetItem(label)
-            label_item.setFont(QFont("Meiryo", 9))
-            self.var_table.setItem(row, 0, label_item)
-
-            value_item = QTableWidgetItem(value)
-            value_item.setFont(QFont("Meiryo", 9, QFont.Bold))
-            value_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self._populate_table(self._ensure_tab_table(1), [
             # 負の値は赤色で表示
-            if var_data.get(label.split()[0].lower().replace('(', '').replace(')', '').replace('%', ''), 0) < 0:
-                value_item.setForeground(QColor(239, 68, 68))
-            self.var_table.setItem(row, 1, value_item)
+            (label, f"{numeric:.2f}%", COLOR_RED if numeric < 0 else None)
+            for label, numeric in metrics
+        ])
 
     def update_distribution_tab(self, dist_data: Dict):
         """分布統計タブを更新"""
-        self.distribution_table.setRowCount(0)
-
         metrics = [
             ("平均リターン", f"{dist_data.get('mean', 0):.2f}%"),
             ("中央値", f"{dist_data.get('median', 0):.2f}%"),
@@ -227,55 +362,34 @@ class RiskMetricsWidget(QWidget):
             ("最大値", f"{dist_data.get('max', 0):.2f}%"),
         ]
 
-        for label, value in metrics:
-            row = self.distribution_table.rowCount()
-            self.distribution_table.insertRow(row)
-
-            label_item = QTableWidgetItem(label)
-            label_item.setFont(QFont("Meiryo", 9))
-            self.distribution_table.setItem(row, 0, label_item)
-
-            value_item = QTableWidgetItem(value)
-            value_item.setFont(QFont("Meiryo", 9, QFont.Bold))
-            value_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.distribution_table.setItem(row, 1, value_item)
+        self._populate_table(self._ensure_tab_table(2), [
+            (label, value, None) for label, value in metrics
+        ])
 
     def update_other_metrics_tab(self, risk_metrics: Dict):
         """その他の指標タブを更新"""
-        self.other_metrics_table.setRowCount(0)
-
         sequence = risk_metrics.get('trade_sequence', {})
 
-        metrics = [
-            ("ソルティノレシオ", f"{risk_metrics.get('sortino_ratio', 0):.3f}"),
-            ("カルマーレシオ", f"{risk_metrics.get('calmar_ratio', 0):.3f}"),
-            ("最大連勝回数", f"{sequence.get('max_consecutive_wins', 0)}回"),
-            ("最大連敗回数", f"{sequence.get('max_consecutive_losses', 0)}回"),
-            ("平均連勝回数", f"{sequence.get('avg_consecutive_wins', 0):.1f}回"),
-            ("平均連敗回数", f"{sequence.get('avg_consecutive_losses', 0):.1f}回"),
-        ]
-
-        for label, value in metrics:
-            row = self.other_metrics_table.rowCount()
-            self.other_metrics_table.insertRow(row)
-
-            label_item = QTableWidgetItem(label)
-            label_item.setFont(QFont("Meiryo", 9))
-            self.other_metrics_table.setItem(row, 0, label_item)
-
-            value_item = QTableWidgetItem(value)
-            value_item.setFont(QFont("Meiryo", 9, QFont.Bold))
-            value_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-
-            # ソルティノ/カルマーレシオは高いほど良い
-            if "レシオ" in label and risk_metrics.get(label.replace("レシオ", "ratio").lower().replace("ソルティノ", "sortino").replace("カルマー", "calmar"), 0) > 1.0:
-                value_item.setForeground(QColor(16, 185, 129))
+        sortino_ratio = risk_metrics.get('sortino_ratio', 0)
+        calmar_ratio = risk_metrics.get('calmar_ratio', 0)
 
-            self.other_metrics_table.setItem(row, 1, value_item)
+        # ソルティノ/カルマーレシオは高いほど良い
+        self._populate_table(self._ensure_tab_table(3), [
+            ("ソルティノレシオ", f"{sortino_ratio:.3f}", COLOR_GREEN if sortino_ratio > 1.0 else None),
+            ("カルマーレシオ", f"{calmar_ratio:.3f}", COLOR_GREEN if calmar_ratio > 1.0 else None),
+            ("最大連勝回数", f"{sequence.get('max_consecutive_wins', 0)}回", None),
+            ("最大連敗回数", f"{sequence.get('max_consecutive_losses', 0)}回", None),
+            ("平均連勝回数", f"{sequence.get('avg_consecutive_wins', 0):.1f}回", None),
+            ("平均連敗回数", f"{sequence.get('avg_consecutive_losses', 0):.1f}回", None),
+        ])
 
     def clear(self):
         """全てのテーブルをクリア"""
-        self.drawdown_table.setRowCount(0)
-        self.var_table.setRowCount(0)
-        self.distribution_table.setRowCount(0)
-        self.other_metrics_table.setRowCount(0)
+        # 計算中の結果は破棄する
+        self.current_worker = None
+        self._last_metrics = None
+        self._dirty_tabs.clear()
+        for attr in self._TAB_TABLES:
+            table = getattr(self, attr)
+            if table is not None:
+                table.model().set_rows([])
@@ -7,31 +7,357 @@ Date: 2024-11-07
 """
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-    QTableWidgetItem, QHeaderView, QLineEdit, QComboBox,
-    QLabel, QPushButton, QMenu
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+    QHeaderView, QLineEdit, QComboBox,
+    QLabel, QPushButton, QMenu, QStyledItemDelegate, QStyleOptionViewItem
 )
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QFont, QColor, QAction, QCursor
+from PySide6.QtCore import (
+    Qt, Signal, QTimer, QAbstractTableModel, QModelIndex, QSignalBlocker
+)
+from PySide6.QtGui import QFont, QAction, QCursor, QPalette
 import logging
-from typing import List, Dict, Any, Optional
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional, Union
+from ._style import COLOR_GREEN, COLOR_YELLOW, COLOR_RED
+
+
+# セルの表示に必要な (テキスト, 配置, 文字色) をまとめて返すロール
+_MULTIPLE_ROLES = Qt.UserRole + 1
+_DELEGATE_CACHE_SIZE = 2048
+_FETCH_CHUNK_SIZE = 500  # ビューへ一度に公開する行数
+
+# 固定幅の列 → 幅の基準にする最大の表示文字列（コード, 権利月, 最適日数, 勝率, 期待値）
+_COLUMN_WIDTH_SAMPLES = {0: "0000", 2: "12月", 3: "999日前", 4: "100.0%", 5: "+99.99%"}
+_COLUMN_PADDING = 32  # セルの左右パディングと太字ヘッダー分の余白
+_DEFAULT_ALIGNMENT = Qt.AlignLeft | Qt.AlignVCenter
+
+
+_WIDGET_STYLE = """
+    QLabel#listTitle {
+        color: #E0E0E0;
+    }
+    QLabel#filterLabel, QLabel#countLabel {
+        color: #B0B0B0;
+    }
+    QLineEdit#searchBox {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        border-radius: 4px;
+        padding: 5px 10px;
+    }
+    QLineEdit#searchBox:focus {
+        border: 1px solid #1E90FF;
+    }
+    QComboBox#monthFilter {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        border-radius: 4px;
+        padding: 5px 10px;
+        min-width: 80px;
+    }
+    QComboBox#monthFilter:hover {
+        border: 1px solid #1E90FF;
+    }
+    QComboBox#monthFilter::drop-down {
+        border: none;
+    }
+    QComboBox#monthFilter QAbstractItemView {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        selection-background-color: #1E90FF;
+    }
+    QPushButton#actionButton {
+        background-color: #1E90FF;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 4px 12px;
+        font-weight: bold;
+    }
+    QPushButton#actionButton:hover {
+        background-color: #1C7ED6;
+    }
+    QPushButton#actionButton:disabled {
+        background-color: #3A3A3A;
+        color: #666666;
+    }
+    QTableView#stockTable {
+        background-color: #1E1E1E;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        gridline-color: #404040;
+    }
+    QTableView#stockTable::item {
+        padding: 8px;
+        border-bottom: 1px solid #2D2D2D;
+    }
+    QTableView#stockTable::item:selected {
+        background-color: #1E90FF;
+        color: white;
+    }
+    QTableView#stockTable::item:hover {
+        background-color: #2D2D2D;
+    }
+    QTableView#stockTable QHeaderView::section {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        padding: 8px;
+        border: none;
+        border-bottom: 2px solid #1E90FF;
+        font-weight: bold;
+    }
+"""
+
+_MENU_STYLE = """
+    QMenu {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+    }
+    QMenu::item {
+        padding: %s;
+    }
+    QMenu::item:selected {
+        background-color: #1E90FF;
+    }
+"""
+_ACTION_MENU_STYLE = _MENU_STYLE % "8px 24px"
+_CONTEXT_MENU_STYLE = _MENU_STYLE % "6px 20px"
+
+
+class StockTableModel(QAbstractTableModel):
+    """銘柄リストテーブルのモデル
 
+    各行は銘柄データの辞書。表示文字列は表示されたときに行単位で整形し、
+    銘柄データが読み込み直されるまでキャッシュする。
+    """
 
-class NumericTableWidgetItem(QTableWidgetItem):
-    """数値ソート用のカスタムQTableWidgetItem"""
+    HEADERS = ("コード", "銘柄名", "権利月", "最適日数", "勝率", "期待値")
+    # 数値ソートする列 → 銘柄データのキー
+    _NUMERIC_KEYS = {2: 'rights_month', 3: 'optimal_days', 4: 'win_rate', 5: 'expected_return'}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._source = []  # 受け取った順の銘柄データ
+        self._order = np.arange(0)  # 表示順 → _source の位置
+        self._sort_keys = {}  # 列 -> _source 順のソートキー配列
+        self._rows = []  # 表示順の銘柄データ
+        self._loaded = 0  # ビューに公開済みの行数
+        self._formatted = {}  # id(銘柄データ) -> 各列の (テキスト, 配置, 文字色)
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+
+    def set_stocks(self, stocks: List[Dict[str, Any]]):
+        """
+        表示する銘柄データを差し替え
+
+        Args:
+            stocks: 銘柄データのリスト
+        """
+        self.beginResetModel()
+        self._source = list(stocks)
+        self._order = np.arange(len(self._source))
+        self._sort_keys = {}
+        self._rows = self._source
+        if self._sort_column >= 0:
+            self._sort_rows(self._sort_column, self._sort_order)
+        # 先頭のチャンクだけ公開し、残りはスクロールに応じて fetchMore で追加
+        self._loaded = min(len(self._rows), _FETCH_CHUNK_SIZE)
+        self.endResetModel()
+
+    def stock_at(self, row: int) -> Optional[Dict[str, Any]]:
+        """指定行の銘柄データを取得"""
+        if 0 <= row < self._loaded:
+            return self._rows[row]
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(len(self._rows) - self._loaded, _FETCH_CHUNK_SIZE)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        stock = self._rows[index.row()]
+        if role == Qt.UserRole:
+            # 行の銘柄データそのもの（表示文字列からの逆引きを不要にする）
+            return stock
+
+        cell = self._cells(stock)[index.column()]
+
+        if role == _MULTIPLE_ROLES:
+            return cell
+        if role == Qt.DisplayRole:
+            return cell[0]
+        if role == Qt.TextAlignmentRole:
+            return cell[1]
+        if role == Qt.ForegroundRole:
+            return cell[2]
+        return None
 
-    def __init__(self, text: str, numeric_value: Optional[float] = None):
-        super().__init__(text)
-        self.numeric_value = numeric_value
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """列でソート（数値列は数値で比較し、値なしは最小として扱う）"""
+        self._sort_column = column
+        self._sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        old_rows = self._rows
+        self._sort_rows(column, order)
+
+        # 選択中の行などの永続インデックスを並べ替え後の位置へ移す
+        persistent = self.persistentIndexList()
+        if persistent:
+            new_positions = {id(stock): row for row, stock in enumerate(self._rows)}
+            moved = []
+            for index in persistent:
+                row = new_positions[id(old_rows[index.row()])]
+                moved.append(
+                    self.index(row, index.column()) if row < self._loaded else QModelIndex()
+                )
+            self.changePersistentIndexList(persistent, moved)
+        self.layoutChanged.emit()
+
+    def _sort_rows(self, column: int, order):
+        """現在の並び順を保ったまま（安定ソート）列の値で並べ替え"""
+        keys = self._sort_keys.get(column)
+        if keys is None:
+            keys = self._build_sort_keys(column)
+            self._sort_keys[column] = keys
+
+        current = self._order
+        current_keys = keys[current]
+        if order == Qt.DescendingOrder:
+            # 逆順に安定ソートして反転し、同値の行は元の順序を保つ
+            positions = np.argsort(current_keys[::-1], kind='stable')[::-1]
+            positions = len(current) - 1 - positions
+        else:
+            positions = np.argsort(current_keys, kind='stable')
+
+        self._order = current[positions]
+        source = self._source
+        self._rows = [source[i] for i in self._order]
+
+    def _build_sort_keys(self, column: int) -> np.ndarray:
+        """読み込み順の銘柄データから列のソートキー配列を作成"""
+        if column < 2:
+            key = 'code' if column == 0 else 'name'
+            return np.array([s.get(key, '') for s in self._source], dtype=str)
+
+        key = self._NUMERIC_KEYS[column]
+        values = [s.get(key) for s in self._source]
+        return np.array(
+            [float(value) if value else float('-inf') for value in values],
+            dtype=np.float64
+        )
+
+    def clear_format_cache(self):
+        """整形済み文字列のキャッシュを破棄（銘柄データ読み込み時に呼ぶ）"""
+        self._formatted.clear()
+
+    def _cells(self, stock: Dict[str, Any]) -> tuple:
+        """銘柄の各列の (テキスト, 配置, 文字色) を取得（初回のみ整形してキャッシュ）"""
+        key = id(stock)
+        cells = self._formatted.get(key)
+        if cells is None:
+            cells = self._format_stock(stock)
+            self._formatted[key] = cells
+        return cells
+
+    @staticmethod
+    def _format_stock(stock: Dict[str, Any]) -> tuple:
+        month = stock.get('rights_month', '')
+        optimal_days = stock.get('optimal_days', '')
+        win_rate = stock.get('win_rate', 0)
+        expected_return = stock.get('expected_return', 0)
+
+        # 勝率が高い場合は緑色
+        win_rate_color = None
+        if win_rate and win_rate >= 0.7:
+            win_rate_color = COLOR_GREEN
+        elif win_rate and win_rate >= 0.5:
+            win_rate_color = COLOR_YELLOW
+
+        # 期待値がプラスの場合は緑色、マイナスの場合は赤色
+        return_color = None
+        if expected_return and expected_return > 0:
+            return_color = COLOR_GREEN
+        elif expected_return and expected_return < 0:
+            return_color = COLOR_RED
+
+        return (
+            (stock.get('code', ''), Qt.AlignCenter, None),
+            (stock.get('name', ''), _DEFAULT_ALIGNMENT, None),
+            (f"{month}月" if month else '', Qt.AlignCenter, None),
+            (f"{optimal_days}日前" if optimal_days else '-', Qt.AlignCenter, None),
+            (f"{win_rate*100:.1f}%" if win_rate else '-', Qt.AlignCenter, win_rate_color),
+            (f"{expected_return:+.2f}%" if expected_return else '-', Qt.AlignCenter, return_color),
+        )
+
+
+class StockItemDelegate(QStyledItemDelegate):
+    """銘柄リストの描画デリゲート
+
+    ロールごとに data() を呼ぶ代わりに _MULTIPLE_ROLES で一度に取得し、
+    最近描画したセルの結果を LRU キャッシュしてスクロール時の再計算を省く。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.data_cache = OrderedDict()  # (行, 列) -> (テキスト, 配置, 文字色)
+
+    def attach(self, model: QAbstractTableModel):
+        """モデルの内容変更時にキャッシュを破棄するよう接続"""
+        model.modelReset.connect(self.clear_cache)
+        model.layoutChanged.connect(self.clear_cache)
+        model.dataChanged.connect(self.clear_cache)
+
+    def clear_cache(self, *args):
+        """キャッシュを破棄"""
+        self.data_cache.clear()
+
+    def initStyleOption(self, option: QStyleOptionViewItem, index: QModelIndex):
+        key = (index.row(), index.column())
+        values = self.data_cache.get(key)
+        if values is not None:
+            self.data_cache.move_to_end(key)
+        else:
+            values = index.data(_MULTIPLE_ROLES)
+            self.data_cache[key] = values
+            if len(self.data_cache) > _DELEGATE_CACHE_SIZE:
+                self.data_cache.popitem(last=False)
 
-    def __lt__(self, other):
-        """ソート時の比較演算子"""
-        if isinstance(other, NumericTableWidgetItem):
-            # 両方が数値を持つ場合は数値で比較
-            self_val = self.numeric_value if self.numeric_value is not None else float('-inf')
-            other_val = other.numeric_value if other.numeric_value is not None else float('-inf')
-            return self_val < other_val
-        return super().__lt__(other)
+        text, alignment, foreground = values
+        option.index = index
+        option.features |= QStyleOptionViewItem.HasDisplay
+        option.text = text
+        option.displayAlignment = alignment
+        if foreground is not None:
+            option.palette.setColor(QPalette.Text, foreground)
 
 
 class StockListWidget(QWidget):
@@ -47,11 +373,23 @@ class StockListWidget(QWidget):
         super().__init__()
         self.logger = logging.getLogger(__name__)
         self.stocks_data = []
+        # 絞り込み用の列データ（casefold したコード・銘柄名、権利月）
+        self._codes_folded = np.array([], dtype=str)
+        self._names_folded = np.array([], dtype=str)
+        self._months = np.array([], dtype=np.int8)
+        self._search_buffer = ""
+        self._search_offsets = []  # 検索用バッファ内の各行の開始位置
+        # 権利月 → 銘柄データのリスト
+        self._by_month = {}
+        self._pending_search = ""
+        self._last_search = ('', None)  # (検索語, 一致した行番号)
 
         self.init_ui()
 
     def init_ui(self):
         """UIを初期化"""
+        self.setStyleSheet(_WIDGET_STYLE)
+
         layout = QVBoxLayout(self)
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(10)
@@ -65,30 +403,24 @@ class StockListWidget(QWidget):
         title = QLabel("銘柄リスト")
         title_font = QFont("Meiryo", 14, QFont.Bold)
         title.setFont(title_font)
-        title.setStyleSheet("color: #E0E0E0;")
+        title.setObjectName("listTitle")
         header_layout.addWidget(title)
 
         header_layout.addStretch()
 
         # 検索ボックス
         self.search_box = QLineEdit()
+        self.search_box.setObjectName("searchBox")
         self.search_box.setPlaceholderText("検索...")
         self.search_box.setFixedWidth(150)
-        self.search_box.setStyleSheet("""
-            QLineEdit {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                border-radius: 4px;
-                padding: 5px 10px;
-            }
-            QLineEdit:focus {
-                border: 1px solid #1E90FF;
-            }
-        """)
         self.search_box.textChanged.connect(self.on_search)
         header_layout.addWidget(self.search_box)
 
+        # 検索デバウンス用タイマー（連続入力の最後の1回だけ絞り込む）
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.timeout.connect(self._apply_filters)
+
         layout.addLayout(header_layout)
 
         # ========================================
@@ -98,35 +430,15 @@ class StockListWidget(QWidget):
 
         # 権利確定月フィルター
         month_label = QLabel("権利月:")
-        month_label.setStyleSheet("color: #B0B0B0;")
+        month_label.setObjectName("filterLabel")
         filter_layout.addWidget(month_label)
 
         self.month_filter = QComboBox()
+        self.month_filter.setObjectName("monthFilter")
         self.month_filter.addItems([
             "全て", "1月", "2月", "3月", "4月", "5月", "6月",
             "7月", "8月", "9月", "10月", "11月", "12月"
         ])
-        self.month_filter.setStyleSheet("""
-            QComboBox {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                border-radius: 4px;
-                padding: 5px 10px;
-                min-width: 80px;
-            }
-            QComboBox:hover {
-                border: 1px solid #1E90FF;
-            }
-            QComboBox::drop-down {
-                border: none;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                selection-background-color: #1E90FF;
-            }
-        """)
         self.month_filter.currentIndexChanged.connect(self.on_filter_changed)
         filter_layout.addWidget(self.month_filter)
 
@@ -134,31 +446,15 @@ class StockListWidget(QWidget):
 
         # アクションボタン（選択中の銘柄を追加）
         self.action_button = QPushButton("選択中の銘柄を追加 ▼")
+        self.action_button.setObjectName("actionButton")
         self.action_button.setEnabled(False)  # 初期状態は無効
         self.action_button.setFixedHeight(28)
-        self.action_button.setStyleSheet("""
-            QPushButton {
-                background-color: #1E90FF;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 4px 12px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #1C7ED6;
-            }
-            QPushButton:disabled {
-                background-color: #3A3A3A;
-                color: #666666;
-            }
-        """)
         self.action_button.clicked.connect(self.show_action_menu)
         filter_layout.addWidget(self.action_button)
 
         # 件数表示
         self.count_label = QLabel("0件")
-        self.count_label.setStyleSheet("color: #B0B0B0;")
+        self.count_label.setObjectName("countLabel")
         filter_layout.addWidget(self.count_label)
 
         layout.addLayout(filter_layout)
@@ -166,81 +462,100 @@ class StockListWidget(QWidget):
         # ========================================
         # テーブル
         # ========================================
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "コード", "銘柄名", "権利月", "最適日数", "勝率", "期待値"
-        ])
-
-        # テーブルスタイル
-        self.table.setStyleSheet("""
-            QTableWidget {
-                background-color: #1E1E1E;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                gridline-color: #404040;
-            }
-            QTableWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid #2D2D2D;
-            }
-            QTableWidget::item:selected {
-                background-color: #1E90FF;
-                color: white;
-            }
-            QTableWidget::item:hover {
-                background-color: #2D2D2D;
-            }
-            QHeaderView::section {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                padding: 8px;
-                border: none;
-                border-bottom: 2px solid #1E90FF;
-                font-weight: bold;
-            }
-        """)
+        self.model = StockTableModel(self)
+        self.table = QTableView()
+        self.table.setObjectName("stockTable")
+        self.table.setModel(self.model)
+        self.delegate = StockItemDelegate(self.table)
+        self.delegate.attach(self.model)
+        self.table.setItemDelegate(self.delegate)
 
         # ヘッダー設定
+        # 全行の内容を走査する ResizeToContents は使わず、想定最大の表示文字列から幅を決める
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)  # コード
         header.setSectionResizeMode(1, QHeaderView.Stretch)  # 銘柄名
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)  # 権利月
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # 最適日数
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)  # 勝率
-        header.setSectionResizeMode(5, QHeaderView.ResizeToContents)  # 期待値
+        metrics = self.table.fontMetrics()
+        for column, sample in _COLUMN_WIDTH_SAMPLES.items():
+            header.setSectionResizeMode(column, QHeaderView.Interactive)
+            text_width = max(
+                metrics.horizontalAdvance(sample),
+                metrics.horizontalAdvance(StockTableModel.HEADERS[column])
+            )
+            header.resizeSection(column, text_width + _COLUMN_PADDING)
 
         # 行選択モード
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
 
         # クリックイベント
-        self.table.cellClicked.connect(self.on_row_clicked)
+        self.table.clicked.connect(self.on_row_clicked)
 
         # 選択変更イベント（アクションボタンの有効/無効切り替え用）
-        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        self.table.selectionModel().selectionChanged.connect(self.on_selection_changed)
 
         # 右クリックメニュー設定
+        self._create_menus()
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
 
-        # ソート有効化
-        self.table.setSortingEnabled(True)
+        # 読み込み時に渡された並び順（フィルターパネルの並び替え）をそのまま表示し、
+        # ヘッダーがクリックされるまでは Qt のソートを有効にしない
+        header.setSectionsClickable(True)
+        header.sectionClicked.connect(self._on_header_clicked)
 
         layout.addWidget(self.table)
 
-    def load_stocks(self, stocks: List[Dict[str, Any]]):
+    def _on_header_clicked(self, section: int):
+        """初回のヘッダークリックでソートを有効化（クリックした列で並べ替える）"""
+        header = self.table.horizontalHeader()
+        header.sectionClicked.disconnect(self._on_header_clicked)
+        header.setSortIndicator(section, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
+
+    def load_stocks(self, stocks: Union[List[Dict[str, Any]], pd.DataFrame]):
         """
         銘柄データを読み込む
 
         Args:
-            stocks: 銘柄データのリスト
+            stocks: 銘柄データのリスト、または同じ列を持つDataFrame
         """
+        if isinstance(stocks, pd.DataFrame):
+            # 絞り込み用の列データは行ごとの辞書を経由せず列単位で作成
+            self._build_filter_index_from_frame(stocks)
+            # 欠損値はNoneにして辞書データと同じく「値なし」として扱う
+            stocks = stocks.astype(object).where(stocks.notna(), None).to_dict('records')
+        else:
+            self._codes_folded = np.array([s.get('code', '').casefold() for s in stocks], dtype=str)
+            self._names_folded = np.array([s.get('name', '').casefold() for s in stocks], dtype=str)
+            self._months = np.array(
+                [int(s.get('rights_month') or 0) for s in stocks], dtype=np.int8
+            )
+
         self.stocks_data = stocks
+        self._build_search_buffer()
+        self._last_search = ('', None)
+        self.model.clear_format_cache()
+        self._by_month = {}
+        for s in stocks:
+            self._by_month.setdefault(s.get('rights_month'), []).append(s)
         self.update_table()
         self.count_label.setText(f"{len(stocks)}件")
         self.logger.info(f"銘柄データを読み込みました: {len(stocks)}件")
 
+    def _build_filter_index_from_frame(self, frame: pd.DataFrame):
+        """DataFrameの列から絞り込み用の列データを作成"""
+        def column(name: str, default) -> pd.Series:
+            if name in frame:
+                return frame[name].fillna(default)
+            return pd.Series(default, index=frame.index)
+
+        self._codes_folded = column('code', '').astype(str).str.casefold().to_numpy(dtype=str)
+        self._names_folded = column('name', '').astype(str).str.casefold().to_numpy(dtype=str)
+        self._months = (
+            pd.to_numeric(column('rights_month', 0), errors='coerce')
+            .fillna(0).astype(np.int8).to_numpy()
+        )
+
     def update_table(self, filtered_stocks: Optional[List[Dict[str, Any]]] = None):
         """
         テーブルを更新
@@ -250,170 +565,156 @@ class StockListWidget(QWidget):
         """
         stocks = filtered_stocks if filtered_stocks is not None else self.stocks_data
 
-        # ソートを一時的に無効化
-        self.table.setSortingEnabled(False)
-
-        # テーブルをクリア
-        self.table.setRowCount(0)
-
-        # データを追加
-        for stock in stocks:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-
-            # コード
-            code_item = QTableWidgetItem(stock.get('code', ''))
-            code_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 0, code_item)
-
-            # 銘柄名
-            name_item = QTableWidgetItem(stock.get('name', ''))
-            self.table.setItem(row, 1, name_item)
-
-            # 権利月（数値ソート対応）
-            month = stock.get('rights_month', '')
-            month_item = NumericTableWidgetItem(
-                f"{month}月" if month else '',
-                float(month) if month else None
-            )
-            month_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 2, month_item)
-
-            # 最適日数（数値ソート対応）
-            optimal_days = stock.get('optimal_days', '')
-            days_item = NumericTableWidgetItem(
-                f"{optimal_days}日前" if optimal_days else '-',
-                float(optimal_days) if optimal_days else None
-            )
-            days_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 3, days_item)
-
-            # 勝率（数値ソート対応）
-            win_rate = stock.get('win_rate', 0)
-            win_rate_item = NumericTableWidgetItem(
-                f"{win_rate*100:.1f}%" if win_rate else '-',
-                float(win_rate) if win_rate else None
-            )
-            win_rate_item.setTextAlignment(Qt.AlignCenter)
-            # 勝率が高い場合は緑色
-            if win_rate and win_rate >= 0.7:
-                win_rate_item.setForeground(QColor(16, 185, 129))  # 緑
-            elif win_rate and win_rate >= 0.5:
-                win_rate_item.setForeground(QColor(250, 204, 21))  # 黄色
-            self.table.setItem(row, 4, win_rate_item)
-
-            # 期待値（数値ソート対応）
-            expected_return = stock.get('expected_return', 0)
-            return_item = NumericTableWidgetItem(
-                f"{expected_return:+.2f}%" if expected_return else '-',
-                float(expected_return) if expected_return else None
-            )
-            return_item.setTextAlignment(Qt.AlignCenter)
-            # 期待値がプラスの場合は緑色、マイナスの場合は赤色
-            if expected_return and expected_return > 0:
-                return_item.setForeground(QColor(16, 185, 129))  # 緑
-            elif expected_return and expected_return < 0:
-                return_item.setForeground(QColor(239, 68, 68))  # 赤
-            self.table.setItem(row, 5, return_item)
-
-        # ソートを再度有効化
-        self.table.setSortingEnabled(True)
+        # モデルを一括で差し替え（セルの整形は表示時に行う）
+        with self._batch_table_update():
+            self.model.set_stocks(stocks)
 
         # 件数を更新
         self.count_label.setText(f"{len(stocks)}件")
 
-    def on_search(self, text: str):
-        """検索テキスト変更時の処理"""
-        if not text:
-            self.update_table()
-            return
+        # モデルのリセットで選択が外れるためボタン状態を合わせる
+        self.on_selection_changed()
 
-        # 検索条件に一致する銘柄のみフィルタリング
-        filtered = [
-            stock for stock in self.stocks_data
-            if text.lower() in stock.get('code', '').lower() or
-               text.lower() in stock.get('name', '').lower()
-        ]
+    @contextmanager
+    def _batch_table_update(self):
+        """テーブル更新中は再描画と選択シグナルを止める"""
+        viewport = self.table.viewport()
+        blocker = QSignalBlocker(self.table.selectionModel())
+        viewport.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            viewport.setUpdatesEnabled(True)
+            blocker.unblock()
 
-        self.update_table(filtered)
+    def on_search(self, text: str):
+        """検索テキスト変更時の処理（150ms デバウンス）"""
+        self._pending_search = text
+        self._search_timer.start(150)
 
     def on_filter_changed(self, index: int):
         """権利月フィルター変更時の処理"""
-        if index == 0:  # 全て
-            self.update_table()
-            return
-
-        # 選択された月でフィルタリング
-        selected_month = index
-        filtered = [
-            stock for stock in self.stocks_data
-            if stock.get('rights_month') == selected_month
-        ]
+        self._apply_filters()
 
-        self.update_table(filtered)
+    def _apply_filters(self):
+        """検索テキストと権利月フィルターを合わせて一度に適用"""
+        # 入力待ちの検索があれば今回の絞り込みに含める
+        self._search_timer.stop()
 
-    def on_row_clicked(self, row: int, column: int):
-        """行クリック時の処理"""
-        # コードと権利月を取得
-        code_item = self.table.item(row, 0)
-        month_item = self.table.item(row, 2)
+        text = self._pending_search.casefold()
+        month = self.month_filter.currentIndex()  # 0 は「全て」
 
-        if not code_item or not month_item:
-            return
-
-        code = code_item.text()
-        # 権利月から数値を抽出（例: "3月" → 3）
-        month_text = month_item.text()
-        try:
-            rights_month = int(month_text.replace('月', ''))
-        except ValueError:
-            self.logger.warning(f"権利月の解析に失敗しました: {month_text}")
+        if not text:
+            if month == 0:
+                self.update_table()
+            else:
+                # 選択された月の銘柄リストを取得
+                self.update_table(self._by_month.get(month, []))
             return
 
-        # コードと権利月の両方で該当する銘柄データを探す
-        selected_stock = None
-        for stock in self.stocks_data:
-            if stock.get('code') == code and stock.get('rights_month') == rights_month:
-                selected_stock = stock
+        # 前回の検索語を延長した入力なら、前回の一致行だけを対象に絞り込む
+        last_text, last_indices = self._last_search
+        if last_text and text.startswith(last_text):
+            # 列データにまとめてマスクを掛ける
+            mask = (
+                (np.char.find(self._codes_folded[last_indices], text) >= 0) |
+                (np.char.find(self._names_folded[last_indices], text) >= 0)
+            )
+            indices = last_indices[mask]
+        else:
+            indices = self._scan_search_buffer(text)
+        self._last_search = (text, indices)
+
+        if month != 0:
+            indices = indices[self._months[indices] == month]
+
+        stocks = self.stocks_data
+        self.update_table([stocks[i] for i in indices])
+
+    def _build_search_buffer(self):
+        """全銘柄のコード・銘柄名を1本の文字列に連結した検索用バッファを作成"""
+        # 各行は "コード\0銘柄名\0"。区切り文字をまたいだ一致は起こらない
+        parts = [f"{code}\0{name}\0" for code, name in zip(self._codes_folded, self._names_folded)]
+        offsets = []
+        position = 0
+        for part in parts:
+            offsets.append(position)
+            position += len(part)
+        self._search_buffer = ''.join(parts)
+        self._search_offsets = offsets
+
+    def _scan_search_buffer(self, text: str) -> np.ndarray:
+        """検索用バッファを走査し、検索語を含む行番号を返す"""
+        buffer = self._search_buffer
+        offsets = self._search_offsets
+        row_count = len(offsets)
+        rows = []
+
+        position = buffer.find(text)
+        while position != -1:
+            row = bisect_right(offsets, position) - 1
+            rows.append(row)
+            # 同じ行で重複して一致しないよう次の行の先頭から再開
+            if row + 1 >= row_count:
                 break
+            position = buffer.find(text, offsets[row + 1])
+
+        return np.array(rows, dtype=np.intp)
+
+    def on_row_clicked(self, index: QModelIndex):
+        """行クリック時の処理"""
+        # インデックスに紐づく銘柄データを直接取得
+        selected_stock = index.data(Qt.UserRole)
 
         if selected_stock:
+            code = selected_stock.get('code')
+            rights_month = selected_stock.get('rights_month')
             self.logger.info(f"銘柄が選択されました: {code} ({rights_month}月) - {selected_stock.get('name')}")
             self.stock_selected.emit(selected_stock)
         else:
-            self.logger.warning(f"銘柄データが見つかりません: {code} ({rights_month}月)")
+            self.logger.warning(f"銘柄データが見つかりません: 行 {index.row()}")
 
     def get_selected_stock(self) -> Optional[Dict[str, Any]]:
         """選択中の銘柄データを取得"""
-        current_row = self.table.currentRow()
+        current_row = self.table.currentIndex().row()
         if current_row < 0:
             return None
 
-        code_item = self.table.item(current_row, 0)
-        month_item = self.table.item(current_row, 2)
+        return self.model.stock_at(current_row)
 
-        if not code_item or not month_item:
-            return None
+    def on_selection_changed(self):
+        """選択変更時の処理（アクションボタンの有効/無効切り替え）"""
+        has_selection = self.table.selectionModel().hasSelection()
+        self.action_button.setEnabled(has_selection)
 
-        code = code_item.text()
-        # 権利月から数値を抽出（例: "3月" → 3）
-        month_text = month_item.text()
-        try:
-            rights_month = int(month_text.replace('月', ''))
-        except ValueError:
-            return None
+    def _create_menus(self):
+        """アクションボタン用・右クリック用のメニューを一度だけ作成"""
+        self._menu_target = None  # メニュー表示中の対象銘柄
 
-        # コードと権利月の両方で該当する銘柄データを探す
-        for stock in self.stocks_data:
-            if stock.get('code') == code and stock.get('rights_month') == rights_month:
-                return stock
+        # メニュー項目（両メニューで共有）
+        watchlist_action = QAction("⭐ ウォッチリストに追加", self)
+        watchlist_action.triggered.connect(
+            lambda: self.add_to_watchlist_requested.emit(self._menu_target)
+        )
+        comparison_action = QAction("📈 銘柄比較に追加", self)
+        comparison_action.triggered.connect(
+            lambda: self.add_to_comparison_requested.emit(self._menu_target)
+        )
+        portfolio_action = QAction("💼 ポートフォリオに追加", self)
+        portfolio_action.triggered.connect(
+            lambda: self.add_to_portfolio_requested.emit(self._menu_target)
+        )
+        actions = [watchlist_action, comparison_action, portfolio_action]
 
-        return None
+        # ドロップダウンメニュー
+        self._action_menu = QMenu(self)
+        self._action_menu.setStyleSheet(_ACTION_MENU_STYLE)
+        self._action_menu.addActions(actions)
 
-    def on_selection_changed(self):
-        """選択変更時の処理（アクションボタンの有効/無効切り替え）"""
-        has_selection = len(self.table.selectedItems()) > 0
-        self.action_button.setEnabled(has_selection)
+        # コンテキストメニュー
+        self._context_menu = QMenu(self)
+        self._context_menu.setStyleSheet(_CONTEXT_MENU_STYLE)
+        self._context_menu.addActions(actions)
 
     def show_action_menu(self):
         """アクションボタンのドロップダウンメニューを表示"""
@@ -421,38 +722,10 @@ class StockListWidget(QWidget):
         if not stock_data:
             return
 
-        # ドロップダウンメニューを作成
-        menu = QMenu(self)
-        menu.setStyleSheet("""
-            QMenu {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-            }
-            QMenu::item {
-                padding: 8px 24px;
-            }
-            QMenu::item:selected {
-                background-color: #1E90FF;
-            }
-        """)
-
-        # メニュー項目
-        watchlist_action = QAction("⭐ ウォッチリストに追加", self)
-        watchlist_action.triggered.connect(lambda: self.add_to_watchlist_requested.emit(stock_data))
-        menu.addAction(watchlist_action)
-
-        comparison_action = QAction("📈 銘柄比較に追加", self)
-        comparison_action.triggered.connect(lambda: self.add_to_comparison_requested.emit(stock_data))
-        menu.addAction(comparison_action)
-
-        portfolio_action = QAction("💼 ポートフォリオに追加", self)
-        portfolio_action.triggered.connect(lambda: self.add_to_portfolio_requested.emit(stock_data))
-        menu.addAction(portfolio_action)
-
         # ボタンの下にメニューを表示
+        self._menu_target = stock_data
         button_pos = self.action_button.mapToGlobal(self.action_button.rect().bottomLeft())
-        menu.exec(button_pos)
+        self._action_menu.exec(button_pos)
 
     def show_context_menu(self, position):
         """右クリックメニューを表示"""
@@ -467,34 +740,6 @@ class StockListWidget(QWidget):
         if not stock_data:
             return
 
-        # コンテキストメニューを作成
-        menu = QMenu(self)
-        menu.setStyleSheet("""
-            QMenu {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-            }
-            QMenu::item {
-                padding: 6px 20px;
-            }
-            QMenu::item:selected {
-                background-color: #1E90FF;
-            }
-        """)
-
-        # メニュー項目
-        watchlist_action = QAction("⭐ ウォッチリストに追加", self)
-        watchlist_action.triggered.connect(lambda: self.add_to_watchlist_requested.emit(stock_data))
-        menu.addAction(watchlist_action)
-
-        comparison_action = QAction("📈 銘柄比較に追加", self)
-        comparison_action.triggered.connect(lambda: self.add_to_comparison_requested.emit(stock_data))
-        menu.addAction(comparison_action)
-
-        portfolio_action = QAction("💼 ポートフォリオに追加", self)
-        portfolio_action.triggered.connect(lambda: self.add_to_portfolio_requested.emit(stock_data))
-        menu.addAction(portfolio_action)
-
         # メニューを表示
-        menu.exec(self.table.viewport().mapToGlobal(position))
+        self._menu_target = stock_data
+        self._context_menu.exec(self.table.viewport().mapToGlobal(position))
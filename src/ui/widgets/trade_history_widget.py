@@ -7,28 +7,268 @@ Date: 2025-01-11
 """
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-    QTableWidgetItem, QHeaderView, QLabel, QPushButton,
-    QComboBox, QTabWidget
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+    QHeaderView, QLabel, QPushButton,
+    QComboBox, QTabWidget, QFileDialog, QMessageBox, QStyledItemDelegate
 )
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QFont, QColor
+from PySide6.QtCore import Qt, Signal, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QFont, QPalette
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
+from ._style import get_font, COLOR_GREEN, COLOR_YELLOW, COLOR_RED
+
+
+# ウィジェット全体のスタイルシート（構築時に一度だけ設定する）
+_WIDGET_STYLE = """
+    QLabel#historyTitle {
+        color: #1E90FF;
+    }
+    QLabel#yearlyDescription {
+        color: #B0B0B0;
+        font-size: 11px;
+    }
+    QComboBox#tradeFilter {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        border-radius: 4px;
+        padding: 5px 10px;
+        min-width: 120px;
+    }
+    QComboBox#tradeFilter:hover {
+        border: 1px solid #1E90FF;
+    }
+    QComboBox#tradeFilter::drop-down {
+        border: none;
+    }
+    QComboBox#tradeFilter QAbstractItemView {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        selection-background-color: #1E90FF;
+    }
+    QPushButton#exportButton {
+        background-color: #4682B4;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        font-size: 11px;
+    }
+    QPushButton#exportButton:hover {
+        background-color: #1E90FF;
+    }
+    QTabWidget#historyTabs::pane {
+        border: 1px solid #404040;
+        background-color: #1E1E1E;
+    }
+    QTabWidget#historyTabs QTabBar::tab {
+        background-color: #2D2D2D;
+        color: #B0B0B0;
+        padding: 8px 16px;
+        border: none;
+        border-bottom: 2px solid transparent;
+    }
+    QTabWidget#historyTabs QTabBar::tab:selected {
+        background-color: #1E1E1E;
+        color: #1E90FF;
+        border-bottom: 2px solid #1E90FF;
+    }
+    QTabWidget#historyTabs QTabBar::tab:hover {
+        color: #E0E0E0;
+    }
+    QTableView#tradesTable, QTableView#yearlyTable {
+        background-color: #1E1E1E;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        gridline-color: #404040;
+    }
+    QTableView#tradesTable::item, QTableView#yearlyTable::item {
+        padding: 8px;
+    }
+    QTableView#tradesTable::item {
+        border-bottom: 1px solid #2D2D2D;
+    }
+    QTableView#tradesTable::item:selected {
+        background-color: #1E90FF;
+        color: white;
+    }
+    QTableView#tradesTable::item:hover {
+        background-color: #2D2D2D;
+    }
+    QTableView#yearlyTable::item:selected {
+        background-color: #1E90FF;
+    }
+    QHeaderView::section {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        padding: 8px;
+        border: none;
+        border-bottom: 2px solid #1E90FF;
+        font-weight: bold;
+    }
+"""
+
+
+class _SortableRowModel(QAbstractTableModel):
+    """整形済みの行データを表示するテーブルモデルの基底クラス
+
+    各行は (表示文字列のタプル, ソートキーのタプル, 文字色のタプル（Noneは既定色）)。
+    表示文字列は行の作成時に整形済みで、data() は参照するだけ。
+    """
+
+    HEADERS: Tuple[str, ...] = ()
+    _ALIGNMENTS: Tuple = ()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+
+    def set_rows(self, rows: List[tuple]):
+        """行データを一括で差し替え（ソート中の列があれば並べ替えて表示）"""
+        self.beginResetModel()
+        self._rows = list(rows)
+        if self._sort_column >= 0:
+            self._sort_rows()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        texts, _, colors = self._rows[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            return texts[column]
+        if role == Qt.TextAlignmentRole:
+            return self._ALIGNMENTS[column]
+        if role == Qt.ForegroundRole:
+            return colors[column]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """列のソートキーで並べ替え"""
+        self._sort_column = column
+        self._sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        old_rows = self._rows
+        self._sort_rows()
+
+        # 選択中の行などの永続インデックスを並べ替え後の位置へ移す
+        persistent = self.persistentIndexList()
+        if persistent:
+            new_positions = {id(row): position for position, row in enumerate(self._rows)}
+            self.changePersistentIndexList(persistent, [
+                self.index(new_positions[id(old_rows[index.row()])], index.column())
+                for index in persistent
+            ])
+        self.layoutChanged.emit()
+
+    def _sort_rows(self):
+        column = self._sort_column
+        self._rows.sort(key=lambda row: row[1][column],
+                        reverse=self._sort_order == Qt.DescendingOrder)
+
+
+class TradesTableModel(_SortableRowModel):
+    """全トレードテーブルのモデル"""
+
+    HEADERS = ("取引年", "権利確定日", "買入日", "買値", "売値", "リターン(%)", "結果")
+    _ALIGNMENTS = (
+        Qt.AlignCenter,
+        Qt.AlignCenter,
+        Qt.AlignCenter,
+        Qt.AlignRight | Qt.AlignVCenter,
+        Qt.AlignRight | Qt.AlignVCenter,
+        Qt.AlignRight | Qt.AlignVCenter,
+        Qt.AlignCenter,
+    )
+    RETURN_COLUMN = 5
+    RESULT_COLUMN = 6
+    # 文字色を持たない行（リターン・結果列の色はデリゲートが決める）
+    NO_COLORS = (None,) * 7
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.UserRole and index.isValid():
+            # リターン・結果列の正負（プラス・勝ちなら True）
+            keys = self._rows[index.row()][1]
+            if index.column() == self.RETURN_COLUMN:
+                return bool(keys[self.RETURN_COLUMN] > 0)
+            if index.column() == self.RESULT_COLUMN:
+                return keys[self.RESULT_COLUMN] == 'WIN'
+            return None
+        return super().data(index, role)
+
+
+class _SignColorDelegate(QStyledItemDelegate):
+    """正負で文字色を切り替える列の描画デリゲート
+
+    行ごとの QColor を持たず、UserRole の真偽値だけを見て共有の色とフォントを設定する。
+    """
+
+    def __init__(self, bold: bool = False, parent=None):
+        super().__init__(parent)
+        self._bold = bold
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        # プラス・勝ちは緑、それ以外は赤
+        color = COLOR_GREEN if index.data(Qt.UserRole) else COLOR_RED
+        option.palette.setColor(QPalette.Text, color)
+        if self._bold:
+            option.font = get_font(9, bold=True)
+
+
+class YearlyTableModel(_SortableRowModel):
+    """年別パフォーマンステーブルのモデル"""
+
+    HEADERS = ("年", "トレード数", "勝率(%)", "平均リターン(%)", "最大勝ち(%)", "最大負け(%)")
+    _ALIGNMENTS = (Qt.AlignCenter,) * 6
 
 
 class TradeHistoryWidget(QWidget):
     """トレード履歴表示ウィジェット"""
 
+    # 結合後のトレードデータの列（結果列 'result' を除く）
+    _TRADE_COLUMNS = ['buy_date', 'return', 'buy_price', 'sell_price']
+    # 結果列はカテゴリ型で保持（コード 0=LOSE, 1=WIN）
+    _RESULT_DTYPE = pd.CategoricalDtype(['LOSE', 'WIN'])
+    # 結合時に一度だけ作成する年・日付の列（年、年の文字列、権利確定日、買入日）
+    _DATE_COLUMNS = ['year', 'year_str', 'date_str', 'buy_date_str']
+    # CSV出力時の列見出し
+    _CSV_HEADERS = {
+        'buy_date': '買入日',
+        'buy_price': '買値',
+        'sell_price': '売値',
+        'return': 'リターン(%)',
+        'result': '結果',
+    }
+
     def __init__(self):
         super().__init__()
         self.logger = logging.getLogger(__name__)
         self.current_trades = None
+        self._all_df = None  # 結合済みの全トレード（日付の降順）
+        self._yearly_df = None  # 年別集計
         self.init_ui()
 
     def init_ui(self):
         """UIを初期化"""
+        self.setStyleSheet(_WIDGET_STYLE)
+
         layout = QVBoxLayout(self)
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(10)
@@ -40,7 +280,7 @@ class TradeHistoryWidget(QWidget):
 
         title = QLabel("📊 トレード履歴詳細")
         title.setFont(QFont("Meiryo", 13, QFont.Bold))
-        title.setStyleSheet("color: #1E90FF;")
+        title.setObjectName("historyTitle")
         header_layout.addWidget(title)
 
         header_layout.addStretch()
@@ -48,45 +288,14 @@ class TradeHistoryWidget(QWidget):
         # フィルター
         self.filter_combo = QComboBox()
         self.filter_combo.addItems(["全て", "勝ちトレードのみ", "負けトレードのみ"])
-        self.filter_combo.setStyleSheet("""
-            QComboBox {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                border-radius: 4px;
-                padding: 5px 10px;
-                min-width: 120px;
-            }
-            QComboBox:hover {
-                border: 1px solid #1E90FF;
-            }
-            QComboBox::drop-down {
-                border: none;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                selection-background-color: #1E90FF;
-            }
-        """)
+        self.filter_combo.setObjectName("tradeFilter")
         self.filter_combo.currentIndexChanged.connect(self.on_filter_changed)
         header_layout.addWidget(self.filter_combo)
 
         # エクスポートボタン
         export_btn = QPushButton("💾 CSV出力")
         export_btn.setFixedSize(100, 30)
-        export_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4682B4;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                font-size: 11px;
-            }
-            QPushButton:hover {
-                background-color: #1E90FF;
-            }
-        """)
+        export_btn.setObjectName("exportButton")
         export_btn.clicked.connect(self.export_to_csv)
         header_layout.addWidget(export_btn)
 
@@ -96,27 +305,7 @@ class TradeHistoryWidget(QWidget):
         # タブウィジェット
         # ========================================
         self.tab_widget = QTabWidget()
-        self.tab_widget.setStyleSheet("""
-            QTabWidget::pane {
-                border: 1px solid #404040;
-                background-color: #1E1E1E;
-            }
-            QTabBar::tab {
-                background-color: #2D2D2D;
-                color: #B0B0B0;
-                padding: 8px 16px;
-                border: none;
-                border-bottom: 2px solid transparent;
-            }
-            QTabBar::tab:selected {
-                background-color: #1E1E1E;
-                color: #1E90FF;
-                border-bottom: 2px solid #1E90FF;
-            }
-            QTabBar::tab:hover {
-                color: #E0E0E0;
-            }
-        """)
+        self.tab_widget.setObjectName("historyTabs")
 
         # タブ1: 全トレード履歴
         self.all_trades_table = self.create_trades_table()
@@ -128,42 +317,19 @@ class TradeHistoryWidget(QWidget):
 
         layout.addWidget(self.tab_widget)
 
-    def create_trades_table(self) -> QTableWidget:
+    def create_trades_table(self) -> QTableView:
         """トレード履歴テーブルを作成"""
-        table = QTableWidget()
-        table.setColumnCount(7)
-        table.setHorizontalHeaderLabels([
-            "取引年", "権利確定日", "買入日", "買値", "売値", "リターン(%)", "結果"
-        ])
-
-        # テーブルスタイル
-        table.setStyleSheet("""
-            QTableWidget {
-                background-color: #1E1E1E;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                gridline-color: #404040;
-            }
-            QTableWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid #2D2D2D;
-            }
-            QTableWidget::item:selected {
-                background-color: #1E90FF;
-                color: white;
-            }
-            QTableWidget::item:hover {
-                background-color: #2D2D2D;
-            }
-            QHeaderView::section {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                padding: 8px;
-                border: none;
-                border-bottom: 2px solid #1E90FF;
-                font-weight: bold;
-            }
-        """)
+        table = QTableView()
+        table.setModel(TradesTableModel(table))
+        table.setObjectName("tradesTable")
+
+        # リターン・結果列は正負に応じた色をデリゲートで描画
+        table.setItemDelegateForColumn(
+            TradesTableModel.RETURN_COLUMN, _SignColorDelegate(parent=table)
+        )
+        table.setItemDelegateForColumn(
+            TradesTableModel.RESULT_COLUMN, _SignColorDelegate(bold=True, parent=table)
+        )
 
         # ヘッダー設定
         header = table.horizontalHeader()
@@ -176,8 +342,8 @@ class TradeHistoryWidget(QWidget):
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)  # 結果
 
         # 行選択モード
-        table.setSelectionBehavior(QTableWidget.SelectRows)
-        table.setSelectionMode(QTableWidget.SingleSelection)
+        table.setSelectionBehavior(QTableView.SelectRows)
+        table.setSelectionMode(QTableView.SingleSelection)
 
         # ソート有効化
         table.setSortingEnabled(True)
@@ -192,42 +358,20 @@ class TradeHistoryWidget(QWidget):
 
         # 説明ラベル
         desc = QLabel("各年のパフォーマンスサマリー")
-        desc.setStyleSheet("color: #B0B0B0; font-size: 11px;")
+        desc.setObjectName("yearlyDescription")
         layout.addWidget(desc)
 
         # テーブル
-        self.yearly_table = QTableWidget()
-        self.yearly_table.setColumnCount(6)
-        self.yearly_table.setHorizontalHeaderLabels([
-            "年", "トレード数", "勝率(%)", "平均リターン(%)", "最大勝ち(%)", "最大負け(%)"
-        ])
-
-        self.yearly_table.setStyleSheet("""
-            QTableWidget {
-                background-color: #1E1E1E;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                gridline-color: #404040;
-            }
-            QTableWidget::item {
-                padding: 8px;
-            }
-            QTableWidget::item:selected {
-                background-color: #1E90FF;
-            }
-            QHeaderView::section {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                padding: 8px;
-                border: none;
-                border-bottom: 2px solid #1E90FF;
-                font-weight: bold;
-            }
-        """)
+        self.yearly_table = QTableView()
+        self.yearly_table.setModel(YearlyTableModel(self.yearly_table))
+        self.yearly_table.setObjectName("yearlyTable")
 
         header = self.yearly_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
 
+        # ソート有効化
+        self.yearly_table.setSortingEnabled(True)
+
         layout.addWidget(self.yearly_table)
 
         return widget
@@ -241,6 +385,12 @@ class TradeHistoryWidget(QWidget):
         """
         try:
             self.current_trades = trade_data
+            # 結合済みトレード・年別集計は読み込み時に一度だけ作成して使い回す
+            self._all_df = self._merge_trades(
+                trade_data.get('win_trades', pd.DataFrame()),
+                trade_data.get('lose_trades', pd.DataFrame())
+            )
+            self._yearly_df = self._aggregate_yearly(self._all_df)
             self.update_all_trades_table()
             self.update_yearly_performance()
             self.logger.info("トレード履歴データを読み込みました")
@@ -248,221 +398,200 @@ class TradeHistoryWidget(QWidget):
             self.logger.error(f"トレードデータ読み込みエラー: {e}", exc_info=True)
 
     def update_all_trades_table(self):
-        """全トレードテーブルを更新"""
-        if not self.current_trades:
+        """全トレードテーブルを更新（フィルターを適用）"""
+        if self._all_df is None:
             return
 
-        win_trades = self.current_trades.get('win_trades', pd.DataFrame())
-        lose_trades = self.current_trades.get('lose_trades', pd.DataFrame())
-
-        # データフレームを結合
-        all_trades = []
-
+        # テーブルに表示
+        self.populate_table(self.all_trades_table, self._filtered_trades())
+
+    def _filtered_trades(self) -> pd.DataFrame:
+        """フィルターを適用した全トレードを取得"""
+        trades = self._all_df
+        filter_index = self.filter_combo.currentIndex()
+        if filter_index == 1:  # 勝ちトレードのみ
+            trades = trades[trades['result'].cat.codes.to_numpy() == 1]
+        elif filter_index == 2:  # 負けトレードのみ
+            trades = trades[trades['result'].cat.codes.to_numpy() == 0]
+        return trades
+
+    @classmethod
+    def _merge_trades(cls, win_trades: pd.DataFrame, lose_trades: pd.DataFrame) -> pd.DataFrame:
+        """勝ち・負けトレードを列単位で結合し、日付の新しい順に並べる"""
         # 列名の正規化（大文字・小文字両方に対応）
         close_col = 'Close' if (not win_trades.empty and 'Close' in win_trades.columns) or \
                               (not lose_trades.empty and 'Close' in lose_trades.columns) else 'close'
 
-        if not win_trades.empty:
-            for idx, row in win_trades.iterrows():
-                all_trades.append({
-                    'date': idx,
-                    'buy_date': row.get('買入日', None),
-                    'return': row.get('リターン(%)', 0),
-                    'buy_price': row.get('買入日終値', 0),
-                    'sell_price': row.get(close_col, 0),
-                    'result': 'WIN'
-                })
-
-        if not lose_trades.empty:
-            for idx, row in lose_trades.iterrows():
-                all_trades.append({
-                    'date': idx,
-                    'buy_date': row.get('買入日', None),
-                    'return': row.get('リターン(%)', 0),
-                    'buy_price': row.get('買入日終値', 0),
-                    'sell_price': row.get(close_col, 0),
-                    'result': 'LOSE'
-                })
-
-        # 日付でソート
-        all_trades.sort(key=lambda x: x['date'], reverse=True)
-
-        # テーブルに表示
-        self.populate_table(self.all_trades_table, all_trades)
-
-    def populate_table(self, table: QTableWidget, trades: List[Dict]):
-        """テーブルにデータを表示"""
-        table.setSortingEnabled(False)
-        table.setRowCount(0)
-
-        for trade in trades:
-            row = table.rowCount()
-            table.insertRow(row)
-
-            trade_date = trade['date']
-
-            # 取引年
-            year_item = QTableWidgetItem(str(trade_date.year))
-            year_item.setTextAlignment(Qt.AlignCenter)
-            table.setItem(row, 0, year_item)
-
-            # 権利確定日（権利付最終日）
-            rights_date_item = QTableWidgetItem(trade_date.strftime('%Y-%m-%d'))
-            rights_date_item.setTextAlignment(Qt.AlignCenter)
-            table.setItem(row, 1, rights_date_item)
-
-            # 買入日
-            buy_date = trade.get('buy_date')
-            if buy_date and hasattr(buy_date, 'strftime'):
-                buy_date_str = buy_date.strftime('%Y-%m-%d')
-            else:
-                buy_date_str = "N/A"
-            buy_date_item = QTableWidgetItem(buy_date_str)
-            buy_date_item.setTextAlignment(Qt.AlignCenter)
-            table.setItem(row, 2, buy_date_item)
-
-            # 買値
-            buy_price = trade.get('buy_price', 0)
-            buy_price_item = QTableWidgetItem(f"¥{buy_price:,.0f}")
-            buy_price_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            table.setItem(row, 3, buy_price_item)
-
-            # 売値
-            sell_price = trade.get('sell_price', 0)
-            sell_price_item = QTableWidgetItem(f"¥{sell_price:,.0f}")
-            sell_price_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            table.setItem(row, 4, sell_price_item)
-
-            # リターン
-            return_val = trade.get('return', 0)
-            return_item = QTableWidgetItem(f"{return_val:+.2f}%")
-            return_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            if return_val > 0:
-                return_item.setForeground(QColor(16, 185, 129))  # 緑
-            else:
-                return_item.setForeground(QColor(239, 68, 68))  # 赤
-            table.setItem(row, 5, return_item)
-
-            # 結果
-            result = trade.get('result', '')
-            result_item = QTableWidgetItem(result)
-            result_item.setTextAlignment(Qt.AlignCenter)
-            if result == 'WIN':
-                result_item.setForeground(QColor(16, 185, 129))
-                result_item.setFont(QFont("Meiryo", 9, QFont.Bold))
-            else:
-                result_item.setForeground(QColor(239, 68, 68))
-                result_item.setFont(QFont("Meiryo", 9, QFont.Bold))
-            table.setItem(row, 6, result_item)
+        frames = [
+            cls._normalize_trades(trades, close_col, result)
+            for trades, result in ((win_trades, 'WIN'), (lose_trades, 'LOSE'))
+            if not trades.empty
+        ]
+        if not frames:
+            merged = pd.DataFrame(columns=cls._TRADE_COLUMNS + ['result'] + cls._DATE_COLUMNS)
+            return merged.astype({'result': cls._RESULT_DTYPE})
+
+        merged = pd.concat(frames).sort_index(ascending=False, kind='stable')
+        dates = merged.index
+        years = dates.year
+        return merged.assign(
+            year=years,
+            year_str=years.astype(str),
+            date_str=dates.strftime('%Y-%m-%d'),
+            buy_date_str=pd.to_datetime(merged['buy_date'], errors='coerce')
+                .dt.strftime('%Y-%m-%d').fillna("N/A"),
+        ).astype({'result': cls._RESULT_DTYPE})
+
+    @classmethod
+    def _normalize_trades(cls, trades: pd.DataFrame, close_col: str, result: str) -> pd.DataFrame:
+        """勝ち/負けトレードを表示用の列名にそろえ、結果列を付与"""
+        normalized = trades.rename(columns={
+            '買入日': 'buy_date',
+            'リターン(%)': 'return',
+            '買入日終値': 'buy_price',
+            close_col: 'sell_price',
+        }).reindex(columns=cls._TRADE_COLUMNS)
+        normalized = normalized.fillna({'return': 0, 'buy_price': 0, 'sell_price': 0})
+        return normalized.assign(result=result)
+
+    def populate_table(self, table: QTableView, trades: pd.DataFrame):
+        """テーブルにデータを表示（表示文字列は列単位でまとめて整形）"""
+        if trades.empty:
+            table.model().set_rows([])
+            return
 
-        table.setSortingEnabled(True)
+        # 年・日付の文字列は結合時に作成済みのものを使う
+        date_strs = trades['date_str']
+        buy_date_strs = trades['buy_date_str']
+        returns = trades['return']
+        results = trades['result']
+        no_colors = TradesTableModel.NO_COLORS
+
+        texts = zip(
+            trades['year_str'],  # 取引年
+            date_strs,  # 権利確定日（権利付最終日）
+            buy_date_strs,
+            trades['buy_price'].map('¥{:,.0f}'.format),
+            trades['sell_price'].map('¥{:,.0f}'.format),
+            returns.map('{:+.2f}%'.format),
+            results,
+        )
+        keys = zip(
+            trades['year'], date_strs, buy_date_strs,
+            trades['buy_price'], trades['sell_price'], returns, results,
+        )
+        rows = [(text, key, no_colors) for text, key in zip(texts, keys)]
+
+        table.model().set_rows(rows)
 
     def update_yearly_performance(self):
         """年別パフォーマンスを更新"""
-        if not self.current_trades:
+        if self._yearly_df is None:
             return
 
-        win_trades = self.current_trades.get('win_trades', pd.DataFrame())
-        lose_trades = self.current_trades.get('lose_trades', pd.DataFrame())
-
-        # 年ごとに集計
-        yearly_stats = {}
-
-        # 勝ちトレード
-        if not win_trades.empty:
-            for idx, row in win_trades.iterrows():
-                year = idx.year
-                if year not in yearly_stats:
-                    yearly_stats[year] = {
-                        'wins': 0, 'losses': 0,
-                        'returns': [], 'max_win': 0, 'max_lose': 0
-                    }
-                yearly_stats[year]['wins'] += 1
-                return_val = row.get('リターン(%)', 0)
-                yearly_stats[year]['returns'].append(return_val)
-                yearly_stats[year]['max_win'] = max(yearly_stats[year]['max_win'], return_val)
-
-        # 負けトレード
-        if not lose_trades.empty:
-            for idx, row in lose_trades.iterrows():
-                year = idx.year
-                if year not in yearly_stats:
-                    yearly_stats[year] = {
-                        'wins': 0, 'losses': 0,
-                        'returns': [], 'max_win': 0, 'max_lose': 0
-                    }
-                yearly_stats[year]['losses'] += 1
-                return_val = row.get('リターン(%)', 0)
-                yearly_stats[year]['returns'].append(return_val)
-                yearly_stats[year]['max_lose'] = min(yearly_stats[year]['max_lose'], return_val)
-
-        # テーブルに表示
-        self.yearly_table.setSortingEnabled(False)
-        self.yearly_table.setRowCount(0)
-
-        for year in sorted(yearly_stats.keys(), reverse=True):
-            stats = yearly_stats[year]
-            row = self.yearly_table.rowCount()
-            self.yearly_table.insertRow(row)
-
-            total_trades = stats['wins'] + stats['losses']
-            win_rate = (stats['wins'] / total_trades * 100) if total_trades > 0 else 0
-            avg_return = sum(stats['returns']) / len(stats['returns']) if stats['returns'] else 0
-
-            # 年
-            year_item = QTableWidgetItem(str(year))
-            year_item.setTextAlignment(Qt.AlignCenter)
-            self.yearly_table.setItem(row, 0, year_item)
-
-            # トレード数
-            trades_item = QTableWidgetItem(str(total_trades))
-            trades_item.setTextAlignment(Qt.AlignCenter)
-            self.yearly_table.setItem(row, 1, trades_item)
+        yearly = self._yearly_df
 
+        # 表示用の行データを作成
+        rows = []
+        for year, total_trades, win_rate, avg_return, max_win, max_lose in zip(
+            yearly.index, yearly['total'], yearly['win_rate'], yearly['avg_return'],
+            yearly['max_win'], yearly['max_lose']
+        ):
             # 勝率
-            win_rate_item = QTableWidgetItem(f"{win_rate:.1f}%")
-            win_rate_item.setTextAlignment(Qt.AlignCenter)
             if win_rate >= 70:
-                win_rate_item.setForeground(QColor(16, 185, 129))
+                win_rate_color = COLOR_GREEN
             elif win_rate >= 50:
-                win_rate_item.setForeground(QColor(250, 204, 21))
-            self.yearly_table.setItem(row, 2, win_rate_item)
-
-            # 平均リターン
-            avg_item = QTableWidgetItem(f"{avg_return:+.2f}%")
-            avg_item.setTextAlignment(Qt.AlignCenter)
-            if avg_return > 0:
-                avg_item.setForeground(QColor(16, 185, 129))
+                win_rate_color = COLOR_YELLOW
             else:
-                avg_item.setForeground(QColor(239, 68, 68))
-            self.yearly_table.setItem(row, 3, avg_item)
-
-            # 最大勝ち
-            max_win_item = QTableWidgetItem(f"+{stats['max_win']:.2f}%")
-            max_win_item.setTextAlignment(Qt.AlignCenter)
-            max_win_item.setForeground(QColor(16, 185, 129))
-            self.yearly_table.setItem(row, 4, max_win_item)
+                win_rate_color = None
 
-            # 最大負け
-            max_lose_item = QTableWidgetItem(f"{stats['max_lose']:.2f}%")
-            max_lose_item.setTextAlignment(Qt.AlignCenter)
-            max_lose_item.setForeground(QColor(239, 68, 68))
-            self.yearly_table.setItem(row, 5, max_lose_item)
+            # 平均リターン
+            avg_color = COLOR_GREEN if avg_return > 0 else COLOR_RED
+
+            texts = (
+                str(year),
+                str(total_trades),
+                f"{win_rate:.1f}%",
+                f"{avg_return:+.2f}%",
+                f"+{max_win:.2f}%",  # 最大勝ち
+                f"{max_lose:.2f}%",  # 最大負け
+            )
+            keys = (year, total_trades, win_rate, avg_return, max_win, max_lose)
+            colors = (
+                None, None, win_rate_color, avg_color,
+                COLOR_GREEN, COLOR_RED,
+            )
+            rows.append((texts, keys, colors))
+
+        self.yearly_table.model().set_rows(rows)
+
+    @staticmethod
+    def _aggregate_yearly(trades: pd.DataFrame) -> pd.DataFrame:
+        """
+        結合済みのトレードを年ごとに集計
 
-        self.yearly_table.setSortingEnabled(True)
+        Returns:
+            DataFrame: 年（降順）をインデックスとし、total, win_rate, avg_return,
+                max_win（勝ちトレードの最大、0以上）, max_lose（負けトレードの最小、0以下）を持つ
+        """
+        if trades.empty:
+            return pd.DataFrame(columns=['total', 'win_rate', 'avg_return', 'max_win', 'max_lose'])
+
+        returns = trades['return'].to_numpy(dtype=np.float64)
+        is_win = trades['result'].cat.codes.to_numpy() == 1
+
+        # 年ごとの件数・合計・勝ち数を配列のまま集計（年は昇順）
+        years, inverse = np.unique(trades['year'].to_numpy(), return_inverse=True)
+        total = np.bincount(inverse)
+        return_sum = np.bincount(inverse, weights=returns)
+        win_count = np.bincount(inverse, weights=is_win.astype(np.float64))
+
+        # 最大勝ち・最大負けは0から始めることで、該当トレードがない年を0とする
+        max_win = np.zeros(len(years))
+        np.maximum.at(max_win, inverse[is_win], returns[is_win])
+        max_lose = np.zeros(len(years))
+        np.minimum.at(max_lose, inverse[~is_win], returns[~is_win])
+
+        yearly = pd.DataFrame({
+            'total': total,
+            'win_rate': win_count / total * 100,
+            'avg_return': return_sum / total,
+            'max_win': max_win,
+            'max_lose': max_lose,
+        }, index=years)
+        return yearly.iloc[::-1]
 
     def on_filter_changed(self, index: int):
-        """フィルターが変更された時の処理"""
-        # TODO: フィルター機能の実装
-        pass
+        """フィルターが変更された時の処理（結合済みトレードに絞り込みを掛け直す）"""
+        self.update_all_trades_table()
 
     def export_to_csv(self):
-        """CSV出力"""
-        # TODO: CSV出力機能の実装
-        self.logger.info("CSV出力機能は未実装です")
+        """表示中のトレード履歴をCSV出力"""
+        if self._all_df is None or self._all_df.empty:
+            QMessageBox.information(self, "CSV出力", "出力するトレード履歴がありません")
+            return
+
+        filepath, _ = QFileDialog.getSaveFileName(
+            self, "トレード履歴をCSVに出力", "", "CSV Files (*.csv)"
+        )
+        if not filepath:
+            return
+
+        try:
+            trades = self._filtered_trades()[list(self._CSV_HEADERS)]
+            trades.rename(columns=self._CSV_HEADERS).to_csv(
+                filepath, index=True, index_label='権利確定日',
+                encoding='utf-8-sig', date_format='%Y-%m-%d', chunksize=10000
+            )
+            self.logger.info(f"トレード履歴をCSV出力しました: {filepath}")
+        except Exception as e:
+            self.logger.error(f"CSV出力エラー: {e}", exc_info=True)
+            QMessageBox.critical(self, "エラー", f"CSV出力に失敗しました: {str(e)}")
 
     def clear(self):
         """データをクリア"""
         self.current_trades = None
-        self.all_trades_table.setRowCount(0)
-        self.yearly_table.setRowCount(0)
+        self._all_df = None
+        self._yearly_df = None
+        self.all_trades_table.model().set_rows([])
+        self.yearly_table.model().set_rows([])
@@ -7,15 +7,242 @@ Date: 2024-11-07
 """
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-    QTableWidgetItem, QHeaderView, QPushButton, QLabel,
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+    QAbstractItemView, QHeaderView, QPushButton, QLabel,
     QMessageBox, QMenu
 )
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QFont, QColor, QAction, QCursor
+from PySide6.QtCore import Qt, Signal, QObject, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QFont, QAction, QCursor
 import logging
+import threading
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+import pandas as pd
+from ._style import COLOR_GREEN, COLOR_YELLOW
+
+
+# ウィジェット全体のスタイルシート（構築時に一度だけ設定する）
+_WIDGET_STYLE = """
+    QLabel#watchlistTitle {
+        color: #E0E0E0;
+    }
+    QLabel#countLabel {
+        color: #B0B0B0;
+    }
+    QPushButton#refreshButton, QPushButton#clearButton {
+        background-color: #3A3A3A;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        border-radius: 4px;
+        font-size: 14px;
+    }
+    QPushButton#refreshButton:hover {
+        background-color: #404040;
+    }
+    QPushButton#clearButton:hover {
+        background-color: #EF4444;
+    }
+    QTableView#watchlistTable {
+        background-color: #1E1E1E;
+        color: #E0E0E0;
+        border: 1px solid #404040;
+        gridline-color: #404040;
+    }
+    QTableView#watchlistTable::item {
+        padding: 8px;
+        border-bottom: 1px solid #2D2D2D;
+    }
+    QTableView#watchlistTable::item:selected {
+        background-color: #1E90FF;
+        color: white;
+    }
+    QTableView#watchlistTable::item:hover {
+        background-color: #2D2D2D;
+    }
+    QHeaderView::section {
+        background-color: #2D2D2D;
+        color: #E0E0E0;
+        padding: 8px;
+        border: none;
+        border-bottom: 2px solid #1E90FF;
+        font-weight: bold;
+    }
+"""
+
+
+def _format_added_dates(values: List[Any]) -> List[str]:
+    """
+    追加日時をまとめて 'YYYY-MM-DD' 形式に整形
+
+    解析できない値は元の文字列のまま、空の値は '-' とする
+    """
+    raw = pd.Series(values, dtype=object)
+    parsed = pd.to_datetime(raw, errors='coerce', format='ISO8601')
+    fallback = raw.where(raw.notna() & (raw != ''), '-').astype(str)
+    return parsed.dt.strftime('%Y-%m-%d').where(parsed.notna(), fallback).tolist()
+
+
+class WatchlistModel(QAbstractTableModel):
+    """ウォッチリストテーブルのモデル
+
+    各行の表示文字列と文字色は、ビューが初めて要求したときに整形してキャッシュする。
+    """
+
+    HEADERS = ("コード", "銘柄名", "権利月", "最適日数", "勝率", "追加日")
+    _ALIGNMENTS = (
+        Qt.AlignCenter,
+        Qt.AlignLeft | Qt.AlignVCenter,
+        Qt.AlignCenter,
+        Qt.AlignCenter,
+        Qt.AlignCenter,
+        Qt.AlignCenter,
+    )
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._stocks = []
+        self._formatted = {}  # 行 -> (表示文字列のタプル, 勝率の文字色)
+
+    def set_stocks(self, stocks: List[Dict[str, Any]]):
+        """表示する銘柄データを差し替え"""
+        self.beginResetModel()
+        self._stocks = list(stocks)
+        self._formatted = {}
+        self.endResetModel()
+
+    def stock_at(self, row: int) -> Optional[Dict[str, Any]]:
+        """指定行の銘柄データを取得"""
+        if 0 <= row < len(self._stocks):
+            return self._stocks[row]
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._stocks)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.UserRole:
+            return self._stocks[row]
+
+        column = index.column()
+        if role == Qt.DisplayRole:
+            return self._cells(row)[0][column]
+        if role == Qt.TextAlignmentRole:
+            return self._ALIGNMENTS[column]
+        if role == Qt.ForegroundRole and column == 4:
+            return self._cells(row)[1]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def _cells(self, row: int) -> tuple:
+        """行の (表示文字列のタプル, 勝率の文字色) を取得（初回のみ整形）"""
+        cells = self._formatted.get(row)
+        if cells is None:
+            cells = self._format_stock(self._stocks[row])
+            self._formatted[row] = cells
+        return cells
+
+    @staticmethod
+    def _format_stock(stock: Dict[str, Any]) -> tuple:
+        month = stock.get('rights_month', '')
+        optimal_days = stock.get('optimal_days', '')
+        win_rate = stock.get('win_rate', 0)
+
+        win_rate_color = None
+        if win_rate and win_rate >= 0.7:
+            win_rate_color = COLOR_GREEN
+        elif win_rate and win_rate >= 0.5:
+            win_rate_color = COLOR_YELLOW
+
+        texts = (
+            stock.get('code', ''),
+            stock.get('name', ''),
+            f"{month}月" if month else '',
+            f"{optimal_days}日前" if optimal_days else '-',
+            f"{win_rate*100:.1f}%" if win_rate else '-',
+            stock.get('added_str', '-'),
+        )
+        return texts, win_rate_color
+
+
+class WatchlistLoadWorkerSignals(QObject):
+    """WatchlistLoadWorker用のシグナル"""
+    finished = Signal(list)
+    error = Signal(str)
+
+
+class WatchlistLoadWorker:
+    """バックグラウンドでウォッチリストを読み込むワーカー
+
+    Note: SQLiteにアクセスするため、main_window_v3のワーカーと同じくthreading.Threadで実行
+    """
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.logger = logging.getLogger(__name__)
+        self.signals = WatchlistLoadWorkerSignals()
+        self._thread = None
+
+    @property
+    def finished(self):
+        return self.signals.finished
+
+    @property
+    def error(self):
+        return self.signals.error
+
+    def start(self):
+        """ワーカースレッドを開始"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def isRunning(self):
+        """スレッドが実行中かどうか"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """ウォッチリストと銘柄情報を取得して表示用データを作成"""
+        try:
+            watchlist = self.db.get_watchlist()
+
+            # 銘柄情報を一括取得
+            stocks = self.db.get_stocks([item['code'] for item in watchlist])
+
+            watchlist_data = []
+            for item in watchlist:
+                stock = stocks.get(item['code'])
+
+                if stock:
+                    stock_data = {
+                        'code': stock['code'],
+                        'name': stock['name'],
+                        'rights_month': stock['rights_month'],
+                        'rights_date': stock.get('rights_date'),
+                        'added_at': item['added_at'],
+                        'memo': item.get('memo', ''),
+                        # プレースホルダー
+                        'optimal_days': None,
+                        'win_rate': None
+                    }
+                    watchlist_data.append(stock_data)
+
+            # 追加日の表示文字列を一括で整形
+            added_strs = _format_added_dates([s['added_at'] for s in watchlist_data])
+            for stock_data, added_str in zip(watchlist_data, added_strs):
+                stock_data['added_str'] = added_str
+
+            self.signals.finished.emit(watchlist_data)
+        except Exception as e:
+            self.logger.error(f"ウォッチリスト読み込みエラー: {e}", exc_info=True)
+            self.signals.error.emit(f"ウォッチリスト読み込みエラー: {str(e)}")
 
 
 class WatchlistWidget(QWidget):
@@ -30,12 +257,16 @@ class WatchlistWidget(QWidget):
         self.logger = logging.getLogger(__name__)
         self.db = db_manager
         self.watchlist_data = []
+        self._codes = set()  # ウォッチリストに登録済みの証券コード
+        self.current_worker = None
 
         self.init_ui()
         self.load_watchlist()
 
     def init_ui(self):
         """UIを初期化"""
+        self.setStyleSheet(_WIDGET_STYLE)
+
         layout = QVBoxLayout(self)
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(10)
@@ -49,45 +280,23 @@ class WatchlistWidget(QWidget):
         title = QLabel("⭐ ウォッチリスト")
         title_font = QFont("Meiryo", 14, QFont.Bold)
         title.setFont(title_font)
-        title.setStyleSheet("color: #E0E0E0;")
+        title.setObjectName("watchlistTitle")
         header_layout.addWidget(title)
 
         header_layout.addStretch()
 
         # 更新ボタン
-        refresh_btn = QPushButton("🔄")
-        refresh_btn.setFixedSize(32, 32)
-        refresh_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #3A3A3A;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                border-radius: 4px;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: #404040;
-            }
-        """)
-        refresh_btn.clicked.connect(self.load_watchlist)
-        refresh_btn.setToolTip("ウォッチリストを再読み込み")
-        header_layout.addWidget(refresh_btn)
+        self.refresh_btn = QPushButton("🔄")
+        self.refresh_btn.setFixedSize(32, 32)
+        self.refresh_btn.setObjectName("refreshButton")
+        self.refresh_btn.clicked.connect(self.load_watchlist)
+        self.refresh_btn.setToolTip("ウォッチリストを再読み込み")
+        header_layout.addWidget(self.refresh_btn)
 
         # 全削除ボタン
         clear_btn = QPushButton("🗑")
         clear_btn.setFixedSize(32, 32)
-        clear_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #3A3A3A;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                border-radius: 4px;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: #EF4444;
-            }
-        """)
+        clear_btn.setObjectName("clearButton")
         clear_btn.clicked.connect(self.clear_all_watchlist)
         clear_btn.setToolTip("全て削除")
         header_layout.addWidget(clear_btn)
@@ -97,40 +306,10 @@ class WatchlistWidget(QWidget):
         # ========================================
         # テーブル
         # ========================================
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "コード", "銘柄名", "権利月", "最適日数", "勝率", "追加日"
-        ])
-
-        # テーブルスタイル
-        self.table.setStyleSheet("""
-            QTableWidget {
-                background-color: #1E1E1E;
-                color: #E0E0E0;
-                border: 1px solid #404040;
-                gridline-color: #404040;
-            }
-            QTableWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid #2D2D2D;
-            }
-            QTableWidget::item:selected {
-                background-color: #1E90FF;
-                color: white;
-            }
-            QTableWidget::item:hover {
-                background-color: #2D2D2D;
-            }
-            QHeaderView::section {
-                background-color: #2D2D2D;
-                color: #E0E0E0;
-                padding: 8px;
-                border: none;
-                border-bottom: 2px solid #1E90FF;
-                font-weight: bold;
-            }
-        """)
+        self.model = WatchlistModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setObjectName("watchlistTable")
 
         # ヘッダー設定
         header = self.table.horizontalHeader()
@@ -142,121 +321,65 @@ class WatchlistWidget(QWidget):
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)  # 追加日
 
         # 行選択モード
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
 
         # コンテキストメニュー
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
 
         # クリックイベント
-        self.table.cellClicked.connect(self.on_row_clicked)
+        self.table.clicked.connect(self.on_row_clicked)
 
         layout.addWidget(self.table)
 
         # 件数表示
         self.count_label = QLabel("0件")
-        self.count_label.setStyleSheet("color: #B0B0B0;")
+        self.count_label.setObjectName("countLabel")
         layout.addWidget(self.count_label)
 
     def load_watchlist(self):
-        """ウォッチリストを読み込み"""
-        try:
-            self.logger.info("ウォッチリストを読み込み中...")
+        """ウォッチリストを読み込み（DBアクセスはバックグラウンドで実行）"""
+        self.logger.info("ウォッチリストを読み込み中...")
 
-            # データベースから取得
-            watchlist = self.db.get_watchlist()
-
-            if not watchlist:
-                self.logger.info("ウォッチリストは空です")
-                self.watchlist_data = []
-                self.update_table()
-                return
+        # 読み込み中に再度要求された場合は最後の結果だけを表示する
+        worker = WatchlistLoadWorker(self.db)
+        worker.finished.connect(
+            lambda watchlist_data: self.on_watchlist_loaded(watchlist_data, worker)
+        )
+        worker.error.connect(lambda err: self.on_watchlist_load_failed(err, worker))
+        self.current_worker = worker
+        self.refresh_btn.setEnabled(False)
+        worker.start()
+
+    def on_watchlist_loaded(self, watchlist_data: List[Dict[str, Any]],
+                            worker: WatchlistLoadWorker):
+        """ウォッチリスト読み込み完了時の処理"""
+        if worker is not self.current_worker:
+            return
+        self.current_worker = None
+        self.refresh_btn.setEnabled(True)
 
-            # 銘柄情報を取得
-            self.watchlist_data = []
-            for item in watchlist:
-                code = item['code']
-                stock = self.db.get_stock(code)
+        self.watchlist_data = watchlist_data
 
-                if stock:
-                    stock_data = {
-                        'code': stock['code'],
-                        'name': stock['name'],
-                        'rights_month': stock['rights_month'],
-                        'rights_date': stock.get('rights_date'),
-                        'added_at': item['added_at'],
-                        'memo': item.get('memo', ''),
-                        # プレースホルダー
-                        'optimal_days': None,
-                        'win_rate': None
-                    }
-                    self.watchlist_data.append(stock_data)
+        self._codes = {stock_data['code'] for stock_data in self.watchlist_data}
 
-            self.update_table()
-            self.logger.info(f"ウォッチリストを読み込みました: {len(self.watchlist_data)}件")
+        self.update_table()
+        self.logger.info(f"ウォッチリストを読み込みました: {len(self.watchlist_data)}件")
+        self.watchlist_updated.emit()
 
-        except Exception as e:
-            self.logger.error(f"ウォッチリスト読み込みエラー: {e}", exc_info=True)
+    def on_watchlist_load_failed(self, error: str, worker: WatchlistLoadWorker):
+        """ウォッチリスト読み込み失敗時の処理"""
+        if worker is not self.current_worker:
+            return
+        self.current_worker = None
+        self.refresh_btn.setEnabled(True)
+        self.logger.warning(error)
 
     def update_table(self):
         """テーブルを更新"""
-        # テーブルをクリア
-        self.table.setRowCount(0)
-
-        if not self.watchlist_data:
-            self.count_label.setText("0件")
-            return
-
-        # データを追加
-        for stock in self.watchlist_data:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-
-            # コード
-            code_item = QTableWidgetItem(stock.get('code', ''))
-            code_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 0, code_item)
-
-            # 銘柄名
-            name_item = QTableWidgetItem(stock.get('name', ''))
-            self.table.setItem(row, 1, name_item)
-
-            # 権利月
-            month = stock.get('rights_month', '')
-            month_item = QTableWidgetItem(f"{month}月" if month else '')
-            month_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 2, month_item)
-
-            # 最適日数
-            optimal_days = stock.get('optimal_days', '')
-            days_item = QTableWidgetItem(f"{optimal_days}日前" if optimal_days else '-')
-            days_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 3, days_item)
-
-            # 勝率
-            win_rate = stock.get('win_rate', 0)
-            win_rate_item = QTableWidgetItem(f"{win_rate*100:.1f}%" if win_rate else '-')
-            win_rate_item.setTextAlignment(Qt.AlignCenter)
-            if win_rate and win_rate >= 0.7:
-                win_rate_item.setForeground(QColor(16, 185, 129))  # 緑
-            elif win_rate and win_rate >= 0.5:
-                win_rate_item.setForeground(QColor(250, 204, 21))  # 黄色
-            self.table.setItem(row, 4, win_rate_item)
-
-            # 追加日
-            added_at = stock.get('added_at', '')
-            if added_at:
-                try:
-                    dt = datetime.fromisoformat(added_at)
-                    added_str = dt.strftime('%Y-%m-%d')
-                except:
-                    added_str = added_at
-            else:
-                added_str = '-'
-            added_item = QTableWidgetItem(added_str)
-            added_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 5, added_item)
+        # モデルを一度だけリセットし、表示中の行だけが整形される
+        self.model.set_stocks(self.watchlist_data)
 
         # 件数を更新
         self.count_label.setText(f"{len(self.watchlist_data)}件")
@@ -272,8 +395,9 @@ class WatchlistWidget(QWidget):
         try:
             if self.db.add_to_watchlist(code, memo):
                 self.logger.info(f"ウォッチリストに追加: {code}")
+                # 登録状態は即座に反映し、表示データはバックグラウンドで再読み込み
+                self._codes.add(code)
                 self.load_watchlist()
-                self.watchlist_updated.emit()
                 return True
             else:
                 self.logger.warning(f"ウォッチリスト追加失敗: {code}")
@@ -293,8 +417,8 @@ class WatchlistWidget(QWidget):
         try:
             if self.db.remove_from_watchlist(code):
                 self.logger.info(f"ウォッチリストから削除: {code}")
+                self._codes.discard(code)
                 self.load_watchlist()
-                self.watchlist_updated.emit()
                 return True
             else:
                 return False
@@ -315,12 +439,13 @@ class WatchlistWidget(QWidget):
 
         if reply == QMessageBox.Yes:
             try:
-                # 全アイテムを削除
-                for stock in self.watchlist_data:
-                    self.db.remove_from_watchlist(stock['code'])
+                # 全アイテムを一括削除
+                if not self.db.clear_watchlist():
+                    QMessageBox.critical(self, "エラー", "削除に失敗しました")
+                    return
 
+                self._codes.clear()
                 self.load_watchlist()
-                self.watchlist_updated.emit()
                 self.logger.info("ウォッチリストを全削除しました")
 
             except Exception as e:
@@ -330,8 +455,7 @@ class WatchlistWidget(QWidget):
     def show_context_menu(self, position):
         """コンテキストメニューを表示"""
         # 選択行を取得
-        row = self.table.rowAt(position.y())
-        if row < 0:
+        if not self.table.indexAt(position).isValid():
             return
 
         # メニュー作成
@@ -347,17 +471,12 @@ class WatchlistWidget(QWidget):
 
     def remove_selected(self):
         """選択された銘柄を削除"""
-        current_row = self.table.currentRow()
-        if current_row < 0:
+        stock = self.model.stock_at(self.table.currentIndex().row())
+        if not stock:
             return
 
-        code_item = self.table.item(current_row, 0)
-        if not code_item:
-            return
-
-        code = code_item.text()
-        name_item = self.table.item(current_row, 1)
-        name = name_item.text() if name_item else code
+        code = stock.get('code', '')
+        name = stock.get('name') or code
 
         reply = QMessageBox.question(
             self,
@@ -370,36 +489,16 @@ class WatchlistWidget(QWidget):
         if reply == QMessageBox.Yes:
             self.remove_from_watchlist(code)
 
-    def on_row_clicked(self, row: int, column: int):
+    def on_row_clicked(self, index: QModelIndex):
         """行クリック時の処理"""
-        # コードと権利月を取得
-        code_item = self.table.item(row, 0)
-        month_item = self.table.item(row, 2)
-
-        if not code_item or not month_item:
+        selected_stock = index.data(Qt.UserRole)
+        if not selected_stock:
             return
 
-        code = code_item.text()
-        # 権利月から数値を抽出（例: "3月" → 3）
-        month_text = month_item.text()
-        try:
-            rights_month = int(month_text.replace('月', ''))
-        except ValueError:
-            self.logger.warning(f"権利月の解析に失敗しました: {month_text}")
-            return
-
-        # コードと権利月の両方で該当する銘柄データを探す
-        selected_stock = None
-        for stock in self.watchlist_data:
-            if stock.get('code') == code and stock.get('rights_month') == rights_month:
-                selected_stock = stock
-                break
-
-        if selected_stock:
-            self.logger.info(f"ウォッチリスト銘柄が選択されました: {code} ({rights_month}月)")
-            self.stock_selected.emit(selected_stock)
-        else:
-            self.logger.warning(f"ウォッチリスト銘柄データが見つかりません: {code} ({rights_month}月)")
+        code = selected_stock.get('code')
+        rights_month = selected_stock.get('rights_month')
+        self.logger.info(f"ウォッチリスト銘柄が選択されました: {code} ({rights_month}月)")
+        self.stock_selected.emit(selected_stock)
 
     def is_in_watchlist(self, code: str) -> bool:
         """
@@ -411,4 +510,4 @@ class WatchlistWidget(QWidget):
         Returns:
             bool: ウォッチリストに含まれている場合True
         """
-        return any(stock['code'] == code for stock in self.watchlist_data)
+        return code in self._codes
@@ -121,6 +121,17 @@ class TestDatabaseManager:
         december_stocks = temp_db.get_all_stocks(rights_month=12)
         assert len(december_stocks) == 1
     
+    def test_get_stocks(self, temp_db):
+        """複数銘柄の一括取得のテスト"""
+        temp_db.insert_stock(code="9202", name="ANAホールディングス", rights_month=3)
+        temp_db.insert_stock(code="8591", name="オリックス", rights_month=3)
+
+        stocks = temp_db.get_stocks(["9202", "8591", "0000"])
+
+        assert set(stocks) == {"9202", "8591"}
+        assert stocks["9202"]['name'] == "ANAホールディングス"
+        assert temp_db.get_stocks([]) == {}
+    
     def test_insert_price_history(self, temp_db):
         """株価履歴追加のテスト"""
         # 先に銘柄を追加
@@ -169,6 +180,18 @@ class TestDatabaseManager:
         watchlist = temp_db.get_watchlist()
         assert len(watchlist) == 0
     
+    def test_clear_watchlist(self, temp_db):
+        """ウォッチリスト全削除のテスト"""
+        temp_db.insert_stock(code="9202", name="ANAホールディングス", rights_month=3)
+        temp_db.insert_stock(code="8591", name="オリックス", rights_month=3)
+        temp_db.add_to_watchlist("9202")
+        temp_db.add_to_watchlist("8591")
+
+        result = temp_db.clear_watchlist()
+        assert result is True
+
+        assert temp_db.get_watchlist() == []
+    
     def test_simulation_cache(self, temp_db):
         """シミュレーションキャッシュのテスト"""
         # 銘柄を追加
@@ -0,0 +1,104 @@
+"""
+Unit Tests for Portfolio Calculator Module
+ポートフォリオ計算モジュールのテスト
+
+Author: Yuutai Event Investor Team
+Date: 2025-01-11
+"""
+
+import math
+import pytest
+import numpy as np
+from pathlib import Path
+import sys
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.portfolio_calculator import PortfolioCalculator
+
+
+# 銘柄A: 分散 0.5*(5-1)^2 + 0.5*(-3-1)^2 = 16（σ=4）
+# 銘柄B: 分散 0.5*(3-1)^2 + 0.5*(-1-1)^2 = 4（σ=2）
+STOCKS = [
+    {'code': 'A', 'expected_return': 1.0, 'win_rate': 0.5,
+     'avg_win_return': 5.0, 'avg_lose_return': -3.0},
+    {'code': 'B', 'expected_return': 1.0, 'win_rate': 0.5,
+     'avg_win_return': 3.0, 'avg_lose_return': -1.0},
+]
+WEIGHTS = [0.5, 0.5]
+
+# 分散 = Σ(wσ)^2 + 0.3 * Σ_{i≠j} wσ_i wσ_j = (2^2 + 1^2) + 0.3 * 2 * (2 * 1) = 6.2
+PORTFOLIO_RISK = math.sqrt(6.2)
+
+
+@pytest.fixture
+def calculator():
+    """テスト用のPortfolioCalculator"""
+    return PortfolioCalculator()
+
+
+def _columns(stocks):
+    return tuple(
+        np.array([stock[key] for stock in stocks], dtype=np.float64)
+        for key in ('expected_return', 'win_rate', 'avg_win_return', 'avg_lose_return')
+    )
+
+
+class TestPortfolioMetrics:
+    """ポートフォリオ指標計算のテスト"""
+
+    def test_calculate_portfolio_metrics_vec(self, calculator):
+        """配列版の指標の手計算値との比較"""
+        metrics = calculator.calculate_portfolio_metrics_vec(*_columns(STOCKS), WEIGHTS)
+
+        assert metrics['expected_return'] == pytest.approx(1.0)
+        assert metrics['win_rate'] == pytest.approx(0.5)
+        assert metrics['risk'] == pytest.approx(PORTFOLIO_RISK)
+        assert metrics['sharpe_ratio'] == pytest.approx(1.0 / PORTFOLIO_RISK)
+        # 単純平均の分散 (16 + 4) / 2 = 10 と比較
+        assert metrics['risk_reduction'] == pytest.approx(
+            (1 - PORTFOLIO_RISK / math.sqrt(10)) * 100
+        )
+        assert metrics['worst_case_return'] == pytest.approx(1.0 - 1.645 * PORTFOLIO_RISK)
+        # 下方分散 0.25 * 9 + 0.25 * 1 = 2.5
+        assert metrics['downside_risk'] == pytest.approx(math.sqrt(2.5))
+        assert metrics['sortino_ratio'] == pytest.approx(1.0 / math.sqrt(2.5))
+        assert metrics['weights'] == WEIGHTS
+
+    def test_variance_matches_pairwise_sum(self, calculator):
+        """閉形式の分散が銘柄ペアごとの共分散の和と一致すること"""
+        stocks = STOCKS + [
+            {'code': 'C', 'expected_return': 0.5, 'win_rate': 0.7,
+             'avg_win_return': 2.0, 'avg_lose_return': -4.0},
+        ]
+        weights = [0.2, 0.3, 0.5]
+        expected_returns, win_rates, avg_wins, avg_loses = _columns(stocks)
+        variances = (win_rates * (avg_wins - expected_returns) ** 2 +
+                     (1 - win_rates) * (avg_loses - expected_returns) ** 2)
+        sigmas = np.sqrt(variances)
+
+        pairwise_variance = 0.0
+        for i in range(len(stocks)):
+            for j in range(len(stocks)):
+                covariance = variances[i] if i == j else 0.3 * sigmas[i] * sigmas[j]
+                pairwise_variance += weights[i] * weights[j] * covariance
+
+        metrics = calculator.calculate_portfolio_metrics_vec(
+            expected_returns, win_rates, avg_wins, avg_loses, weights
+        )
+        assert metrics['risk'] == pytest.approx(math.sqrt(pairwise_variance))
+
+    def test_calculate_portfolio_metrics_matches_vec(self, calculator):
+        """辞書版が配列版と同じ結果を返すこと"""
+        metrics = calculator.calculate_portfolio_metrics(STOCKS, WEIGHTS)
+        expected = calculator.calculate_portfolio_metrics_vec(*_columns(STOCKS), WEIGHTS)
+
+        assert metrics.pop('weights') == expected.pop('weights')
+        assert metrics == pytest.approx(expected)
+
+    def test_invalid_weights(self, calculator):
+        """投資比率が不正な場合はNoneを返すこと"""
+        assert calculator.calculate_portfolio_metrics_vec(*_columns(STOCKS), [0.5]) is None
+        assert calculator.calculate_portfolio_metrics_vec(*_columns(STOCKS), [0.5, 0.6]) is None
@@ -0,0 +1,122 @@
+"""
+Unit Tests for Risk Analyzer Module
+リスク分析モジュールのテスト
+
+Author: Yuutai Event Investor Team
+Date: 2025-01-11
+"""
+
+import math
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.risk_analyzer import RiskAnalyzer
+
+
+# 勝ち: 4%, 2% / 負け: -2%（結合後のトレード順は [4, 2, -2]）
+WIN_RETURNS = np.array([4.0, 2.0])
+LOSE_RETURNS = np.array([-2.0])
+
+
+@pytest.fixture
+def analyzer():
+    """テスト用のRiskAnalyzer"""
+    return RiskAnalyzer()
+
+
+class TestRiskAnalyzerNumpy:
+    """リターン配列版のリスク指標計算のテスト"""
+
+    def test_var_from_sorted(self, analyzer):
+        """VaR/CVaRの手計算値との比較"""
+        var = analyzer._var_from_sorted(np.array([-2.0, 2.0, 4.0]))
+
+        # 線形補間: 5%点 = -2 + 0.1 * 4, 1%点 = -2 + 0.02 * 4
+        assert var['var_95'] == pytest.approx(-1.6)
+        assert var['var_99'] == pytest.approx(-1.92)
+        assert var['cvar_95'] == pytest.approx(-2.0)
+        assert var['cvar_99'] == pytest.approx(-2.0)
+
+    def test_distribution_from_sorted(self, analyzer):
+        """分布統計の手計算値との比較"""
+        distribution = analyzer._distribution_from_sorted(np.array([-2.0, 2.0, 4.0]))
+
+        assert distribution['mean'] == pytest.approx(4 / 3)
+        assert distribution['median'] == pytest.approx(2.0)
+        assert distribution['std'] == pytest.approx(math.sqrt(28 / 3))
+        assert distribution['skewness'] == pytest.approx(-0.381802, abs=1e-6)
+        assert distribution['kurtosis'] == pytest.approx(-1.5)
+        assert distribution['min'] == -2.0
+        assert distribution['max'] == 4.0
+        assert distribution['percentile_25'] == pytest.approx(0.0)
+        assert distribution['percentile_75'] == pytest.approx(3.0)
+
+    def test_single_return_std_is_nan(self, analyzer):
+        """1件のみの場合の標準偏差はpandasと同じくNaN"""
+        distribution = analyzer._distribution_from_sorted(np.array([1.5]))
+        assert math.isnan(distribution['std'])
+
+    def test_sortino_ratio_np(self, analyzer):
+        """ソルティノレシオの手計算値との比較"""
+        returns = np.array([4.0, 2.0, -2.0])
+
+        # (平均 4/3 - 0) / 下方偏差 2 * sqrt(252)
+        assert analyzer._sortino_ratio_np(returns) == pytest.approx(
+            (4 / 3) / 2 * math.sqrt(252)
+        )
+        assert analyzer._sortino_ratio_np(np.array([1.0, 2.0])) == float('inf')
+
+    def test_calmar_ratio_np(self, analyzer):
+        """カルマーレシオの手計算値との比較"""
+        returns = np.array([4.0, 2.0, -2.0])
+
+        # 年率リターン (4/3) * 252 / |最大ドローダウン 2%|
+        assert analyzer._calmar_ratio_np(returns, {'max_drawdown': -2.0}) == pytest.approx(168.0)
+        assert analyzer._calmar_ratio_np(returns, {'max_drawdown': 0.0}) == 0.0
+
+    def test_comprehensive_risk_metrics_np(self, analyzer):
+        """配列版の包括的リスク指標の手計算値との比較"""
+        metrics = analyzer.calculate_comprehensive_risk_metrics_np(WIN_RETURNS, LOSE_RETURNS)
+
+        # 累積 1.04 → 1.0608 → 1.0608 * 0.98 で -2% のドローダウン
+        assert metrics['max_drawdown']['max_drawdown'] == pytest.approx(-2.0)
+        assert metrics['var']['var_95'] == pytest.approx(-1.6)
+        assert metrics['distribution']['mean'] == pytest.approx(4 / 3)
+        assert metrics['sortino_ratio'] == pytest.approx((4 / 3) / 2 * math.sqrt(252))
+        assert metrics['calmar_ratio'] == pytest.approx(168.0)
+
+    def test_comprehensive_risk_metrics_np_matches_series_version(self, analyzer):
+        """配列版がSeries版の各計算と同じ結果になること"""
+        metrics = analyzer.calculate_comprehensive_risk_metrics_np(WIN_RETURNS, LOSE_RETURNS)
+        returns = pd.Series(np.concatenate([WIN_RETURNS, LOSE_RETURNS]))
+
+        assert metrics['var'] == pytest.approx(analyzer.calculate_var(returns))
+        assert metrics['distribution'] == pytest.approx(
+            analyzer.calculate_return_distribution(returns)
+        )
+        assert metrics['sortino_ratio'] == pytest.approx(analyzer.calculate_sortino_ratio(returns))
+        assert metrics['calmar_ratio'] == pytest.approx(analyzer.calculate_calmar_ratio(returns))
+
+    def test_comprehensive_risk_metrics_np_ignores_nan(self, analyzer):
+        """NaNのリターンは除外して計算すること"""
+        metrics = analyzer.calculate_comprehensive_risk_metrics_np(
+            np.array([4.0, np.nan, 2.0]), LOSE_RETURNS
+        )
+        assert metrics['distribution']['mean'] == pytest.approx(4 / 3)
+
+    def test_comprehensive_risk_metrics_np_empty(self, analyzer):
+        """トレードがない場合は0の指標を返すこと"""
+        metrics = analyzer.calculate_comprehensive_risk_metrics_np(np.empty(0), np.empty(0))
+
+        assert metrics['max_drawdown']['max_drawdown'] == 0.0
+        assert metrics['var']['var_95'] == 0.0
+        assert metrics['distribution']['mean'] == 0.0
+        assert metrics['sortino_ratio'] == 0.0
+        assert metrics['calmar_ratio'] == 0.0